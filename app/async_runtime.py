@@ -0,0 +1,150 @@
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# How often the mock display window gets its Tk events processed
+TK_PUMP_INTERVAL = 0.02
+
+
+async def _wait(event, deadline):
+    """Wait for event or until deadline (a time.monotonic() value, None = no limit)."""
+    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+    woken = True
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        woken = False
+    event.clear()
+    return woken
+
+
+class AsyncRuntime:
+    """
+    Runs an AppController as asyncio tasks instead of AppController.run():
+
+      input   - woken by input events, handles buttons and hold-repeat steps
+      timer   - sleeps until the next timer/display deadline, advances the
+                timer and renders the frame
+      display - sends the newest finished frame to the panel
+      tk      - with the mock display, pumps the Tk window on the loop thread
+
+    Everything that blocks on the driver (Init/reset delays, SPI/I2C writes)
+    runs on a single-thread "display bus" executor, so the loop never waits
+    on hardware and bus access stays serialized. A frame finished while the
+    bus is busy replaces the one waiting to be sent.
+    """
+
+    def __init__(self, make_controller, thinkerer=None):
+        self._make_controller = make_controller
+        self.thinkerer = thinkerer
+        self.controller = None
+        self._bus = ThreadPoolExecutor(max_workers=1, thread_name_prefix="display-bus")
+        self._stopping = False
+        self._pending_frame = None
+        self._input_event = asyncio.Event()
+        self._timer_event = asyncio.Event()
+        self._frame_event = asyncio.Event()
+        self.frames_sent = 0
+        self.frames_replaced = 0
+
+    def stop(self):
+        """Ask all tasks to finish. Call from the event loop thread."""
+        self._stopping = True
+        if self.controller is not None:
+            self.controller.running = False
+        for event in (self._input_event, self._timer_event, self._frame_event):
+            event.set()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        tasks = []
+        if self.thinkerer is not None:
+            self.thinkerer.defer_updates = True
+            tasks.append(asyncio.create_task(self._tk_task()))
+        try:
+            # Construction runs the display init sequence, which sleeps
+            self.controller = await loop.run_in_executor(self._bus, self._make_controller)
+            if self._stopping:
+                return
+            controller = self.controller
+            controller.frame_sink = self._submit_frame
+            controller.inputs.on_event = lambda: loop.call_soon_threadsafe(self._input_event.set)
+            tasks += [
+                asyncio.create_task(self._input_task()),
+                asyncio.create_task(self._timer_task()),
+                asyncio.create_task(self._display_task()),
+            ]
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.controller is not None:
+                logger.info("Async runtime: frames sent %d, replaced before sending %d",
+                            self.frames_sent, self.frames_replaced)
+                await loop.run_in_executor(self._bus, self.controller._cleanup)
+            self._bus.shutdown(wait=True)
+
+    async def _input_task(self):
+        controller = self.controller
+        while not self._stopping:
+            woken = await _wait(self._input_event, controller._input_deadline())
+            if self._stopping:
+                break
+            controller.scheduler.record_wakeup(woken)
+            controller.handle_buttons()
+            # Inputs can change what is on screen or start/stop the timer
+            self._timer_event.set()
+
+    async def _timer_task(self):
+        controller = self.controller
+        while not self._stopping:
+            controller._update_timer()
+            controller._render_frame()
+            controller.log_timer_state_changes()
+            woken = await _wait(self._timer_event, controller._timer_deadline())
+            controller.scheduler.record_wakeup(woken)
+
+    async def _display_task(self):
+        loop = asyncio.get_running_loop()
+        display = self.controller.display
+        while True:
+            if self._pending_frame is None:
+                if self._stopping:
+                    break
+                await self._frame_event.wait()
+                self._frame_event.clear()
+                continue
+            buf, self._pending_frame = self._pending_frame, None
+            await loop.run_in_executor(self._bus, display.ShowImage, buf)
+            self.frames_sent += 1
+
+    def _submit_frame(self, buf):
+        if self._pending_frame is not None:
+            self.frames_replaced += 1
+        self._pending_frame = buf
+        self._frame_event.set()
+
+    async def _tk_task(self):
+        while not self._stopping:
+            try:
+                self.thinkerer.pump()
+            except Exception as e:
+                # TclError once the window has been closed
+                logger.info("Mock display window closed (%s), stopping", e)
+                self.stop()
+                break
+            await asyncio.sleep(TK_PUMP_INTERVAL)
+
+
+def run_async(display_hardware=None, thinkerer=None, debug=False):
+    """Build an AppController and run it under AsyncRuntime until interrupted."""
+    from app.controller import AppController
+    runtime = AsyncRuntime(lambda: AppController(debug=debug, display_hardware=display_hardware), thinkerer)
+    try:
+        asyncio.run(runtime.run())
+    except KeyboardInterrupt:
+        logger.info("Interrupted, shutting down")
@@ -1,21 +1,45 @@
+import math
 import time
 import logging
 from app.timer import TimerController
+from app.timer_modes import _adjusted_period
+from app.settings_store import _get_settings_store
+from app.journal import _get_journal
+from app.transition_log import _get_transition_log
 from app.display import Display
-from app.input import ButtonInput, JoystickInput
+from app.input import ButtonInput, JoystickInput, HoldRepeat, _get_input_queue
+from app.output import Output
+from app.scheduler import DeadlineScheduler
 
 logger = logging.getLogger(__name__)
 
+SPINNER_INTERVAL = 0.2
+# Polling period while an input is held, or when GPIO edges cannot wake us
+INPUT_POLL_INTERVAL = 0.1
+# Wake just past a display change so rounding has already moved on
+DEADLINE_MARGIN = 0.001
+
 class AppController:
     def __init__(self, debug: bool = False, display_hardware=None):
         self.debug = debug
         self.display = Display(hardware=display_hardware) if display_hardware else Display()
-        self.timer = TimerController()
+        # Relays switch inside the timer's own transition, not on a display tick
+        self.output = Output()
+        # Joystick steps come in bursts; write settings once they settle (SETTINGS_FLUSH_DELAY)
+        # Runtime state survives a power cut (JOURNAL_FILE; empty turns it off)
+        self.journal = _get_journal()
+        # Every transition as a binary record (TRANSITION_LOG_DIR; empty turns it off)
+        self.transition_log = _get_transition_log()
+        self.timer = TimerController(output=self.output, settings=_get_settings_store(), journal=self.journal,
+                                     transition_log=self.transition_log)
         self.buttons = ButtonInput()
         self.joystick = JoystickInput()
         self.running = True
+        self.scheduler = DeadlineScheduler()
+        # Where finished frames go; None sends them to the display right away
+        self.frame_sink = None
+        self._transition_due = None
         self.selected_timer = None
-        self.key2_was_pressed = False
         self.key2_press_time = None
 
         # For state change logging
@@ -29,6 +53,16 @@ class AppController:
         self._clock_index = 0
         self._last_anim_time = time.monotonic()
 
+        # Press/release events (from GPIO edges or the sampler thread); each
+        # one wakes the scheduler, so inputs do not need to be polled while idle
+        self.inputs = _get_input_queue(on_event=self.scheduler.wake)
+        buttons_watched = self.inputs.watch(self.buttons)
+        joystick_watched = self.inputs.watch(self.joystick)
+        self._inputs_wake = buttons_watched and joystick_watched
+        self.inputs.start()
+        # Up/down adjust the selected base time, repeating while held
+        self.repeat = HoldRepeat()
+
         self._init_display()
         self._check_mock_display()
 
@@ -66,35 +100,54 @@ class AppController:
             open_base=self.timer._open_time_base,
             close_base=self.timer._close_time_base
         )
-        self.display.ShowImage(self.display.getbuffer(self.display.image))
+        self._push_frame(self.display.getbuffer(self.display.image))
 
-    def handle_buttons(self):
-        self._handle_key2_press()
-        self._handle_key3_press()
-        self._handle_key1_press()
-        self._handle_selection_exit()
-        self._handle_joystick_adjust()
-        self._handle_joystick_right()
-
-    def _handle_key2_press(self):
-        if self.buttons.is_pressed('KEY2'):
-            if not self.key2_was_pressed:
-                self.key2_press_time = time.monotonic()
-                self.key2_was_pressed = True
+    def _push_frame(self, buf):
+        if self.frame_sink is not None:
+            self.frame_sink(buf)
         else:
-            if self.key2_was_pressed:
-                if self.key2_press_time is not None:
-                    duration = time.monotonic() - self.key2_press_time
-                    if duration >= 5.0:
-                        self._full_reset()
-                        logger.info("Timer stopped and FULLY reset (key2 held ≥5s).")
-                    elif duration >= 2.0:
-                        self._reset_and_reload()
-                        logger.info("Timer stopped and reloaded from settings (key2 held ≥2s).")
-                    else:
-                        self._toggle_pause_resume()
-                self.key2_press_time = None
-                self.key2_was_pressed = False
+            self.display.ShowImage(buf)
+
+    def handle_buttons(self):
+        for event in self.inputs.drain():
+            self._handle_input_event(event)
+        for direction, steps in self.repeat.due(time.monotonic()):
+            self._handle_joystick_adjust(steps if direction == 'up' else -steps)
+        self.timer.settings.flush_if_due()
+        if self.journal is not None:
+            self.journal.flush_if_due()
+
+    def _handle_input_event(self, event):
+        if event.name == 'KEY2':
+            self._handle_key2_event(event)
+        elif event.name == 'KEY3' and event.pressed:
+            self._handle_key3_press()
+        elif event.name == 'KEY1' and event.pressed:
+            self._handle_key1_press()
+        elif event.name in ('up', 'down'):
+            if event.pressed:
+                self.repeat.press(event.name, event.timestamp)
+            else:
+                self.repeat.release(event.name)
+        elif event.name == 'right' and event.pressed:
+            self._handle_joystick_right()
+
+    def _handle_key2_event(self, event):
+        if event.pressed:
+            self.key2_press_time = event.timestamp
+            self._handle_selection_exit()
+        elif self.key2_press_time is not None:
+            # Classify on the edge timestamps, not on when the loop saw them
+            duration = event.timestamp - self.key2_press_time
+            if duration >= 5.0:
+                self._full_reset()
+                logger.info("Timer stopped and FULLY reset (key2 held ≥5s).")
+            elif duration >= 2.0:
+                self._reset_and_reload()
+                logger.info("Timer stopped and reloaded from settings (key2 held ≥2s).")
+            else:
+                self._toggle_pause_resume()
+            self.key2_press_time = None
 
     def _toggle_pause_resume(self):
         if not self.timer.enabled:
@@ -106,75 +159,56 @@ class AppController:
             logger.info("Timer paused (short press).")
 
     def _reset_and_reload(self):
-        self.timer.enabled = False
-        self.timer.elapsed = 0
-        self.timer.show_zero = False
-        self.timer.status = "OPEN"
-        self.timer.load_settings()
+        self.timer.reset()
 
     def _full_reset(self):
-        self.timer.enabled = False
-        self.timer.elapsed = 0
-        self.timer.show_zero = False
-        self.timer.status = "OPEN"
-        self.timer.reset_settings()
+        self.timer.reset(defaults=True)
 
     def _handle_key3_press(self):
-        if self.buttons.is_pressed('KEY3'):
-            if self.selected_timer != "OPEN":
-                self.selected_timer = "OPEN"
-                logger.info("Selected OPEN timer for editing.")
+        if self.selected_timer != "OPEN":
+            self.selected_timer = "OPEN"
+            logger.info("Selected OPEN timer for editing.")
 
     def _handle_key1_press(self):
-        if self.buttons.is_pressed('KEY1'):
-            if self.selected_timer != "CLOSE":
-                self.selected_timer = "CLOSE"
-                logger.info("Selected CLOSE timer for editing.")
+        if self.selected_timer != "CLOSE":
+            self.selected_timer = "CLOSE"
+            logger.info("Selected CLOSE timer for editing.")
 
     def _handle_selection_exit(self):
-        if self.selected_timer and self.buttons.is_pressed('KEY2'):
+        if self.selected_timer:
             logger.info(f"Exited selection mode for {self.selected_timer}.")
             self.selected_timer = None
 
-    def _handle_joystick_adjust(self):
-        if self.selected_timer:
-            direction = 0
-            if self.joystick.is_active('up'):
-                direction = 1
-            elif self.joystick.is_active('down'):
-                direction = -1
-
-            if direction != 0:
-                if self.selected_timer == "OPEN":
-                    self.timer._open_time_base = max(1, self.timer._open_time_base + direction)
-                    self.timer.randomize_if_needed()
-                    logger.info(
-                        "%s OPEN base time to %d",
-                        "Increased" if direction > 0 else "Decreased",
-                        self.timer._open_time_base
-                    )
-                elif self.selected_timer == "CLOSE":
-                    self.timer._close_time_base = max(1, self.timer._close_time_base + direction)
-                    self.timer.randomize_if_needed()
-                    logger.info(
-                        "%s CLOSE base time to %d",
-                        "Increased" if direction > 0 else "Decreased",
-                        self.timer._close_time_base
-                    )
-                self.timer.save_settings()
-                time.sleep(0.2)  # Debounce
+    def _handle_joystick_adjust(self, delta):
+        if self.selected_timer == "OPEN":
+            self.timer._open_time_base = _adjusted_period(self.timer._open_time_base, delta)
+            self.timer.randomize_if_needed()
+            logger.info(
+                "%s OPEN base time to %s",
+                "Increased" if delta > 0 else "Decreased",
+                self.timer._open_time_base
+            )
+        elif self.selected_timer == "CLOSE":
+            self.timer._close_time_base = _adjusted_period(self.timer._close_time_base, delta)
+            self.timer.randomize_if_needed()
+            logger.info(
+                "%s CLOSE base time to %s",
+                "Increased" if delta > 0 else "Decreased",
+                self.timer._close_time_base
+            )
+        else:
+            return
+        self.timer.save_settings()
 
     def _handle_joystick_right(self):
-        if self.joystick.is_active('right'):
-            if self.selected_timer == "OPEN":
-                # Reserved for future use or additional feature
-                pass
-            else:
-                # No timer selected - toggle random/loop mode
-                self._toggle_timer_mode()
-                self.timer.status_c = self.timer.mode
-                self._draw_layout()
-            time.sleep(0.2)  # Debounce
+        if self.selected_timer == "OPEN":
+            # Reserved for future use or additional feature
+            pass
+        else:
+            # No timer selected - toggle random/loop mode
+            self._toggle_timer_mode()
+            self.timer.status_c = self.timer.mode
+            self._draw_layout()
 
     def _toggle_timer_mode(self):
         if self.timer.mode == "loop":
@@ -205,25 +239,111 @@ class AppController:
                 self.handle_buttons()
                 self._update_timer_and_display()
                 self.log_timer_state_changes()
-                time.sleep(0.1)
+                deadline = self._next_deadline()
+                # Only transitions are worth spinning for
+                self.scheduler.wait_until(deadline, precise=deadline is not None and deadline == self._transition_due)
         finally:
             self._cleanup()
 
+    def stop(self):
+        self.running = False
+        self.scheduler.wake()
+
+    def _inputs_active(self):
+        return bool(self.inputs.pressed())
+
+    def _next_deadline(self):
+        """
+        Earliest time anything on screen or in the timer can change:
+        the next transition, the next change of a displayed second, the next
+        spinner frame, the next input poll or hold-repeat step. None means
+        sleep until woken.
+        """
+        deadlines = [d for d in (self._input_deadline(), self._timer_deadline()) if d is not None]
+        return min(deadlines) if deadlines else None
+
+    def _input_deadline(self):
+        deadlines = []
+        if not self._inputs_wake or self._inputs_active():
+            deadlines.append(time.monotonic() + INPUT_POLL_INTERVAL)
+        repeat_due = self.repeat.next_deadline()
+        if repeat_due is not None:
+            deadlines.append(repeat_due)
+        flush_due = self.timer.settings.flush_deadline()
+        if flush_due is not None:
+            deadlines.append(flush_due)
+        journal_due = self.journal.flush_deadline() if self.journal is not None else None
+        if journal_due is not None:
+            deadlines.append(journal_due)
+        return min(deadlines) if deadlines else None
+
+    def _timer_deadline(self):
+        now = time.monotonic()
+        deadlines = []
+        self._transition_due = None
+        if self.timer.enabled:
+            remaining = self.timer.mode_handler.current_remaining_time()
+            if self.timer.show_zero or remaining <= 0:
+                deadlines.append(now)
+            else:
+                self._transition_due = self.timer.last_update_time + remaining
+                deadlines.append(self._transition_due)
+                # Displayed values are rounded, so they change at half seconds
+                below = math.ceil(remaining - 0.5) - 0.5
+                if below >= remaining:
+                    below -= 1
+                if below > 0:
+                    deadlines.append(self.timer.last_update_time + remaining - below + DEADLINE_MARGIN)
+            deadlines.append(self._last_anim_time + SPINNER_INTERVAL)
+        return min(deadlines) if deadlines else None
+
     def _update_timer_and_display(self):
+        self._update_timer()
+        self._render_frame()
+
+    def _update_timer(self):
         if self.timer.enabled:
+            due = self._transition_due
             self.timer.update()
-            # Animate spinner for status_a
             now = time.monotonic()
-            if now - self._last_anim_time > 0.2:
+            if self.timer.show_zero:
+                # Transition as soon as it is due instead of on the next tick
+                if due is not None:
+                    self.scheduler.record_transition(due, now)
+                self.timer.transition()
+            # Animate spinner for status_a
+            if now - self._last_anim_time >= SPINNER_INTERVAL:
                 self._clock_index = (self._clock_index + 1) % len(self._clock_symbols)
                 self._last_anim_time = now
             self.timer.status_a = self._clock_symbols[self._clock_index]
         else:
             self.timer.status_a = ""
-        self.display.update_values(self.timer)
-        self.display.ShowImage(self.display.getbuffer(self.display.image))
+
+    def _render_frame(self):
+        # Nothing visible changed: skip render, pack and bus transfer
+        if self.display.update_values(self.timer):
+            self._push_frame(self.display.getbuffer(self.display.image))
 
     def _cleanup(self):
+        logger.info("Display frames rendered: %d, skipped: %d",
+                    self.display.frames_rendered, self.display.frames_skipped)
+        logger.info("Frame cache: %s", self.display.frame_cache.stats())
+        logger.info("Scheduler: %s", self.scheduler.stats())
+        logger.info("Input bounces dropped: %d", self.inputs.bounces)
+        logger.info("Output: %s", self.output.stats())
+        self.timer.settings.flush()
+        logger.info("Settings: %s", self.timer.settings.stats())
+        self.timer.settings.close()
+        if self.journal is not None:
+            # Where the timer stopped, so the next start carries on from here
+            self.journal.record(self.timer.runtime_state(), urgent=True)
+            logger.info("Runtime journal: %s", self.journal.stats())
+            self.journal.close()
+        if self.transition_log is not None:
+            logger.info("Transition log: %s", self.transition_log.stats())
+            self.transition_log.close()
+        self.inputs.close()
+        self.output.cleanup()
         self.buttons.cleanup()
         self.joystick.cleanup()
         if hasattr(self.display, "hw") and hasattr(self.display.hw, "RPI"):
@@ -1,13 +1,27 @@
 import os
 import platform
 import logging
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
+from app.glyphs import TextRenderer
+from app.frame_cache import FrameCache, DEFAULT_FRAME_CACHE_SIZE
 
 logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 FONT_PATH = os.path.join(BASE_DIR, "fonts", "Font.ttf")
 
+STATUS_BAR_HEIGHT = 16
+OPEN_ROW_Y = 18
+CLOSE_ROW_Y = 42
+TEXT_METRICS_CACHE_SIZE = 512
+
+# The panel is mounted upside down. "hardware" flips it with the SH1106
+# segment/COM remap at Init; "software" rotates every frame before packing.
+# Software stays the default until the hardware remap is checked on a panel.
+ORIENTATION_HARDWARE = "hardware"
+ORIENTATION_SOFTWARE = "software"
+
 
 def _get_display_driver():
     driver_type = os.getenv("DISPLAY_DRIVER")
@@ -31,8 +45,19 @@ def _get_display_driver():
             return SH1106
 
 
+def _get_orientation():
+    orientation = os.getenv("DISPLAY_ORIENTATION", ORIENTATION_SOFTWARE)
+    if orientation not in (ORIENTATION_HARDWARE, ORIENTATION_SOFTWARE):
+        raise ValueError(f"Unknown display orientation: {orientation}")
+    return orientation
+
+
+def _get_frame_cache_size():
+    return int(os.getenv("FRAME_CACHE_SIZE", DEFAULT_FRAME_CACHE_SIZE))
+
+
 class Display:
-    def __init__(self, hardware=None):
+    def __init__(self, hardware=None, orientation=None, frame_cache_size=None):
         logger.debug("Display.__init__ starting")
         if hardware is None:
             driver = _get_display_driver()
@@ -48,40 +73,80 @@ class Display:
         self.width = self.hw.width
         self.height = self.hw.height
 
+        self.orientation = orientation or _get_orientation()
+        if self.orientation == ORIENTATION_HARDWARE and not hasattr(self.hw, "orientation"):
+            logger.warning("Display driver cannot rotate in hardware, rotating frames in software")
+            self.orientation = ORIENTATION_SOFTWARE
+        if hasattr(self.hw, "orientation"):
+            # Takes effect at the next hw.Init()
+            self.hw.orientation = self.orientation
+
         self.font_number = self._get_font(FONT_PATH, 18)
         self.font_label = self._get_font(FONT_PATH, 18)
         self.font_status = self._get_font(FONT_PATH, 10)
         self.font_small = self._get_font(FONT_PATH, 11)
-        self._create_background()
+        self._text_metrics = {}
+        # Glyph atlases for everything drawn per frame; labels live in the static layer
+        self.text = TextRenderer((self.font_number, self.font_small, self.font_status))
+        # Packed buffers of recently shown states, so repeats skip render and pack
+        self.frame_cache = FrameCache(_get_frame_cache_size() if frame_cache_size is None else frame_cache_size)
+        self._frame_key = None
+        self._frame_buffer = None
+        self.invalidate_layout()
         self.image = Image.new('1', (self.hw.width, self.hw.height), "WHITE")
         self.draw = ImageDraw.Draw(self.image)
         logger.debug("Display.__init__ complete")
 
-        # Track last state for state-change-only logging
+        # Track last state for state-change-only logging and to skip unchanged frames
         self._last_state = {}
+        self.frames_rendered = 0
+        self.frames_skipped = 0
 
-    def _create_background(self):
-        self.background = Image.new('1', (self.width, self.height), "WHITE")
-        bg_draw = ImageDraw.Draw(self.background)
-        status_h = 16
-        bg_draw.rectangle((0, 0, self.width - 1, status_h - 1), outline=0, fill=100)
-        section_w = self.width // 3
-        bg_draw.text((2, 2), self.status_a, font=self.font_status, fill=0)
-        status_b_text = self.status_b
-        bbox_b = self.font_status.getbbox(status_b_text)
-        status_b_w = bbox_b[2] - bbox_b[0]
-        status_b_x = section_w + (section_w - status_b_w) // 2
-        bg_draw.text((status_b_x, 2), status_b_text, font=self.font_status, fill=0)
-        status_c_text = self.status_c
-        section_c_x = 2 * section_w + 2
-        bg_draw.text((section_c_x, 2), status_c_text, font=self.font_status, fill=0)
+    def invalidate_layout(self):
+        """Drop the cached static layer; the next frame is composed from scratch."""
+        self.static_layer = None
+        self._static_frame = None
+        self._label_heights = None
+        self._drawn_items = None
+        self.frame_cache.clear()
+        self._frame_key = None
+        self._frame_buffer = None
+
+    def _create_static_layer(self):
+        # Everything that does not depend on timer state: status bar frame and row labels
+        self.static_layer = Image.new('1', (self.width, self.height), "WHITE")
+        static_draw = ImageDraw.Draw(self.static_layer)
+        static_draw.rectangle((0, 0, self.width - 1, STATUS_BAR_HEIGHT - 1), outline=0, fill=100)
+        self._label_heights = {}
+        for y, label in ((OPEN_ROW_Y, "OPEN"), (CLOSE_ROW_Y, "CLOSE")):
+            static_draw.text((5, y), label, font=self.font_label, fill=0)
+            label_bbox = self.font_label.getbbox(label)
+            self._label_heights[label] = label_bbox[3] - label_bbox[1]
+        self._static_frame = np.array(self.static_layer, dtype=bool)
 
     def _is_mock(self):
         return "features.steps.mocks" in self.hw.__class__.__module__
 
     def getbuffer(self, image):
-        rotated = image.transpose(Image.ROTATE_180)
-        return self.hw.getbuffer(rotated)
+        current = image is self.image
+        if current and self._frame_buffer is not None:
+            return self._frame_buffer
+        if self.orientation == ORIENTATION_SOFTWARE:
+            image = image.transpose(Image.ROTATE_180)
+        buf = self.hw.getbuffer(image)
+        if current and self._frame_key is not None:
+            self._frame_buffer = buf
+            self.frame_cache.put(self._frame_key, (buf, self.image.tobytes(), self._drawn_items))
+        return buf
+
+    def _restore_frame(self, entry):
+        # Put self.image and the compositor back to a cached state
+        buf, image_bytes, drawn_items = entry
+        self.image.frombytes(image_bytes)
+        bits = np.unpackbits(np.frombuffer(image_bytes, dtype=np.uint8))
+        self._frame = bits.reshape(self.height, self.width).astype(bool)
+        self._drawn_items = drawn_items
+        self._frame_buffer = buf
 
     def ShowImage(self, image):
         result = self.hw.ShowImage(image)
@@ -101,42 +166,98 @@ class Display:
             logger.warning(f"Falling back to default font: {e}")
             return ImageFont.load_default()
 
-    def _draw_label_number(self, y, label, number, base=None, fill=0, next_val=None):
-        label_font = self.font_label
+    def _text_bbox(self, font, text):
+        key = (font, text)
+        bbox = self._text_metrics.get(key)
+        if bbox is None:
+            if len(self._text_metrics) >= TEXT_METRICS_CACHE_SIZE:
+                self._text_metrics.clear()
+            bbox = self._text_metrics[key] = font.getbbox(text)
+        return bbox
+
+    def _status_items(self):
+        font = self.font_status
+        section_w = self.width // 3
+        status_b_bbox = self._text_bbox(font, self.status_b)
+        status_b_x = section_w + (section_w - (status_b_bbox[2] - status_b_bbox[0])) // 2
+        return {
+            "status_a": ((2, 2), self.status_a, font),
+            "status_b": ((status_b_x, 2), self.status_b, font),
+            "status_c": ((2 * section_w + 2, 2), self.status_c, font),
+        }
+
+    def _label_number_items(self, y, label, number, base=None, next_val=None):
         number_font = self.font_number
         small_font = self.font_small
 
-        label_x = 5
-        label_y = y
         number_str = str(number)
-        label_bbox = label_font.getbbox(label)
-        label_h = label_bbox[3] - label_bbox[1]
-        number_bbox = number_font.getbbox(number_str)
+        label_h = self._label_heights[label]
+        number_bbox = self._text_bbox(number_font, number_str)
         number_w = number_bbox[2] - number_bbox[0]
         number_h = number_bbox[3] - number_bbox[1]
         num_x = self.width - number_w - 30
         num_y = y + max(0, (label_h - number_h) // 2) + 2
-
-        self.draw.text((label_x, label_y), label, font=label_font, fill=fill)
-        self.draw.text((num_x, num_y), number_str, font=number_font, fill=fill)
+        items = {f"{label}_number": ((num_x, num_y), number_str, number_font)}
 
         # Always draw base value in small font after main value
         next_x = num_x + number_w + 6
         if base is not None:
             base_str = f"({base})"
-            base_bbox = small_font.getbbox(base_str)
+            base_bbox = self._text_bbox(small_font, base_str)
             base_w = base_bbox[2] - base_bbox[0]
-            base_x = next_x
             base_y = num_y + (number_h - base_bbox[3] + base_bbox[1]) // 2
-            self.draw.text((base_x, base_y), base_str, font=small_font, fill=fill)
-            next_x = base_x + base_w + 8
+            items[f"{label}_base"] = ((next_x, base_y), base_str, small_font)
+            next_x = next_x + base_w + 8
 
         # Optionally display next_time for debug/demo
         if next_val is not None:
             next_str = f"→{next_val}"
-            next_bbox = small_font.getbbox(next_str)
+            next_bbox = self._text_bbox(small_font, next_str)
             next_y = num_y + (number_h - next_bbox[3] + next_bbox[1]) // 2
-            self.draw.text((next_x, next_y), next_str, font=small_font, fill=fill)
+            items[f"{label}_next"] = ((next_x, next_y), next_str, small_font)
+        return items
+
+    def _item_box(self, item):
+        xy, text, font = item
+        box = self.text.ink_box(xy, text, font)
+        if box is None:
+            return None
+        box = (max(0, box[0]), max(0, box[1]), min(self.width, box[2]), min(self.height, box[3]))
+        # Text pushed entirely off screen has nothing to restore or redraw
+        return box if box[0] < box[2] and box[1] < box[3] else None
+
+    def _compose(self, items):
+        """
+        Bring self.image up to date with the given text items.
+        The frame is kept as a NumPy array: only the boxes of items that
+        changed are restored from the static layer, every item overlapping a
+        restored box is blitted again, and the result is copied into
+        self.image in place.
+        """
+        boxes = {name: self._item_box(item) for name, item in items.items()}
+        if self._drawn_items is None:
+            self._frame = self._static_frame.copy()
+            dirty = [box for box in boxes.values() if box]
+            changed = True
+        else:
+            dirty = []
+            for name in set(items) | set(self._drawn_items):
+                old_item, old_box = self._drawn_items.get(name, (None, None))
+                if items.get(name) == old_item:
+                    continue
+                dirty.extend(box for box in (old_box, boxes.get(name)) if box)
+            for x0, y0, x1, y1 in dirty:
+                self._frame[y0:y1, x0:x1] = self._static_frame[y0:y1, x0:x1]
+            changed = bool(dirty)
+
+        for name, item in items.items():
+            box = boxes[name]
+            if box and any(_overlaps(box, d) for d in dirty):
+                xy, text, font = item
+                self.text.draw(self._frame, xy, text, font)
+        self._drawn_items = {name: (item, boxes[name]) for name, item in items.items()}
+        if changed:
+            self.image.frombytes(np.packbits(self._frame, axis=1).tobytes())
 
     def _draw_statuses(self):
         font = self.font_status
@@ -154,14 +275,19 @@ class Display:
 
     def _render_status_and_numbers(self, open_num, close_num, status_a, status_b, status_c,
                                   open_base=None, close_base=None, open_next=None, close_next=None):
+        # Any render outside update_values is not tied to a cacheable state
+        self._frame_key = None
+        self._frame_buffer = None
         self.status_a = status_a
         self.status_b = status_b
         self.status_c = status_c
-        self._create_background()
-        self.image = self.background.copy()
-        self.draw = ImageDraw.Draw(self.image)
-        self._draw_label_number(18, "OPEN", open_num, open_base, next_val=open_next)
-        self._draw_label_number(42, "CLOSE", close_num, close_base, next_val=close_next)
+        if self.static_layer is None:
+            self._create_static_layer()
+            self._drawn_items = None
+        items = self._status_items()
+        items.update(self._label_number_items(OPEN_ROW_Y, "OPEN", open_num, open_base, next_val=open_next))
+        items.update(self._label_number_items(CLOSE_ROW_Y, "CLOSE", close_num, close_base, next_val=close_next))
+        self._compose(items)
 
     def draw_layout(self, open_num, close_num, status_a, status_b, status_c, open_base=None, close_base=None):
         current_state = {
@@ -179,7 +305,12 @@ class Display:
             self._last_state = current_state.copy()
         self._render_status_and_numbers(open_num, close_num, status_a, status_b, status_c, open_base, close_base)
 
-    def update_values(self, timer, status_a=None, status_b=None, status_c=None):
+    def update_values(self, timer, status_a=None, status_b=None, status_c=None, force=False):
+        """
+        Render the timer onto self.image if anything visible changed.
+        Returns True if a new frame was rendered, False if the previous frame
+        is still current (the caller can then skip packing and sending it).
+        """
         # Always show base values, mode-agnostic
         open_base = timer.open_time_base
         close_base = timer.close_time_base
@@ -197,6 +328,8 @@ class Display:
         curr_a = status_a if status_a is not None else getattr(timer, "status_a", "")
         curr_b = status_b if status_b is not None else getattr(timer, "status_b", "")
         curr_c = status_c if status_c is not None else getattr(timer, "status_c", "")
+        open_next = timer.next_time if getattr(timer, "status", "") == "OPEN" else None
+        close_next = timer.next_time if getattr(timer, "status", "") == "CLOSE" else None
 
         current_state = {
             'open_remaining': open_remaining,
@@ -206,19 +339,35 @@ class Display:
             'status_c': curr_c,
             'open_base': open_base,
             'close_base': close_base,
+            'open_next': open_next,
+            'close_next': close_next,
         }
-        if current_state != self._last_state:
-            logger.debug(
-                "Display.update_values called: open_remaining=%s, close_remaining=%s, a=%s, b=%s, c=%s, open_base=%s, close_base=%s",
-                open_remaining, close_remaining, curr_a, curr_b, curr_c, open_base, close_base
-            )
-            self._last_state = current_state.copy()
+        if current_state == self._last_state and not force:
+            self.frames_skipped += 1
+            return False
 
-        self._render_status_and_numbers(
-            open_remaining, close_remaining, curr_a, curr_b, curr_c, open_base, close_base,
-            open_next=(timer.next_time if getattr(timer, "status", "") == "OPEN" else None),
-            close_next=(timer.next_time if getattr(timer, "status", "") == "CLOSE" else None)
+        logger.debug(
+            "Display.update_values called: open_remaining=%s, close_remaining=%s, a=%s, b=%s, c=%s, open_base=%s, close_base=%s",
+            open_remaining, close_remaining, curr_a, curr_b, curr_c, open_base, close_base
         )
+        self._last_state = current_state.copy()
+        key = tuple(current_state.values())
+        entry = None if force else self.frame_cache.get(key)
+        if entry is not None:
+            self.status_a, self.status_b, self.status_c = curr_a, curr_b, curr_c
+            self._restore_frame(entry)
+        else:
+            self._render_status_and_numbers(
+                open_remaining, close_remaining, curr_a, curr_b, curr_c, open_base, close_base,
+                open_next=open_next, close_next=close_next
+            )
+            self.frames_rendered += 1
+        self._frame_key = key
+        return True
+
+def _overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
 
 if __name__ == "__main__":
     display = Display()
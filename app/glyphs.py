@@ -0,0 +1,168 @@
+import logging
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+DIGITS = "0123456789"
+SPINNER_CHARS = "|/-\\"
+# Everything the timer rows and the spinner ever draw
+DEFAULT_ALPHABET = DIGITS + ".()→" + SPINNER_CHARS
+TEXT_CACHE_SIZE = 256
+
+
+def _render_ink(font, text):
+    """
+    Rasterize text the way ImageDraw.text does on a mode '1' image.
+    Returns (left, top, ink) with ink a bool array relative to the text origin,
+    or None if nothing is painted.
+    """
+    left, top, right, bottom = ImageDraw.Draw(Image.new('1', (1, 1))).textbbox((0, 0), text, font=font)
+    margin = 2
+    scratch = Image.new('1', (right - left + 2 * margin, bottom - top + 2 * margin), 255)
+    origin = (margin - left, margin - top)
+    ImageDraw.Draw(scratch).text(origin, text, font=font, fill=0)
+    ink = ~np.asarray(scratch, dtype=bool)
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    if not rows.size:
+        return None
+    ink = ink[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1].copy()
+    return int(cols[0]) - origin[0], int(rows[0]) - origin[1], ink
+
+
+class GlyphAtlas:
+    """
+    1-bit glyph bitmaps for one font, rasterized once.
+
+    FreeType layout is not a plain sum of advances (negative bearings are
+    handled specially), so instead of trusting font metrics the atlas measures
+    the step between two glyphs from a rendered pair the first time that pair
+    is needed, and only keeps pairs it can reproduce exactly. Strings with any
+    other pair are left to PIL.
+    """
+
+    def __init__(self, font, alphabet=DEFAULT_ALPHABET):
+        self.font = font
+        self.glyphs = {}
+        self.steps = {}
+        self.usable = isinstance(font, ImageFont.FreeTypeFont)
+        if self.usable:
+            self._build(alphabet)
+        else:
+            logger.debug("Glyph atlas disabled for %s, using PIL text rendering", font)
+
+    def _build(self, alphabet):
+        for ch in alphabet:
+            self.glyphs[ch] = _render_ink(self.font, ch)
+
+    def _step(self, a, b):
+        if (a, b) not in self.steps:
+            self.steps[a, b] = self._measure_step(a, b)
+        return self.steps[a, b]
+
+    def _measure_step(self, a, b):
+        if self.glyphs[a] is None or self.glyphs[b] is None:
+            return None
+        expected = _render_ink(self.font, a + b)
+        guess = int(self.font.getlength(a, mode='1')) + self.glyphs[b][0] - self.glyphs[a][0]
+        for step in (guess, guess - 1, guess + 1, guess - 2, guess + 2):
+            if _same_ink(self._place(a + b, (step,)), expected):
+                return step
+        return None
+
+    def covers(self, text):
+        if not self.usable or not text or any(ch not in self.glyphs for ch in text):
+            return False
+        return all(self._step(a, b) is not None for a, b in zip(text, text[1:]))
+
+    def compose(self, text):
+        """Assemble text from glyphs; same (left, top, ink) contract as PIL rendering."""
+        return self._place(text, [self._step(a, b) for a, b in zip(text, text[1:])])
+
+    def _place(self, text, steps):
+        placements = []
+        x = self.glyphs[text[0]][0] if self.glyphs[text[0]] else 0
+        for i, ch in enumerate(text):
+            if i:
+                x += steps[i - 1]
+            glyph = self.glyphs[ch]
+            if glyph is not None:
+                placements.append((x, glyph[1], glyph[2]))
+        if not placements:
+            return None
+        left = min(x for x, _, _ in placements)
+        top = min(y for _, y, _ in placements)
+        right = max(x + ink.shape[1] for x, _, ink in placements)
+        bottom = max(y + ink.shape[0] for _, y, ink in placements)
+        out = np.zeros((bottom - top, right - left), dtype=bool)
+        for x, y, ink in placements:
+            out[y - top:y - top + ink.shape[0], x - left:x - left + ink.shape[1]] |= ink
+        return left, top, out
+
+
+def _same_ink(a, b):
+    if a is None or b is None:
+        return a is b
+    return a[0] == b[0] and a[1] == b[1] and np.array_equal(a[2], b[2])
+
+
+class TextRenderer:
+    """
+    Draws text into a NumPy frame (bool, True = white) with the same pixels
+    ImageDraw.text would produce. Strings made of atlas characters are built
+    from glyph bitmaps; anything else falls back to PIL. Rasterized strings
+    are cached, so repeated values cost a dict lookup and a slice.
+    """
+
+    def __init__(self, fonts=(), alphabet=DEFAULT_ALPHABET, cache_size=TEXT_CACHE_SIZE):
+        self._alphabet = alphabet
+        self._atlases = {}
+        self._cache = {}
+        self._cache_size = cache_size
+        for font in fonts:
+            self.atlas(font)
+
+    def atlas(self, font):
+        atlas = self._atlases.get(font)
+        if atlas is None:
+            atlas = self._atlases[font] = GlyphAtlas(font, self._alphabet)
+        return atlas
+
+    def ink(self, font, text):
+        """Return (left, top, ink) for text drawn at the origin, or None if blank."""
+        key = (font, text)
+        if key in self._cache:
+            return self._cache[key]
+        if not text:
+            result = None
+        elif self.atlas(font).covers(text):
+            result = self.atlas(font).compose(text)
+        else:
+            result = _render_ink(font, text)
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def ink_box(self, xy, text, font):
+        """Bounding box (left, top, right, bottom) of the painted pixels, or None."""
+        rendered = self.ink(font, text)
+        if rendered is None:
+            return None
+        left, top, ink = rendered
+        x, y = xy[0] + left, xy[1] + top
+        return x, y, x + ink.shape[1], y + ink.shape[0]
+
+    def draw(self, frame, xy, text, font):
+        rendered = self.ink(font, text)
+        if rendered is None:
+            return
+        left, top, ink = rendered
+        x, y = xy[0] + left, xy[1] + top
+        height, width = frame.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + ink.shape[1], width), min(y + ink.shape[0], height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        frame[y0:y1, x0:x1] &= ~ink[y0 - y:y1 - y, x0 - x:x1 - x]
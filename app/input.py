@@ -1,6 +1,9 @@
 import os
+import time
 import platform
 import logging
+import threading
+from collections import deque, namedtuple
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,57 @@ def _get_gpio_module():
 
 GPIO = _get_gpio_module()
 
+# Edges closer together than this on one pin are contact bounce
+DEBOUNCE_TIME = 0.02
+
+# "edge": GPIO edge callbacks; "sampler": a thread reading all pins at a fixed rate
+INPUT_MODE_EDGE = "edge"
+INPUT_MODE_SAMPLER = "sampler"
+
+InputEvent = namedtuple("InputEvent", ["name", "pressed", "timestamp"])
+
+# Hold-to-repeat acceleration: (held for at least, seconds between repeats, step size)
+REPEAT_STAGES = (
+    (0.0, 1.0, 1),
+    (2.0, 0.1, 1),
+    (5.0, 0.1, 10),
+)
+
+
+def _watch_pins(pins, callback):
+    """
+    Call callback(channel) on every edge of the given pins.
+    Returns False if the GPIO backend cannot do edge detection, in which
+    case the caller has to keep polling.
+    """
+    if not hasattr(GPIO, "add_event_detect"):
+        return False
+    try:
+        for pin in pins:
+            # Re-arming a pin that is already watched is an error in RPi.GPIO
+            GPIO.remove_event_detect(pin)
+            GPIO.add_event_detect(pin, GPIO.BOTH, callback=callback)
+    except RuntimeError as e:
+        # e.g. "Failed to add edge detection" on kernels without sysfs GPIO
+        logger.warning("GPIO edge detection unavailable, falling back to polling: %s", e)
+        return False
+    return True
+
+
+def _get_input_queue(on_event=None):
+    mode = os.getenv("INPUT_MODE", INPUT_MODE_EDGE)
+    if mode == INPUT_MODE_EDGE:
+        return InputEventQueue(on_event=on_event)
+    elif mode == INPUT_MODE_SAMPLER:
+        from app.input_sampler import InputSampler, SAMPLE_RATE, _can_sample
+        if not _can_sample():
+            logger.warning("No BCM283x/BCM2711 GPIO block to sample (e.g. a Pi 5), using edge callbacks")
+            return InputEventQueue(on_event=on_event)
+        rate = float(os.getenv("INPUT_SAMPLE_RATE", SAMPLE_RATE))
+        logger.debug("Sampling inputs at %g Hz", rate)
+        return InputSampler(rate=rate, on_event=on_event)
+    raise ValueError(f"Unknown input mode: {mode}")
+
 
 class ButtonInput:
     """
@@ -109,4 +163,154 @@ class JoystickInput:
         return list(current_active)
 
     def cleanup(self):
-        GPIO.cleanup()
\ No newline at end of file
+        GPIO.cleanup()
+
+
+class InputEventQueue:
+    """
+    Debounced press/release events for the pins of one or more inputs.
+
+    GPIO edge callbacks (running on the GPIO library's thread) append
+    InputEvent(name, pressed, timestamp) to a deque the main loop drains.
+    Both sides check a pin against its last reported state before emitting,
+    so that check and the emit share a lock; otherwise an edge during
+    drain() could report the same change twice. Timestamps are
+    time.monotonic() at the edge, so press durations do not depend on how
+    often the loop runs.
+
+    Edges within DEBOUNCE_TIME of the last accepted edge on a pin are
+    dropped. drain() then re-reads any pin that has been quiet for longer
+    than that and reports the level it settled on, which also covers
+    backends without edge detection (the queue then works by polling).
+    """
+
+    def __init__(self, debounce=DEBOUNCE_TIME, on_event=None):
+        self.debounce = debounce
+        self.on_event = on_event
+        self.edge_driven = True
+        self.bounces = 0
+        self._events = deque()
+        self._names = {}
+        self._pressed = {}
+        self._last_edge = {}
+        # Guards _pressed, _last_edge and bounces between the callback thread and drain()
+        self._lock = threading.Lock()
+
+    def watch(self, source):
+        """
+        Start reporting events for a ButtonInput/JoystickInput.
+        Returns True if edges are interrupt driven, False if drain() polls.
+        """
+        for name, pin in source._pin_mapping.items():
+            self._names[pin] = name
+            self._pressed[pin] = GPIO.input(pin) == GPIO.LOW
+            self._last_edge[pin] = float("-inf")
+        if not _watch_pins(source._pin_mapping.values(), self._edge):
+            self.edge_driven = False
+        return self.edge_driven
+
+    def start(self):
+        # Edges arrive through GPIO callbacks; there is nothing to run
+        pass
+
+    def close(self):
+        if hasattr(GPIO, "remove_event_detect"):
+            for channel in self._names:
+                GPIO.remove_event_detect(channel)
+
+    def _edge(self, channel):
+        now = time.monotonic()
+        with self._lock:
+            pressed = GPIO.input(channel) == GPIO.LOW
+            if pressed == self._pressed.get(channel):
+                return
+            if now - self._last_edge[channel] < self.debounce:
+                self.bounces += 1
+                return
+            self._emit(channel, pressed, now)
+        if self.on_event:
+            self.on_event()
+
+    def _emit(self, channel, pressed, timestamp):
+        # Called with _lock held
+        self._pressed[channel] = pressed
+        self._last_edge[channel] = timestamp
+        self._events.append(InputEvent(self._names[channel], pressed, timestamp))
+
+    def _settle(self):
+        # Report levels that changed without an accepted edge: dropped bounces
+        # that were real, or every change when there is no edge detection
+        emitted = False
+        with self._lock:
+            now = time.monotonic()
+            for channel in self._names:
+                pressed = GPIO.input(channel) == GPIO.LOW
+                if pressed == self._pressed[channel]:
+                    continue
+                if not self.edge_driven or now - self._last_edge[channel] >= self.debounce:
+                    self._emit(channel, pressed, now)
+                    emitted = True
+        if emitted and self.on_event:
+            self.on_event()
+
+    def drain(self):
+        """Return all events since the last drain, oldest first."""
+        self._settle()
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+    def is_pressed(self, name):
+        """Last reported state of an input, as of the events already queued."""
+        return any(self._pressed[pin] for pin, pin_name in self._names.items() if pin_name == name)
+
+    def pressed(self):
+        return sorted(self._names[pin] for pin, pressed in self._pressed.items() if pressed)
+
+
+class HoldRepeat:
+    """
+    Non-blocking hold-to-repeat for named inputs.
+
+    press() arms an input; due(now) returns the steps that have come due
+    since the last call: one step at the press itself, then repeats whose
+    rate and step size follow REPEAT_STAGES by how long the input has been
+    held. Nothing here sleeps; the caller wakes up at next_deadline().
+    """
+
+    def __init__(self, stages=REPEAT_STAGES):
+        self.stages = stages
+        self._held = {}
+
+    def press(self, name, timestamp):
+        # [pressed at, next step due at]
+        self._held[name] = [timestamp, timestamp]
+
+    def release(self, name):
+        self._held.pop(name, None)
+
+    def _stage(self, held_for):
+        current = self.stages[0]
+        for stage in self.stages:
+            if held_for >= stage[0]:
+                current = stage
+        return current
+
+    def due(self, now):
+        """Return [(name, steps)] for every held input with steps due by now."""
+        fired = []
+        for name, hold in self._held.items():
+            pressed_at, next_due = hold
+            steps = 0
+            while next_due <= now:
+                _, interval, step = self._stage(next_due - pressed_at)
+                steps += step
+                next_due += interval
+            hold[1] = next_due
+            if steps:
+                fired.append((name, steps))
+        return fired
+
+    def next_deadline(self):
+        return min((hold[1] for hold in self._held.values()), default=None)
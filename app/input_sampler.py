@@ -0,0 +1,195 @@
+import os
+import mmap
+import time
+import threading
+import logging
+from collections import deque, namedtuple
+from app.input import GPIO, InputEvent
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 500
+# Integrator saturation: a level has to hold for this many samples (10 ms at 500 Hz)
+DEBOUNCE_SAMPLES = 5
+
+# BCM283x/BCM2711 GPIO block, readable without root through /dev/gpiomem
+GPIOMEM_PATH = "/dev/gpiomem"
+GPLEV0_OFFSET = 0x34
+# The Pi 5 (BCM2712) also has /dev/gpiomem, but it maps the RP1 block, laid out differently
+DEVICE_TREE_COMPATIBLE = "/proc/device-tree/compatible"
+GPIOMEM_SOCS = (b"bcm2835", b"bcm2836", b"bcm2837", b"bcm2711")
+
+# pressed: bit i set when the i-th watched input is held (after debouncing)
+InputSnapshot = namedtuple("InputSnapshot", ["pressed", "timestamp", "samples"])
+
+
+def _mock_gpio():
+    return "features.steps.mocks" in getattr(GPIO, "__module__", "")
+
+
+def _gpiomem_soc(compatible_path=DEVICE_TREE_COMPATIBLE):
+    """Whether the device tree names a SoC whose GPLEV0 /dev/gpiomem maps."""
+    try:
+        with open(compatible_path, "rb") as f:
+            compatible = f.read()
+    except OSError:
+        return False
+    return any(soc in compatible for soc in GPIOMEM_SOCS)
+
+
+def _can_sample(path=GPIOMEM_PATH, compatible_path=DEVICE_TREE_COMPATIBLE):
+    """Whether InputSampler can read all pins in one load here; the mock GPIO is read pin by pin."""
+    return _mock_gpio() or (_gpiomem_soc(compatible_path) and os.path.exists(path))
+
+
+def _gpiomem_reader(path=GPIOMEM_PATH, compatible_path=DEVICE_TREE_COMPATIBLE):
+    """
+    Return a callable reading GPIO levels 0-31 as one 32-bit word (bit set =
+    high), or None if the register block cannot be mapped (not a Pi, a Pi 5,
+    or the mock GPIO is in use).
+    """
+    if _mock_gpio() or not _gpiomem_soc(compatible_path) or not os.path.exists(path):
+        return None
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_SYNC)
+        try:
+            mem = mmap.mmap(fd, mmap.PAGESIZE, mmap.MAP_SHARED, mmap.PROT_READ)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug("Cannot map %s, reading pins one by one: %s", path, e)
+        return None
+    # A uint32 view makes every read a single aligned word load
+    registers = memoryview(mem).cast("I")
+    index = GPLEV0_OFFSET // 4
+    return lambda: registers[index]
+
+
+def _pin_reader(pins):
+    """Fallback: build the same level word with one GPIO.input() per pin."""
+    def read():
+        levels = 0
+        for pin in pins:
+            if GPIO.input(pin):
+                levels |= 1 << pin
+        return levels
+    return read
+
+
+class InputSampler:
+    """
+    Reads every watched pin in one batch at a fixed rate on its own thread.
+
+    Each sample is a single word of pin levels (one register read through
+    /dev/gpiomem where possible). Every input runs an integrating debouncer
+    that counts towards DEBOUNCE_SAMPLES while the pin reads pressed and
+    towards 0 while it reads released; the debounced state only flips at
+    either end. The thread publishes an immutable InputSnapshot and queues
+    InputEvent records for each flip, so the controller reads inputs once
+    per loop without touching GPIO.
+
+    Same interface as InputEventQueue, which it replaces when INPUT_MODE is
+    "sampler" on a Pi with the BCM283x/BCM2711 GPIO block.
+    """
+
+    def __init__(self, rate=SAMPLE_RATE, debounce_samples=DEBOUNCE_SAMPLES, on_event=None, read_levels=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.debounce_samples = debounce_samples
+        self.on_event = on_event
+        # The sampler always wakes the consumer itself, no polling needed
+        self.edge_driven = True
+        self.bounces = 0
+        self.snapshot = InputSnapshot(0, 0.0, 0)
+        self._read_levels = read_levels
+        self._names = []
+        self._pins = []
+        self._integrators = []
+        self._events = deque()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, source):
+        for name, pin in source._pin_mapping.items():
+            self._names.append(name)
+            self._pins.append(pin)
+            pressed = GPIO.input(pin) == GPIO.LOW
+            self._integrators.append(self.debounce_samples if pressed else 0)
+            if pressed:
+                self.snapshot = self.snapshot._replace(pressed=self.snapshot.pressed | 1 << len(self._pins) - 1)
+        return True
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self._read_levels is None:
+            self._read_levels = _gpiomem_reader() or _pin_reader(self._pins)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="input-sampler", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        period = 1.0 / self.rate
+        next_sample = time.monotonic()
+        while not self._stop.is_set():
+            self.sample(time.monotonic())
+            next_sample += period
+            delay = next_sample - time.monotonic()
+            if delay < 0:
+                # Fell behind (e.g. scheduler hiccup): skip, do not burst
+                next_sample = time.monotonic()
+                delay = 0
+            self._stop.wait(delay)
+
+    def sample(self, now):
+        """Take one sample; normally called by the sampler thread."""
+        levels = self._read_levels()
+        pressed = self.snapshot.pressed
+        top = self.debounce_samples
+        flipped = False
+        for i, pin in enumerate(self._pins):
+            old = self._integrators[i]
+            if levels >> pin & 1:
+                count = old - 1 if old > 0 else 0
+            else:
+                count = old + 1 if old < top else top
+            if count == old:
+                continue
+            self._integrators[i] = count
+            bit = 1 << i
+            held = pressed & bit
+            if count == top and not held:
+                pressed |= bit
+            elif count == 0 and held:
+                pressed &= ~bit
+            else:
+                if count == (top if held else 0):
+                    # Went back to where it started without flipping
+                    self.bounces += 1
+                continue
+            self._events.append(InputEvent(self._names[i], not held, now))
+            flipped = True
+        self.snapshot = InputSnapshot(pressed, now, self.snapshot.samples + 1)
+        if flipped and self.on_event:
+            self.on_event()
+
+    def drain(self):
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+    def is_pressed(self, name):
+        pressed = self.snapshot.pressed
+        return any(pressed >> i & 1 for i, input_name in enumerate(self._names) if input_name == name)
+
+    def pressed(self):
+        pressed = self.snapshot.pressed
+        return sorted(name for i, name in enumerate(self._names) if pressed >> i & 1)
@@ -0,0 +1,197 @@
+"""
+Append-only journal of the timer's runtime state, so a power cut does not
+lose the running cycle.
+
+Each record is one line holding a CRC-32 and a compact JSON snapshot:
+
+    1a2b3c4d {"seq":12,"time":1700000000.0,"status":"OPEN",...}
+
+A cut can only tear the line being appended; restore() keeps the last
+record whose checksum matches and cuts the torn tail off. Once the file
+would grow past max_bytes it is compacted to the newest record with an
+atomic rename. Records that are not urgent are written at most once per
+interval, which bounds writes to the SD card however short the periods are.
+"""
+import os
+import json
+import time
+import zlib
+import logging
+from app.settings_store import write_text_atomic
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_FILE = "runtime.journal"
+# Minimum seconds between routine appends (transitions, running progress)
+DEFAULT_JOURNAL_INTERVAL = 30.0
+# Compact to a single record once the file would grow past this
+DEFAULT_JOURNAL_MAX_BYTES = 16 * 1024
+
+
+def _get_journal_config():
+    """(path, interval, max_bytes, catch_up) from JOURNAL_FILE, JOURNAL_INTERVAL, JOURNAL_MAX_BYTES and JOURNAL_CATCH_UP."""
+    return (os.getenv("JOURNAL_FILE", DEFAULT_JOURNAL_FILE),
+            float(os.getenv("JOURNAL_INTERVAL", DEFAULT_JOURNAL_INTERVAL)),
+            int(os.getenv("JOURNAL_MAX_BYTES", DEFAULT_JOURNAL_MAX_BYTES)),
+            os.getenv("JOURNAL_CATCH_UP", "0").lower() in ("1", "true", "yes", "on"))
+
+
+def _get_journal():
+    """The configured journal, or None when JOURNAL_FILE is empty."""
+    path, interval, max_bytes, catch_up = _get_journal_config()
+    if not path:
+        return None
+    return RuntimeJournal(path, interval=interval, max_bytes=max_bytes, catch_up=catch_up)
+
+
+def encode_record(seq, state):
+    payload = json.dumps({"seq": seq, **state}, separators=(",", ":"))
+    return f"{zlib.crc32(payload.encode()):08x} {payload}\n".encode()
+
+
+def decode_record(line):
+    """The record in one complete line (newline included), or None if it is torn or corrupt."""
+    if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        record = json.loads(payload)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) and isinstance(record.get("seq"), int) else None
+
+
+class RuntimeJournal:
+    """
+    record(state) keeps the newest state and appends it once interval has
+    passed since the last append; urgent states are appended straight
+    away. flush_deadline()/flush_if_due() let the main loop write a
+    pending state without polling, as with SettingsStore.
+
+    catch_up tells the timer to run through the time it was powered off
+    when it resumes, instead of carrying on from where it stopped.
+    """
+
+    def __init__(self, path, interval=DEFAULT_JOURNAL_INTERVAL, max_bytes=DEFAULT_JOURNAL_MAX_BYTES,
+                 catch_up=False, clock=None):
+        self.path = path
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.catch_up = catch_up
+        self._clock = clock
+        self.seq = 0
+        self._file = None
+        self._size = None
+        self._pending = None
+        self._last_append = None
+        self.appends = 0
+        self.coalesced = 0
+        self.compactions = 0
+        self.torn = 0
+
+    def now(self):
+        return self._clock() if self._clock else time.monotonic()
+
+    def restore(self, repair=True):
+        """
+        The newest intact state, or None. Cuts off anything after it, so
+        later appends follow a complete line; with repair False the file is
+        left alone, for readers alongside the running app.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self._size = 0
+            return None
+        state, valid = None, 0
+        for line in data.splitlines(keepends=True):
+            record = decode_record(line)
+            if record is None:
+                break
+            state, valid = record, valid + len(line)
+        if valid < len(data) and repair:
+            self.torn += 1
+            logger.warning("Runtime journal %s: dropping %d bytes of torn or corrupt tail",
+                           self.path, len(data) - valid)
+            os.truncate(self.path, valid)
+        self._size = valid
+        if state is None:
+            return None
+        self.seq = state.pop("seq")
+        return state
+
+    def record(self, state, urgent=False):
+        if self._pending is not None:
+            self.coalesced += 1
+        self._pending = state
+        if urgent or self.due():
+            self.flush()
+
+    def due(self, now=None):
+        """Whether a routine append may happen now."""
+        if self._last_append is None:
+            return True
+        return (self.now() if now is None else now) >= self._last_append + self.interval
+
+    def flush_deadline(self):
+        """When the pending state may be appended, or None if nothing is pending."""
+        if self._pending is None:
+            return None
+        return self.now() if self._last_append is None else self._last_append + self.interval
+
+    def flush_if_due(self, now=None):
+        if self._pending is None or not self.due(now):
+            return False
+        return self.flush()
+
+    def flush(self):
+        """Append the pending state now. Returns True if it was written."""
+        if self._pending is None:
+            return False
+        if self._size is None:
+            self.restore()
+        line = encode_record(self.seq + 1, self._pending)
+        try:
+            if self._size + len(line) > self.max_bytes:
+                self._compact(line)
+            else:
+                self._append(line)
+        except OSError as e:
+            logger.error("Failed to write runtime journal %s: %s", self.path, e)
+            self._close_file()
+            self._size = None
+            return False
+        self.seq += 1
+        self._pending = None
+        self._last_append = self.now()
+        self.appends += 1
+        return True
+
+    def _append(self, line):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._file.write(line)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._size += len(line)
+
+    def _compact(self, line):
+        self._close_file()
+        write_text_atomic(self.path, line.decode())
+        self._size = len(line)
+        self.compactions += 1
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._close_file()
+
+    def stats(self):
+        return {"appends": self.appends, "coalesced": self.coalesced, "compactions": self.compactions,
+                "torn": self.torn, "bytes": self._size or 0}
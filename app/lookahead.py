@@ -0,0 +1,124 @@
+"""
+Export upcoming timer transitions as CSV or iCalendar.
+
+Rows are written as TimerController.lookahead() produces them, so any
+horizon streams in constant memory:
+
+    python main.py lookahead --days 7 --format ics > week.ics
+"""
+import argparse
+import csv
+import itertools
+import sys
+import time
+from datetime import datetime, timezone
+from app.journal import _get_journal
+from app.timer import TimerController
+from app.timer_modes import to_period
+
+FORMAT_CSV = "csv"
+FORMAT_ICS = "ics"
+DEFAULT_COUNT = 10
+
+
+def within(transitions, count=None, until=None):
+    """The first count transitions, or those starting before until (a time.time() value)."""
+    if until is not None:
+        transitions = itertools.takewhile(lambda t: t.timestamp < until, transitions)
+    if count is not None:
+        transitions = itertools.islice(transitions, count)
+    return transitions
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="milliseconds")
+
+
+def write_csv(transitions, out):
+    writer = csv.writer(out)
+    writer.writerow(["timestamp", "status", "duration"])
+    rows = 0
+    for transition in transitions:
+        writer.writerow([_iso(transition.timestamp), transition.status, transition.duration])
+        rows += 1
+    return rows
+
+
+def _ics_time(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def write_ics(transitions, out):
+    """One VEVENT per period. iCalendar times are whole seconds; the exact duration is in the description."""
+    def line(text):
+        out.write(text + "\r\n")
+
+    stamp = _ics_time(time.time())
+    line("BEGIN:VCALENDAR")
+    line("VERSION:2.0")
+    line("PRODID:-//timer//lookahead//EN")
+    events = 0
+    for transition in transitions:
+        start = transition.timestamp
+        line("BEGIN:VEVENT")
+        line(f"UID:{int(start * 1000)}-{transition.status.lower()}@timer")
+        line(f"DTSTAMP:{stamp}")
+        line(f"DTSTART:{_ics_time(start)}")
+        line(f"DTEND:{_ics_time(start + transition.duration)}")
+        line(f"SUMMARY:{transition.status}")
+        line(f"DESCRIPTION:{transition.status} for {transition.duration} s")
+        line("END:VEVENT")
+        events += 1
+    line("END:VCALENDAR")
+    return events
+
+
+WRITERS = {FORMAT_CSV: write_csv, FORMAT_ICS: write_ics}
+
+
+def main(argv=None, out=None):
+    parser = argparse.ArgumentParser(
+        prog="main.py lookahead",
+        description="Stream upcoming OPEN/CLOSE transitions from the saved settings, carrying on from the "
+                    "state in JOURNAL_FILE (moved on to now if the timer was running) when there is one.")
+    parser.add_argument("--mode", choices=sorted(TimerController.MODE_HANDLERS),
+                        help="default: the journaled mode, else loop")
+    parser.add_argument("--open", type=float, help="OPEN base, seconds (default: settings)")
+    parser.add_argument("--close", type=float, help="CLOSE base, seconds (default: settings)")
+    parser.add_argument("--format", choices=sorted(WRITERS), default=FORMAT_CSV)
+    parser.add_argument("--seed", type=int, help="seed for random mode")
+    parser.add_argument("--reset", action="store_true", help="start from a reset timer, ignoring the journal")
+    horizon = parser.add_mutually_exclusive_group()
+    horizon.add_argument("--count", type=int, help=f"number of transitions (default {DEFAULT_COUNT})")
+    horizon.add_argument("--hours", type=float)
+    horizon.add_argument("--days", type=float)
+    args = parser.parse_args(argv)
+
+    for base in (args.open, args.close):
+        if base is not None and to_period(base) <= 0:
+            parser.error("periods must be positive")
+    timer = TimerController()
+    journal = None if args.reset else _get_journal()
+    # Read only: the running app owns the journal, and its timer has kept going since the record
+    resumed = journal is not None and timer.resume(journal.restore(repair=False), catch_up=True)
+    if args.open is not None:
+        timer._open_time_base = to_period(args.open)
+    if args.close is not None:
+        timer._close_time_base = to_period(args.close)
+    mode = args.mode or timer.mode
+    # Re-initializing would drop the resumed periods; only do it when something was changed
+    if not resumed or mode != timer.mode or args.open is not None or args.close is not None or args.seed is not None:
+        if mode == "random" and args.seed is not None:
+            timer.set_mode(mode, seed=args.seed)
+        else:
+            timer.set_mode(mode)
+
+    now = time.time()
+    until = None
+    if args.hours is not None:
+        until = now + args.hours * 3600
+    elif args.days is not None:
+        until = now + args.days * 86400
+    count = args.count if args.count is not None or until is not None else DEFAULT_COUNT
+    WRITERS[args.format](within(timer.lookahead(now), count=count, until=until), out or sys.stdout)
+    return 0
@@ -1,4 +1,35 @@
-import RPi.GPIO as GPIO
+import os
+import time
+import logging
+from collections import deque
+from app.input import GPIO
+from app.scheduler import _percentile
+
+logger = logging.getLogger(__name__)
+
+# Timer status -> output number, overridable with OUTPUT_MAP="OPEN=1,CLOSE=2"
+DEFAULT_OUTPUT_MAP = {"OPEN": 1, "CLOSE": 2}
+# Recent switch latencies kept for percentiles
+LATENCY_SAMPLES = 1000
+
+
+def _get_output_map():
+    """
+    Parse OUTPUT_MAP. A status left out drives no output, e.g. "OPEN=1"
+    energizes output 1 while open and nothing while closed.
+    """
+    spec = os.getenv("OUTPUT_MAP")
+    if not spec:
+        return dict(DEFAULT_OUTPUT_MAP)
+    mapping = {}
+    for entry in spec.split(","):
+        status, _, number = entry.partition("=")
+        status = status.strip().upper()
+        if status not in DEFAULT_OUTPUT_MAP or not number.strip().isdigit():
+            raise ValueError(f"Invalid OUTPUT_MAP entry: {entry!r}")
+        mapping[status] = int(number)
+    return mapping
+
 
 class Output:
     """
@@ -8,6 +39,11 @@ class Output:
         out.set_state(1, True)  # Turn relay 1 ON
         out.set_state(2, False) # Turn relay 2 OFF
         out.cleanup()
+
+    show(status, enabled) energizes the output mapped to the timer status
+    and releases the others. TimerController calls it from the same call
+    that changes status; with since= (the time the period ended) it also
+    records how long the pin change came after the boundary.
     """
     # GPIO pins for the outputs (change if you want different pins)
     _pin_mapping = {
@@ -15,13 +51,22 @@ class Output:
         2: 17,  # Output 2 on GPIO17
     }
 
-    def __init__(self):
+    def __init__(self, status_map=None):
+        self.status_map = _get_output_map() if status_map is None else dict(status_map)
+        for status, number in self.status_map.items():
+            if number not in self._pin_mapping:
+                raise ValueError(f"Invalid output number for {status}: {number}")
         GPIO.setmode(GPIO.BCM)
         for pin in self._pin_mapping.values():
             GPIO.setup(pin, GPIO.OUT)
         # Optional: set initial state (both OFF)
         for pin in self._pin_mapping.values():
             GPIO.output(pin, GPIO.LOW)
+        self._states = {number: False for number in self._pin_mapping}
+        self.switches = 0
+        self.last_latency = None
+        self.max_latency = 0.0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
 
     def set_state(self, output_number, state):
         """
@@ -33,6 +78,7 @@ class Output:
         if pin is None:
             raise ValueError(f"Invalid output number: {output_number}")
         GPIO.output(pin, GPIO.HIGH if state else GPIO.LOW)
+        self._states[output_number] = bool(state)
 
     def get_state(self, output_number):
         """
@@ -44,5 +90,44 @@ class Output:
             raise ValueError(f"Invalid output number: {output_number}")
         return GPIO.input(pin) == GPIO.HIGH
 
+    def show(self, status, enabled=True, since=None):
+        """
+        Drive the outputs for a timer status: only the mapped output is on,
+        and nothing is while the timer is disabled. Pins already in the
+        right state are not written. since is a time.monotonic() value.
+        """
+        active = self.status_map.get(status) if enabled else None
+        changed = False
+        # Break before make, so the two relays are never on together
+        for number, state in self._states.items():
+            if state and number != active:
+                self.set_state(number, False)
+                changed = True
+        if active is not None and not self._states[active]:
+            self.set_state(active, True)
+            changed = True
+        if changed:
+            self.switches += 1
+            if since is not None:
+                self._record_latency(time.monotonic() - since)
+        return changed
+
+    def _record_latency(self, latency):
+        latency = max(0.0, latency)
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self._latencies.append(latency)
+
+    def stats(self):
+        return {
+            "switches": self.switches,
+            "timed_switches": len(self._latencies),
+            "p50_latency_ms": round(_percentile(self._latencies, 50) * 1000, 3),
+            "p99_latency_ms": round(_percentile(self._latencies, 99) * 1000, 3),
+            "max_latency_ms": round(self.max_latency * 1000, 3),
+        }
+
     def cleanup(self):
-        GPIO.cleanup()
\ No newline at end of file
+        for number in self._pin_mapping:
+            self.set_state(number, False)
+        GPIO.cleanup()
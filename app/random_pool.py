@@ -0,0 +1,131 @@
+import os
+import logging
+import numpy as np
+from app.timer_modes import random_period_bounds, to_period
+
+logger = logging.getLogger(__name__)
+
+DISTRIBUTION_UNIFORM = "uniform"
+DISTRIBUTION_EXPONENTIAL = "exponential"
+DISTRIBUTION_NORMAL = "normal"
+DISTRIBUTION_WEIGHTED = "weighted"
+DISTRIBUTIONS = (DISTRIBUTION_UNIFORM, DISTRIBUTION_EXPONENTIAL, DISTRIBUTION_NORMAL, DISTRIBUTION_WEIGHTED)
+
+# Periods generated per refill
+POOL_SIZE = 256
+# Exponential scale and normal spread, as fractions of the draw range
+EXPONENTIAL_SCALE = 1 / 3
+NORMAL_SIGMA = 1 / 6
+
+
+def _get_random_config():
+    """(seed, distribution, weights) from RANDOM_SEED, RANDOM_DISTRIBUTION and RANDOM_WEIGHTS."""
+    seed = os.getenv("RANDOM_SEED")
+    distribution = os.getenv("RANDOM_DISTRIBUTION", DISTRIBUTION_UNIFORM)
+    weights = os.getenv("RANDOM_WEIGHTS")
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown random distribution: {distribution}")
+    return (int(seed) if seed else None,
+            distribution,
+            [float(w) for w in weights.split(",")] if weights else None)
+
+
+def _check_weights(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim != 1 or not weights.size or (weights < 0).any() or not weights.sum() > 0:
+        raise ValueError("weights must be a non-empty list of non-negative numbers with a positive sum")
+    return weights / weights.sum()
+
+
+def _draw_units(rng, low, high, size, distribution, weights):
+    """size integers in [low, high] following distribution."""
+    span = high - low
+    if distribution == DISTRIBUTION_UNIFORM or span == 0:
+        return rng.integers(low, high, size=size, endpoint=True)
+    if distribution == DISTRIBUTION_EXPONENTIAL:
+        # Inverse CDF of an exponential truncated to [0, span + 1), so no draws are wasted
+        scale = (span + 1) * EXPONENTIAL_SCALE
+        tail = 1.0 - np.exp(-(span + 1) / scale)
+        values = -scale * np.log1p(-rng.random(size) * tail)
+        return low + np.minimum(values.astype(np.int64), span)
+    if distribution == DISTRIBUTION_NORMAL:
+        # Rejection-sample a normal centred on the range, truncated to it
+        centre, sigma = low + span / 2, max(span * NORMAL_SIGMA, 0.5)
+        out = np.empty(0, dtype=np.int64)
+        while out.size < size:
+            values = np.rint(rng.normal(centre, sigma, size=2 * (size - out.size) + 16)).astype(np.int64)
+            out = np.concatenate([out, values[(values >= low) & (values <= high)]])
+        return out[:size]
+    if distribution == DISTRIBUTION_WEIGHTED:
+        # Split the range into len(weights) equal bands; pick a band, then uniformly within it
+        probabilities = _check_weights(weights)
+        edges = np.linspace(low, high + 1, probabilities.size + 1)
+        bands = rng.choice(probabilities.size, size=size, p=probabilities)
+        values = edges[bands] + rng.random(size) * (edges[bands + 1] - edges[bands])
+        return np.clip(values.astype(np.int64), low, high)
+    raise ValueError(f"Unknown random distribution: {distribution}")
+
+
+def sample_periods(rng, base, size, distribution=DISTRIBUTION_UNIFORM, weights=None):
+    """
+    size random periods for base, in seconds, drawn with rng (a NumPy
+    Generator) between the bounds random mode uses (random_period_bounds).
+    """
+    low, high, divisor = random_period_bounds(base)
+    units = _draw_units(rng, low, high, size, distribution, weights)
+    return units if divisor == 1 else units / divisor
+
+
+class PeriodPool:
+    """
+    Random periods for one base, generated POOL_SIZE at a time.
+
+    Drawing is a list pop; the generator only runs once per refill. The
+    pool remembers the base it was filled for and throws the rest away
+    when asked for a different one, so changing a base time takes effect
+    on the very next draw.
+    """
+
+    def __init__(self, rng, distribution=DISTRIBUTION_UNIFORM, weights=None, size=POOL_SIZE):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown random distribution: {distribution}")
+        if distribution == DISTRIBUTION_WEIGHTED:
+            _check_weights(weights)
+        self.rng = rng
+        self.distribution = distribution
+        self.weights = weights
+        self.size = size
+        self.base = None
+        self._values = []
+        self.draws = 0
+        self.refills = 0
+        self.invalidations = 0
+
+    def copy(self, rng):
+        """A pool holding the same pending periods, refilling from rng."""
+        pool = PeriodPool(rng, self.distribution, self.weights, self.size)
+        pool.base = self.base
+        pool._values = list(self._values)
+        return pool
+
+    def invalidate(self):
+        if self._values:
+            self.invalidations += 1
+        self._values = []
+        self.base = None
+
+    def draw(self, base):
+        base = to_period(base)
+        if base != self.base:
+            self.invalidate()
+            self.base = base
+        if not self._values:
+            self._refill()
+        self.draws += 1
+        return self._values.pop()
+
+    def _refill(self):
+        values = sample_periods(self.rng, self.base, self.size, self.distribution, self.weights)
+        # Plain Python numbers, whole seconds as ints; reversed so pop() keeps generation order
+        self._values = [to_period(v) for v in values.tolist()][::-1]
+        self.refills += 1
@@ -0,0 +1,116 @@
+import time
+import threading
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on a single sleep, so a lost wake-up only costs this much
+DEFAULT_MAX_SLEEP = 1.0
+# Precise waits sleep until this long before the deadline, then spin
+SPIN_THRESHOLD = 0.002
+# Recent transition lateness values kept for percentiles
+LATENESS_SAMPLES = 1000
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of an unsorted sequence (0.0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+class DeadlineScheduler:
+    """
+    Sleeps until the next deadline the caller asks for, or until wake() is
+    called from another thread (GPIO edge callbacks, shutdown).
+
+    Also keeps the numbers needed to tune the main loop: how often it wakes
+    up, what woke it, and how late timer transitions were handled relative
+    to when they were due.
+
+    OS sleeps overshoot by a millisecond or more, so waits for deadlines
+    that need to be hit exactly (timer transitions) can be made precise:
+    they sleep until spin_threshold before the deadline and busy-wait the
+    rest.
+    """
+
+    def __init__(self, clock=None, max_sleep=DEFAULT_MAX_SLEEP, spin_threshold=SPIN_THRESHOLD):
+        self._clock = clock
+        self.max_sleep = max_sleep
+        self.spin_threshold = spin_threshold
+        self._event = threading.Event()
+        self.started = self.now()
+        self.wakeups = 0
+        self.woken_by_event = 0
+        self.transitions = 0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+        self._lateness = deque(maxlen=LATENESS_SAMPLES)
+
+    def now(self):
+        # Looked up per call so a patched time.monotonic is honoured
+        return self._clock() if self._clock else time.monotonic()
+
+    def wake(self):
+        """Cut the current sleep short. Safe to call from any thread."""
+        self._event.set()
+
+    def wait_until(self, deadline, precise=False):
+        """
+        Sleep until deadline (a clock() value), max_sleep, or wake().
+        With precise=True the last spin_threshold before the deadline is
+        spent spinning instead of sleeping. Returns True if woken early by
+        wake().
+        """
+        timeout = None if deadline is None else max(0.0, deadline - self.now())
+        if self.max_sleep is not None:
+            timeout = self.max_sleep if timeout is None else min(timeout, self.max_sleep)
+        if precise and deadline is not None and timeout > 0:
+            woken = self._precise_wait(min(deadline, self.now() + timeout))
+        else:
+            woken = self._event.is_set() if timeout == 0 else self._event.wait(timeout)
+        self._event.clear()
+        self.record_wakeup(woken)
+        return woken
+
+    def _precise_wait(self, deadline):
+        coarse = deadline - self.now() - self.spin_threshold
+        if coarse > 0 and self._event.wait(coarse):
+            return True
+        while self.now() < deadline:
+            if self._event.is_set():
+                return True
+        return self._event.is_set()
+
+    def record_wakeup(self, woken=False):
+        """Count a wake-up that happened outside wait_until (e.g. an asyncio task)."""
+        self.wakeups += 1
+        if woken:
+            self.woken_by_event += 1
+
+    def record_transition(self, due, handled):
+        lateness = max(0.0, handled - due)
+        self.transitions += 1
+        self.total_lateness += lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+        self._lateness.append(lateness)
+        if lateness > 0.05:
+            logger.debug("Timer transition handled %.1f ms late", lateness * 1000)
+
+    def wakeups_per_minute(self):
+        elapsed = self.now() - self.started
+        return self.wakeups * 60.0 / elapsed if elapsed > 0 else 0.0
+
+    def stats(self):
+        return {
+            "wakeups": self.wakeups,
+            "wakeups_per_minute": round(self.wakeups_per_minute(), 1),
+            "woken_by_event": self.woken_by_event,
+            "transitions": self.transitions,
+            "mean_lateness_ms": round(self.total_lateness / self.transitions * 1000, 3) if self.transitions else 0.0,
+            "p50_lateness_ms": round(_percentile(self._lateness, 50) * 1000, 3),
+            "p99_lateness_ms": round(_percentile(self._lateness, 99) * 1000, 3),
+            "max_lateness_ms": round(self.max_lateness * 1000, 3),
+        }
@@ -0,0 +1,357 @@
+import os
+import json
+import time
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Seconds without further changes before pending settings are written
+DEFAULT_FLUSH_DELAY = 2.0
+
+BACKEND_JSON = "json"
+BACKEND_SQLITE = "sqlite"
+BACKEND_MEMORY = "memory"
+DEFAULT_SETTINGS_FILES = {BACKEND_JSON: "settings.json", BACKEND_SQLITE: "settings.db"}
+
+# What a named profile stores; seed is None outside random mode
+PROFILE_FIELDS = ("mode", "open_time", "close_time", "seed")
+
+
+def _get_flush_delay():
+    return float(os.getenv("SETTINGS_FLUSH_DELAY", DEFAULT_FLUSH_DELAY))
+
+
+def _get_settings_backend():
+    """Backend named by SETTINGS_BACKEND, at SETTINGS_FILE (default per backend)."""
+    kind = os.getenv("SETTINGS_BACKEND", BACKEND_JSON)
+    if kind == BACKEND_MEMORY:
+        return MemoryBackend()
+    if kind not in DEFAULT_SETTINGS_FILES:
+        raise ValueError(f"Unknown settings backend: {kind}")
+    path = os.getenv("SETTINGS_FILE", DEFAULT_SETTINGS_FILES[kind])
+    if kind == BACKEND_SQLITE:
+        return SqliteBackend(path)
+    return JsonFileBackend(path)
+
+
+def _get_settings_store(delay=None):
+    return SettingsStore(_get_settings_backend(), delay=delay)
+
+
+def write_text_atomic(path, text):
+    """
+    Replace path with text without ever leaving a partial file: write a
+    temp file next to it, fsync it, rename it over path, then fsync the
+    directory so the rename itself survives a power cut.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Some filesystems cannot fsync a directory
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, data):
+    """Replace path with data as JSON, atomically (see write_text_atomic)."""
+    write_text_atomic(path, json.dumps(data))
+
+
+def _check_object(data):
+    if not isinstance(data, dict):
+        raise ValueError("settings do not hold an object")
+    return data
+
+
+class JsonFileBackend:
+    """
+    Settings in one JSON file, as settings.json has always been. Profiles
+    live in a second file beside it (settings.profiles.json), read once
+    and then looked up in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.profiles_path = f"{os.path.splitext(path)[0]}.profiles.json"
+        self._profiles = None
+
+    def __repr__(self):
+        return f"JsonFileBackend({self.path!r})"
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        """The saved settings, or None if there are none."""
+        try:
+            with open(self.path, "r") as f:
+                return _check_object(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def write(self, data):
+        write_atomic(self.path, data)
+
+    def delete(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _profile_map(self):
+        if self._profiles is None:
+            try:
+                with open(self.profiles_path, "r") as f:
+                    self._profiles = _check_object(json.load(f))
+            except FileNotFoundError:
+                self._profiles = {}
+        return self._profiles
+
+    def profile_names(self):
+        return sorted(self._profile_map())
+
+    def read_profile(self, name):
+        data = self._profile_map().get(name)
+        return dict(data) if data is not None else None
+
+    def write_profile(self, name, data):
+        profiles = dict(self._profile_map())
+        profiles[name] = dict(data)
+        write_atomic(self.profiles_path, profiles)
+        self._profiles = profiles
+
+    def delete_profile(self, name):
+        if name not in self._profile_map():
+            return False
+        profiles = dict(self._profiles)
+        del profiles[name]
+        write_atomic(self.profiles_path, profiles)
+        self._profiles = profiles
+        return True
+
+    def close(self):
+        pass
+
+
+class SqliteBackend:
+    """
+    Settings and profiles in one SQLite database. Profiles are rows of a
+    WITHOUT ROWID table keyed by name, so switching to one is a single
+    primary-key lookup however many presets are stored.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS settings (id INTEGER PRIMARY KEY CHECK (id = 0), data TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS profiles ("
+        " name TEXT PRIMARY KEY,"
+        " mode TEXT NOT NULL,"
+        " open_time REAL NOT NULL,"
+        " close_time REAL NOT NULL,"
+        " seed INTEGER"
+        ") WITHOUT ROWID",
+    )
+
+    def __init__(self, path):
+        self.path = path
+        # The async runtime opens this on its display-bus thread; calls never overlap
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            for statement in self.SCHEMA:
+                self._db.execute(statement)
+
+    def __repr__(self):
+        return f"SqliteBackend({self.path!r})"
+
+    def exists(self):
+        return self._db.execute("SELECT 1 FROM settings WHERE id = 0").fetchone() is not None
+
+    def read(self):
+        row = self._db.execute("SELECT data FROM settings WHERE id = 0").fetchone()
+        return _check_object(json.loads(row[0])) if row else None
+
+    def write(self, data):
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO settings (id, data) VALUES (0, ?)", (json.dumps(data),))
+
+    def delete(self):
+        with self._db:
+            self._db.execute("DELETE FROM settings")
+
+    def profile_names(self):
+        return [name for name, in self._db.execute("SELECT name FROM profiles ORDER BY name")]
+
+    def read_profile(self, name):
+        row = self._db.execute(
+            "SELECT mode, open_time, close_time, seed FROM profiles WHERE name = ?", (name,)).fetchone()
+        return dict(zip(PROFILE_FIELDS, row)) if row else None
+
+    def write_profile(self, name, data):
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO profiles (name, mode, open_time, close_time, seed) VALUES (?, ?, ?, ?, ?)",
+                (name, *(data.get(field) for field in PROFILE_FIELDS)))
+
+    def delete_profile(self, name):
+        with self._db:
+            return self._db.execute("DELETE FROM profiles WHERE name = ?", (name,)).rowcount > 0
+
+    def close(self):
+        self._db.close()
+
+
+class MemoryBackend:
+    """Settings kept in this object only, for tests and simulations."""
+
+    def __init__(self):
+        self._data = None
+        self._profiles = {}
+
+    def __repr__(self):
+        return "MemoryBackend()"
+
+    def exists(self):
+        return self._data is not None
+
+    def read(self):
+        return dict(self._data) if self._data is not None else None
+
+    def write(self, data):
+        self._data = dict(data)
+
+    def delete(self):
+        self._data = None
+
+    def profile_names(self):
+        return sorted(self._profiles)
+
+    def read_profile(self, name):
+        data = self._profiles.get(name)
+        return dict(data) if data is not None else None
+
+    def write_profile(self, name, data):
+        self._profiles[name] = dict(data)
+
+    def delete_profile(self, name):
+        return self._profiles.pop(name, None) is not None
+
+    def close(self):
+        pass
+
+
+class SettingsStore:
+    """
+    Write-behind settings on top of a backend (JsonFileBackend,
+    SqliteBackend or MemoryBackend).
+
+    save() only keeps the data in memory; it is written once no further
+    save() has come in for delay seconds (flush_if_due), or straight away
+    with flush(). Reads see pending data. A delay of 0 writes through on
+    every save(). Profiles are rare, deliberate changes and go straight
+    to the backend.
+
+    writes counts backend writes actually made, coalesced the saves that
+    were folded into a later write instead.
+    """
+
+    def __init__(self, backend, delay=None, clock=None):
+        self.backend = backend
+        self.delay = _get_flush_delay() if delay is None else delay
+        self._clock = clock
+        self._pending = None
+        self._changed_at = None
+        self.saves = 0
+        self.writes = 0
+        self.coalesced = 0
+
+    def now(self):
+        return self._clock() if self._clock else time.monotonic()
+
+    @property
+    def dirty(self):
+        return self._pending is not None
+
+    def load(self):
+        """
+        The current settings: pending data if any, else what the backend
+        holds, or None if nothing was ever saved. Raises
+        json.JSONDecodeError or ValueError for unreadable settings.
+        """
+        if self._pending is not None:
+            return dict(self._pending)
+        return self.backend.read()
+
+    def exists(self):
+        return self._pending is not None or self.backend.exists()
+
+    def save(self, data):
+        self.saves += 1
+        if self._pending is not None:
+            self.coalesced += 1
+        self._pending = dict(data)
+        self._changed_at = self.now()
+        if self.delay <= 0:
+            self.flush()
+
+    def flush_deadline(self):
+        """When pending data becomes due to be written, or None if nothing is pending."""
+        if self._pending is None:
+            return None
+        return self._changed_at + self.delay
+
+    def flush_if_due(self, now=None):
+        deadline = self.flush_deadline()
+        if deadline is None or (self.now() if now is None else now) < deadline:
+            return False
+        return self.flush()
+
+    def flush(self):
+        """Write pending data now. Returns True if it was written."""
+        if self._pending is None:
+            return False
+        try:
+            self.backend.write(self._pending)
+        except (OSError, sqlite3.Error) as e:
+            # Keep the data pending; the next flush tries again
+            logger.error("Failed to write settings to %r: %s", self.backend, e)
+            self._changed_at = self.now()
+            return False
+        self._pending = None
+        self._changed_at = None
+        self.writes += 1
+        return True
+
+    def clear(self):
+        """Drop pending data and the saved settings. Profiles are kept."""
+        self._pending = None
+        self._changed_at = None
+        self.backend.delete()
+
+    def profiles(self):
+        return self.backend.profile_names()
+
+    def load_profile(self, name):
+        """The profile's PROFILE_FIELDS, or None if there is no such profile."""
+        return self.backend.read_profile(name)
+
+    def save_profile(self, name, data):
+        self.backend.write_profile(name, data)
+
+    def delete_profile(self, name):
+        return self.backend.delete_profile(name)
+
+    def close(self):
+        self.backend.close()
+
+    def stats(self):
+        return {"saves": self.saves, "writes": self.writes, "coalesced": self.coalesced, "pending": self.dirty}
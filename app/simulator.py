@@ -0,0 +1,211 @@
+"""
+Offline simulation of loop and random schedules.
+
+Produces the sequence of OPEN/CLOSE periods a mode handler would go
+through, millions at a time, without running the timer. Random periods
+come from the same sampling code as RandomModeHandler's pools
+(app.random_pool.sample_periods), so the statistics match the live
+timer; OPEN and CLOSE are drawn as two blocks rather than interleaved,
+so a seed gives a different sequence than the live handler.
+
+    python main.py simulate --mode random --open 10 --close 20 --weeks 4
+"""
+import argparse
+import math
+import numpy as np
+from app.random_pool import DISTRIBUTIONS, DISTRIBUTION_UNIFORM, sample_periods
+from app.timer import TimerController
+from app.timer_modes import random_period_bounds, to_period
+
+DEFAULT_PERIODS = 1_000_000
+HISTOGRAM_BINS = 20
+
+
+def simulate(mode, open_base, close_base, periods=DEFAULT_PERIODS, seed=None, start="OPEN", duration=None,
+             distribution=DISTRIBUTION_UNIFORM, weights=None):
+    """
+    Simulate periods periods (or, with duration, as many as fill duration
+    seconds) starting with a start period. Returns a Simulation.
+    """
+    if mode not in TimerController.MODE_HANDLERS:
+        raise ValueError(f"Unknown mode: {mode}")
+    if start not in ("OPEN", "CLOSE"):
+        raise ValueError(f"Unknown status: {start}")
+    open_base, close_base = to_period(open_base), to_period(close_base)
+    if open_base <= 0 or close_base <= 0:
+        raise ValueError("periods must be positive")
+    if duration is not None:
+        if duration <= 0:
+            raise ValueError("duration must be positive")
+        periods = _periods_for(mode, open_base, close_base, duration, distribution, weights)
+    if periods <= 0:
+        raise ValueError("periods must be positive")
+
+    # Period i is OPEN when i has the parity of the start status
+    first_open = start == "OPEN"
+    is_open = np.zeros(periods, dtype=bool)
+    is_open[0 if first_open else 1::2] = True
+    n_open = int(is_open.sum())
+    durations = np.empty(periods, dtype=np.float64)
+    if mode == "loop":
+        durations[is_open] = open_base
+        durations[~is_open] = close_base
+    else:
+        rng = np.random.default_rng(seed)
+        durations[is_open] = sample_periods(rng, open_base, n_open, distribution, weights)
+        durations[~is_open] = sample_periods(rng, close_base, periods - n_open, distribution, weights)
+
+    if duration is not None:
+        ends = np.cumsum(durations)
+        count = int(np.searchsorted(ends, duration, side="left")) + 1
+        if count > periods:
+            # Unlucky draws fell short of duration; retry with room to spare
+            return simulate(mode, open_base, close_base, periods=periods * 2, seed=seed, start=start,
+                            duration=duration, distribution=distribution, weights=weights)
+        is_open, durations = is_open[:count], durations[:count].copy()
+        # The last period is cut off at duration
+        durations[-1] -= ends[count - 1] - duration
+    return Simulation(mode, open_base, close_base, is_open, durations)
+
+
+def _periods_for(mode, open_base, close_base, duration, distribution, weights):
+    if mode == "loop":
+        mean = open_base + close_base
+    else:
+        # Estimate the mean cycle from a pilot sample (distributions can be skewed)
+        rng = np.random.default_rng(0)
+        mean = sum(float(sample_periods(rng, base, 10000, distribution, weights).mean())
+                   for base in (open_base, close_base))
+    # Two periods per mean cycle plus slack; simulate() retries if that falls short
+    return math.ceil(duration / mean * 2 * 1.1) + 2
+
+
+class Simulation:
+    """Periods produced by simulate(): is_open[i] and durations[i] in seconds."""
+
+    def __init__(self, mode, open_base, close_base, is_open, durations):
+        self.mode = mode
+        self.open_base = open_base
+        self.close_base = close_base
+        self.is_open = is_open
+        self.durations = durations
+
+    def __len__(self):
+        return len(self.durations)
+
+    def periods(self, status):
+        return self.durations[self.is_open] if status == "OPEN" else self.durations[~self.is_open]
+
+    @property
+    def total_time(self):
+        return float(self.durations.sum())
+
+    @property
+    def open_time(self):
+        return float(self.periods("OPEN").sum())
+
+    @property
+    def close_time(self):
+        return float(self.periods("CLOSE").sum())
+
+    @property
+    def duty_cycle(self):
+        """Fraction of the time spent OPEN."""
+        total = self.total_time
+        return self.open_time / total if total else 0.0
+
+    def histogram(self, status, bins=HISTOGRAM_BINS):
+        """(counts, edges) of the status periods; whole-second draws get one bin per second."""
+        values = self.periods(status)
+        base = self.open_base if status == "OPEN" else self.close_base
+        if self.mode == "random":
+            low, high, divisor = random_period_bounds(base)
+            if divisor == 1 and high - low < 200:
+                bins = np.arange(low - 0.5, high + 1.5)
+        return np.histogram(values, bins=bins)
+
+    def longest(self, status):
+        """Longest uninterrupted status run (one period, as OPEN and CLOSE alternate)."""
+        values = self.periods(status)
+        return float(values.max()) if values.size else 0.0
+
+    def longest_count(self, status):
+        values = self.periods(status)
+        return int(np.count_nonzero(values == values.max())) if values.size else 0
+
+    def summary(self):
+        result = {
+            "mode": self.mode,
+            "periods": len(self),
+            "total_time": round(self.total_time, 3),
+            "duty_cycle": round(self.duty_cycle, 6),
+            "transitions": max(0, len(self) - 1),
+        }
+        for status in ("OPEN", "CLOSE"):
+            values = self.periods(status)
+            key = status.lower()
+            result[f"{key}_periods"] = int(values.size)
+            result[f"{key}_time"] = round(float(values.sum()), 3)
+            result[f"{key}_mean"] = round(float(values.mean()), 3) if values.size else 0.0
+            result[f"{key}_longest"] = round(self.longest(status), 3)
+        return result
+
+
+def _format_duration(seconds):
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{int(days)}d {int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+
+def report(simulation, bins=HISTOGRAM_BINS, width=40):
+    summary = simulation.summary()
+    lines = [
+        f"mode {summary['mode']}, bases open {simulation.open_base} s / close {simulation.close_base} s",
+        f"periods {summary['periods']}, simulated {_format_duration(summary['total_time'])}, "
+        f"duty cycle {summary['duty_cycle']:.2%}",
+    ]
+    for status in ("OPEN", "CLOSE"):
+        key = status.lower()
+        lines.append("")
+        lines.append(f"{status}: {summary[f'{key}_periods']} periods, total {_format_duration(summary[f'{key}_time'])}, "
+                     f"mean {summary[f'{key}_mean']:.3f} s, longest {summary[f'{key}_longest']:g} s "
+                     f"({simulation.longest_count(status)} times)")
+        counts, edges = simulation.histogram(status, bins=bins)
+        peak = counts.max() if counts.size else 0
+        for count, low, high in zip(counts, edges, edges[1:]):
+            bar = "#" * (round(count / peak * width) if peak else 0)
+            lines.append(f"  {low:9.3f} - {high:9.3f}  {count:9d}  {bar}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py simulate", description="Simulate timer schedules offline.")
+    parser.add_argument("--mode", choices=sorted(TimerController.MODE_HANDLERS), default="random")
+    parser.add_argument("--open", type=float, default=TimerController.DEFAULT_OPEN_TIME, help="OPEN base, seconds")
+    parser.add_argument("--close", type=float, default=TimerController.DEFAULT_CLOSE_TIME, help="CLOSE base, seconds")
+    parser.add_argument("--start", choices=("OPEN", "CLOSE"), default="OPEN")
+    length = parser.add_mutually_exclusive_group()
+    length.add_argument("--periods", type=int, default=DEFAULT_PERIODS)
+    length.add_argument("--days", type=float, help="simulate this many days instead of a period count")
+    length.add_argument("--weeks", type=float, help="simulate this many weeks instead of a period count")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default=DISTRIBUTION_UNIFORM)
+    parser.add_argument("--weights", type=lambda v: [float(w) for w in v.split(",")],
+                        help="comma-separated band weights for --distribution weighted")
+    parser.add_argument("--bins", type=int, default=HISTOGRAM_BINS)
+    args = parser.parse_args(argv)
+
+    duration = None
+    if args.days is not None:
+        duration = args.days * 86400
+    elif args.weeks is not None:
+        duration = args.weeks * 7 * 86400
+    try:
+        simulation = simulate(args.mode, args.open, args.close, periods=args.periods, seed=args.seed,
+                              start=args.start, duration=duration, distribution=args.distribution,
+                              weights=args.weights)
+    except ValueError as e:
+        parser.error(str(e))
+    print(report(simulation, bins=args.bins))
+    return 0
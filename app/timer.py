@@ -1,12 +1,15 @@
 import time
-import os
 import json
 import logging
-from app.timer_modes import LoopModeHandler, RandomModeHandler
+from collections import namedtuple
+from app.settings_store import _get_settings_store
+from app.timer_modes import LoopModeHandler, RandomModeHandler, to_period
 
-SETTINGS_FILE = "settings.json"
 logger = logging.getLogger(__name__)
 
+# One upcoming transition: at timestamp (time.time()) the timer enters status for duration seconds
+Transition = namedtuple("Transition", ["timestamp", "status", "duration"])
+
 class TimerController:
     DEFAULT_OPEN_TIME = 5
     DEFAULT_CLOSE_TIME = 5
@@ -17,7 +20,15 @@ class TimerController:
         # Add future modes here!
     }
 
-    def __init__(self):
+    def __init__(self, output=None, settings=None, journal=None, transition_log=None):
+        # Relays following the status (app.output.Output); None drives nothing
+        self.output = output
+        # Where transitions are recorded (app.transition_log.TransitionLog); None records nothing
+        self.transition_log = transition_log
+        # Runtime state journal (app.journal.RuntimeJournal); attached once start-up has resumed from it
+        self.journal = None
+        # Where settings persist (SETTINGS_BACKEND); by default every save is written straight through
+        self.settings = settings if settings is not None else _get_settings_store(delay=0)
         self.open_time = self.DEFAULT_OPEN_TIME
         self.close_time = self.DEFAULT_CLOSE_TIME
         self.status = "OPEN"
@@ -26,23 +37,111 @@ class TimerController:
         self.elapsed = 0
         self.last_update_time = time.monotonic()
         self.show_zero = False
+        # Time already spent past the boundary the zero frame is shown for
+        self._overshoot = 0.0
+        # time.monotonic() at which that boundary was reached
+        self._boundary_time = None
         self._last_state = {}
         self._open_time_base = self.open_time
         self._close_time_base = self.close_time
         self.next_time = None
+        # Name of the profile last switched to, if any
+        self.profile = None
 
         self.set_mode(self.mode)
         self.load_settings()
+        if journal is not None:
+            self.resume(journal.restore(), catch_up=journal.catch_up)
+            self.journal = journal
+            self._record_runtime(urgent=True)
         logger.debug(
             f"TimerController initialized: open={self.open_time}, close={self.close_time}, status={self.status}, mode={self.mode}")
 
-    def set_mode(self, mode):
-        self.mode = mode
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled):
+        self._enabled = enabled
+        self._sync_output()
+        self._record_runtime(urgent=True)
+
+    def _sync_output(self, since=None):
+        if self.output is not None:
+            self.output.show(self.status, self._enabled, since=since)
+
+    def set_mode(self, mode, **options):
+        """Switch to mode; options (e.g. seed for random) go to its handler."""
         handler_cls = self.MODE_HANDLERS.get(mode)
         if not handler_cls:
             raise ValueError(f"Unknown mode: {mode}")
-        self.mode_handler = handler_cls(self)
+        self.mode = mode
+        self.mode_handler = handler_cls(self, **options)
         self.mode_handler.initialize()
+        self._record_runtime(urgent=True)
+
+    def runtime_state(self):
+        """What the journal keeps: enough to carry on the current cycle after a restart."""
+        return {
+            "time": round(time.time(), 3),
+            "mode": self.mode,
+            "status": self.status,
+            "enabled": self._enabled,
+            "elapsed": round(self.elapsed, 3),
+            "open_time": self.open_time,
+            "close_time": self.close_time,
+            "next_time": self.next_time,
+            "show_zero": self.show_zero,
+            "overshoot": round(self._overshoot, 3),
+        }
+
+    def _record_runtime(self, urgent=False):
+        if self.journal is not None:
+            self.journal.record(self.runtime_state(), urgent=urgent)
+
+    def resume(self, state, catch_up=False):
+        """
+        Carry on from a runtime_state() saved before a restart. With
+        catch_up a running timer is moved on by the wall-clock time since
+        the state was recorded. Returns False if state is None or invalid.
+        """
+        if state is None:
+            return False
+        try:
+            mode, status = state["mode"], state["status"]
+            if mode not in self.MODE_HANDLERS or status not in ("OPEN", "CLOSE"):
+                raise ValueError(f"unknown mode {mode!r} or status {status!r}")
+            open_time = to_period(state["open_time"])
+            close_time = to_period(state["close_time"])
+            next_time = to_period(state["next_time"])
+            elapsed = float(state["elapsed"])
+            overshoot = float(state.get("overshoot", 0.0))
+            if min(open_time, close_time, next_time) <= 0 or elapsed < 0 or overshoot < 0:
+                raise ValueError("periods must be positive")
+            recorded = float(state["time"])
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Ignoring saved runtime state. Error: {e}")
+            return False
+        if mode != self.mode:
+            self.set_mode(mode)
+        self.status = status
+        self.open_time = open_time
+        self.close_time = close_time
+        self.next_time = next_time
+        self.elapsed = elapsed
+        self.show_zero = bool(state.get("show_zero", False))
+        self._overshoot = overshoot if self.show_zero else 0.0
+        self._boundary_time = None
+        self.last_update_time = time.monotonic()
+        self.enabled = bool(state.get("enabled", False))
+        offline = time.time() - recorded
+        logger.info("Resumed %s %s at %.3f s (%s), %.1f s after it was saved",
+                    mode, status, elapsed, "running" if self._enabled else "paused", offline)
+        if catch_up and self._enabled and offline > 0:
+            self.advance(offline)
+        self._log_state_change()
+        return True
 
     def _log_state_change(self):
         state = {
@@ -72,32 +171,98 @@ class TimerController:
         now = time.monotonic()
         delta = now - self.last_update_time
         self.last_update_time = now
+        self.advance(delta)
+        # Routine progress; the journal itself limits how often this is written
+        if self.journal is not None and self.journal.due():
+            self._record_runtime()
 
-        time_left = delta
-        while time_left > 0:
-            if self.show_zero:
-                self._debug_random(
-                    f"Transition ({self.status}→{'CLOSE' if self.status == 'OPEN' else 'OPEN'}) - BEFORE")
-                self.show_zero = False
-                self.elapsed = 0
-                self.mode_handler.transition()
-                self._debug_random(f"Transition ({self.status}) - AFTER")
-                self._log_state_change()
+    def advance(self, time_left):
+        """
+        Move the timer forward by time_left seconds, across any number of
+        period boundaries. Boundaries before the last one are passed without
+        a zero frame (loop mode skips whole cycles in closed form); the last
+        one is left showing zero, with the time already spent past it kept
+        for the transition.
+        """
+        if time_left <= 0:
+            return
+        if self.show_zero:
+            self.transition()
+        boundaries = 0
+        while True:
+            remaining = max(0, self.mode_handler.current_remaining_time())
+            if time_left < remaining:
+                self.elapsed += time_left
                 break
-
-            remaining = self.mode_handler.current_remaining_time()
-            if remaining > 0:
-                if time_left >= remaining:
-                    self.elapsed += remaining
-                    time_left -= remaining
-                    self.show_zero = True
-                    break
-                else:
-                    self.elapsed += time_left
-                    time_left = 0
-            else:
+            after = time_left - remaining
+            if after < self.mode_handler.next_period():
+                self.elapsed += remaining
                 self.show_zero = True
+                self._overshoot = after
+                self._boundary_time = self.last_update_time - after
                 break
+            # Not the last boundary: pass it without a zero frame
+            self.elapsed = 0
+            self.mode_handler.transition()
+            boundaries += 1
+            time_left = self.mode_handler.fast_forward(after)
+        if boundaries:
+            logger.debug("Caught up over %d period boundaries", boundaries)
+            # Skipped periods are not pulsed; just land on the current one
+            self._sync_output()
+            self._log_state_change()
+            self._record_runtime()
+
+    def transition(self):
+        """Leave the zero state and switch OPEN/CLOSE via the mode handler."""
+        self._debug_random(
+            f"Transition ({self.status}→{'CLOSE' if self.status == 'OPEN' else 'OPEN'}) - BEFORE")
+        carried = self._overshoot if self.show_zero else 0.0
+        boundary = self._boundary_time if self.show_zero else None
+        self.show_zero = False
+        self._overshoot = 0.0
+        self._boundary_time = None
+        self.mode_handler.transition()
+        # Switch the relays before anything else (logging, display) runs
+        self._sync_output(since=boundary)
+        self.elapsed = carried
+        self._log_transition(boundary)
+        self._debug_random(f"Transition ({self.status}) - AFTER")
+        self._log_state_change()
+        self._record_runtime()
+
+    def _log_transition(self, boundary=None):
+        # Periods passed over by catch-up never ran, so only real transitions are logged
+        if self.transition_log is None:
+            return
+        timestamp = time.time()
+        if boundary is not None:
+            timestamp -= time.monotonic() - boundary
+        if self.status == "OPEN":
+            period, base = self.open_time, self._open_time_base
+        else:
+            period, base = self.close_time, self._close_time_base
+        self.transition_log.append(timestamp, self.status, period, base, self.mode)
+
+    def lookahead(self, now=None):
+        """
+        Lazily yield a Transition for every upcoming period boundary,
+        assuming the timer keeps running from now (a time.time() value,
+        default the current time). Nothing about the live timer changes;
+        random mode reports the periods it will actually draw.
+        """
+        now = time.time() if now is None else now
+        if self.show_zero:
+            # The boundary has passed; the transition is pending
+            remaining = -self._overshoot
+        else:
+            remaining = self.mode_handler.current_remaining_time()
+        if self._enabled:
+            remaining -= time.monotonic() - self.last_update_time
+        timestamp = now + remaining
+        for status, duration in self.mode_handler.lookahead():
+            yield Transition(timestamp, status, duration)
+            timestamp += duration
 
     def adjust_time(self, delta):
         prev_open = self._open_time_base
@@ -109,26 +274,24 @@ class TimerController:
 
     def save_settings(self):
         data = {
-            "open_time": int(self._open_time_base),
-            "close_time": int(self._close_time_base)
+            "open_time": to_period(self._open_time_base),
+            "close_time": to_period(self._close_time_base)
         }
-        with open(SETTINGS_FILE, "w") as f:
-            json.dump(data, f)
+        self.settings.save(data)
 
     def load_settings(self):
         loaded = False
-        if os.path.exists(SETTINGS_FILE):
-            try:
-                with open(SETTINGS_FILE, "r") as f:
-                    data = json.load(f)
-                    self.open_time = int(data.get("open_time", self.DEFAULT_OPEN_TIME))
-                    self.close_time = int(data.get("close_time", self.DEFAULT_CLOSE_TIME))
+        try:
+            data = self.settings.load()
+            if data is not None:
+                self.open_time = to_period(data.get("open_time", self.DEFAULT_OPEN_TIME))
+                self.close_time = to_period(data.get("close_time", self.DEFAULT_CLOSE_TIME))
+                if self.open_time <= 0 or self.close_time <= 0:
+                    raise ValueError("periods must be positive")
                 loaded = True
-            except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
-                logger.error(f"Failed to load timer settings, using defaults. Error: {e}")
-                self.open_time = self.DEFAULT_OPEN_TIME
-                self.close_time = self.DEFAULT_CLOSE_TIME
-        else:
+        except (json.JSONDecodeError, TypeError, ValueError) as e:
+            logger.error(f"Failed to load timer settings, using defaults. Error: {e}")
+        if not loaded:
             self.open_time = self.DEFAULT_OPEN_TIME
             self.close_time = self.DEFAULT_CLOSE_TIME
 
@@ -138,13 +301,66 @@ class TimerController:
         if loaded:
             self._log_state_change()
 
+    def profiles(self):
+        return self.settings.profiles()
+
+    def save_profile(self, name):
+        """Store the current mode, bases and random seed as profile name."""
+        self.settings.save_profile(name, {
+            "mode": self.mode,
+            "open_time": to_period(self._open_time_base),
+            "close_time": to_period(self._close_time_base),
+            "seed": getattr(self.mode_handler, "seed", None),
+        })
+        self.profile = name
+        logger.info("Saved profile %r", name)
+
+    def load_profile(self, name):
+        """Switch to profile name. Raises KeyError if there is none, ValueError if it is invalid."""
+        data = self.settings.load_profile(name)
+        if data is None:
+            raise KeyError(f"Unknown profile: {name}")
+        mode = data["mode"]
+        if mode not in self.MODE_HANDLERS:
+            raise ValueError(f"Unknown mode: {mode}")
+        open_time, close_time = to_period(data["open_time"]), to_period(data["close_time"])
+        if open_time <= 0 or close_time <= 0:
+            raise ValueError("periods must be positive")
+        self.open_time = self._open_time_base = open_time
+        self.close_time = self._close_time_base = close_time
+        options = {"seed": data["seed"]} if data.get("seed") is not None else {}
+        self.set_mode(mode, **options)
+        self.profile = name
+        self.save_settings()
+        logger.info("Switched to profile %r", name)
+        self._log_state_change()
+
+    def delete_profile(self, name):
+        if self.profile == name:
+            self.profile = None
+        return self.settings.delete_profile(name)
+
     def randomize_if_needed(self):
         self.mode_handler.randomize_if_needed()
         self._log_state_change()
 
+    def reset(self, defaults=False):
+        """Stop at the start of OPEN, reloading the saved settings or, with defaults, clearing them."""
+        self.enabled = False
+        self.elapsed = 0
+        self.show_zero = False
+        self._overshoot = 0.0
+        self._boundary_time = None
+        self.status = "OPEN"
+        if defaults:
+            self.reset_settings()
+        else:
+            self.load_settings()
+        self._sync_output()
+        self._record_runtime(urgent=True)
+
     def reset_settings(self):
-        if os.path.exists(SETTINGS_FILE):
-            os.remove(SETTINGS_FILE)
+        self.settings.clear()
         self.open_time = self.DEFAULT_OPEN_TIME
         self.close_time = self.DEFAULT_CLOSE_TIME
         self._open_time_base = self.open_time
@@ -0,0 +1,219 @@
+import heapq
+import itertools
+import time
+import zlib
+import logging
+import numpy as np
+from app.random_pool import _get_random_config
+from app.timer import TimerController
+from app.timer_modes import to_period
+
+logger = logging.getLogger(__name__)
+
+
+def _timer_seed(name):
+    """
+    A seed of timer name's own derived from RANDOM_SEED, or None when that
+    is unset. Every timer seeded with RANDOM_SEED itself would draw the same
+    periods and switch in step.
+    """
+    seed = _get_random_config()[0]
+    if seed is None:
+        return None
+    sequence = np.random.SeedSequence([seed, zlib.crc32(str(name).encode())])
+    return int(sequence.generate_state(1, np.uint64)[0])
+
+
+class ScheduledTimer:
+    """
+    One independent OPEN/CLOSE timer run by a TimerEngine.
+
+    Carries the same attributes the mode handlers read and write on
+    TimerController, so LoopModeHandler/RandomModeHandler drive it
+    unchanged, but no settings file, display state or logging. Instead of
+    an elapsed counter that has to be updated every tick it keeps the
+    absolute time its current period ends (due).
+    """
+
+    __slots__ = ("name", "mode", "status", "open_time", "close_time", "next_time", "elapsed",
+                 "_open_time_base", "_close_time_base", "mode_handler", "output",
+                 "due", "transitions", "_seq")
+
+    def __init__(self, name, open_time, close_time, mode="loop", status="OPEN", output=None, seed=None):
+        handler_cls = TimerController.MODE_HANDLERS.get(mode)
+        if not handler_cls:
+            raise ValueError(f"Unknown mode: {mode}")
+        self.name = name
+        self.mode = mode
+        self.status = status
+        self.open_time = self._open_time_base = to_period(open_time)
+        self.close_time = self._close_time_base = to_period(close_time)
+        if self.open_time <= 0 or self.close_time <= 0:
+            raise ValueError("periods must be positive")
+        self.next_time = None
+        self.elapsed = 0
+        # Anything with show(status, enabled, since=...), e.g. app.output.Output
+        self.output = output
+        self.due = None
+        # Transitions stepped through; cycles skipped in closed form are not counted
+        self.transitions = 0
+        # Heap entry currently valid for this timer; None when not scheduled
+        self._seq = None
+        # Random timers take seed as given, or one of their own derived from RANDOM_SEED
+        options = {"seed": _timer_seed(name) if seed is None else seed} if mode == "random" else {}
+        self.mode_handler = handler_cls(self, **options)
+        self.mode_handler.initialize()
+
+    @property
+    def open_time_base(self):
+        return self._open_time_base
+
+    @property
+    def close_time_base(self):
+        return self._close_time_base
+
+    def remaining(self, now):
+        return max(0.0, self.due - now) if self.due is not None else self.mode_handler.current_remaining_time()
+
+    def __repr__(self):
+        return f"ScheduledTimer({self.name!r}, {self.status}, due={self.due})"
+
+
+class TimerEngine:
+    """
+    Runs any number of ScheduledTimers from one thread.
+
+    Timers sit in a min-heap keyed on the absolute time their period
+    ends, so a tick only touches the timers that are due: O(log n) per
+    transition and nothing at all for the rest. Each transition is
+    scheduled from the boundary it happened at, not from when it was
+    handled, so late ticks do not make timers drift; a timer more than a
+    period behind is caught up the way TimerController.advance does.
+
+    Removing a timer leaves its heap entry behind and skips it when it
+    comes up (lazy deletion), so remove() is O(1).
+    """
+
+    def __init__(self, clock=None, on_transition=None):
+        self._clock = clock
+        # on_transition(timer, boundary) after each handled transition
+        self.on_transition = on_transition
+        self._heap = []
+        self._timers = {}
+        self._seq = itertools.count()
+        self.running = True
+        self._scheduler = None
+        self.ticks = 0
+        self.fired = 0
+        self.caught_up = 0
+        self.stale = 0
+        self.max_lateness = 0.0
+
+    def now(self):
+        return self._clock() if self._clock else time.monotonic()
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, name):
+        return name in self._timers
+
+    def __getitem__(self, name):
+        return self._timers[name]
+
+    def add(self, timer, now=None):
+        """Start timer's current period at now (default: the engine clock)."""
+        if timer.name in self._timers:
+            raise ValueError(f"Timer already scheduled: {timer.name}")
+        now = self.now() if now is None else now
+        self._timers[timer.name] = timer
+        self._schedule(timer, now + timer.mode_handler.current_remaining_time())
+        if timer.output is not None:
+            timer.output.show(timer.status)
+        return timer
+
+    def remove(self, name):
+        timer = self._timers.pop(name)
+        timer._seq = None
+        # Carry the time spent in the current period, in case it is added again
+        timer.elapsed += timer.mode_handler.current_remaining_time() - timer.remaining(self.now())
+        timer.due = None
+        if timer.output is not None:
+            timer.output.show(timer.status, enabled=False)
+        return timer
+
+    def _schedule(self, timer, due):
+        timer.due = due
+        timer._seq = next(self._seq)
+        heapq.heappush(self._heap, (due, timer._seq, timer))
+
+    def next_deadline(self):
+        """Time the earliest scheduled period ends, or None with no timers."""
+        heap = self._heap
+        while heap and heap[0][2]._seq != heap[0][1]:
+            heapq.heappop(heap)
+            self.stale += 1
+        return heap[0][0] if heap else None
+
+    def advance(self, now=None):
+        """Transition every timer whose period has ended by now; return them."""
+        now = self.now() if now is None else now
+        self.ticks += 1
+        heap = self._heap
+        fired = []
+        while heap and heap[0][0] <= now:
+            boundary, seq, timer = heapq.heappop(heap)
+            if timer._seq != seq:
+                self.stale += 1
+                continue
+            self._transition(timer, boundary, now)
+            fired.append(timer)
+        return fired
+
+    def _transition(self, timer, boundary, now):
+        handler = timer.mode_handler
+        handler.transition()
+        timer.elapsed = 0
+        timer.transitions += 1
+        time_left = now - boundary
+        self.max_lateness = max(self.max_lateness, time_left)
+        # Further boundaries already passed: step over them without output
+        while time_left >= handler.current_remaining_time():
+            period = handler.current_remaining_time()
+            time_left -= period
+            boundary += period
+            handler.transition()
+            timer.transitions += 1
+            self.caught_up += 1
+            skipped = handler.fast_forward(time_left)
+            boundary += time_left - skipped
+            time_left = skipped
+        self.fired += 1
+        self._schedule(timer, boundary + handler.current_remaining_time())
+        if timer.output is not None:
+            timer.output.show(timer.status, since=boundary)
+        if self.on_transition is not None:
+            self.on_transition(timer, boundary)
+
+    def run(self, scheduler, precise=False):
+        """Sleep on scheduler (a DeadlineScheduler) between due transitions until stop()."""
+        self._scheduler = scheduler
+        while self.running:
+            self.advance(scheduler.now())
+            scheduler.wait_until(self.next_deadline(), precise=precise)
+
+    def stop(self):
+        self.running = False
+        if self._scheduler is not None:
+            self._scheduler.wake()
+
+    def stats(self):
+        return {
+            "timers": len(self._timers),
+            "ticks": self.ticks,
+            "transitions": self.fired,
+            "caught_up": self.caught_up,
+            "stale_entries": self.stale,
+            "heap_size": len(self._heap),
+            "max_lateness_ms": round(self.max_lateness * 1000, 3),
+        }
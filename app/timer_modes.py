@@ -1,4 +1,54 @@
-import random
+import math
+import numpy as np
+
+# Periods are kept in seconds, rounded to the millisecond
+PERIOD_DECIMALS = 3
+
+
+def to_period(value):
+    """Round a period to the millisecond; whole seconds stay ints so they save and display as before."""
+    value = round(float(value), PERIOD_DECIMALS)
+    return int(value) if value.is_integer() else value
+
+
+def random_period_bounds(base):
+    """
+    Range random mode draws a period for base from: an integer in
+    [low, high], divided by divisor.
+    Whole-second bases draw whole seconds from 1; fractional bases draw
+    milliseconds, keeping the 1 s floor where it fits.
+    """
+    base = to_period(base)
+    if isinstance(base, int):
+        return 1, max(1, base), 1
+    base_ms = round(base * 1000)
+    return (1000 if base_ms >= 1000 else 1), base_ms, 1000
+
+
+def _adjusted_period(base, delta):
+    # Joystick steps stop at 1 s, but never push a sub-second period up to it
+    return to_period(max(min(1, base), base + delta))
+
+class _ShadowTimer:
+    """Copy of the period fields of a timer, for a handler to run ahead on."""
+
+    def __init__(self, timer):
+        self.status = timer.status
+        self.open_time = timer.open_time
+        self.close_time = timer.close_time
+        self.next_time = timer.next_time
+        self.elapsed = timer.elapsed
+        self._open_time_base = timer._open_time_base
+        self._close_time_base = timer._close_time_base
+
+    @property
+    def open_time_base(self):
+        return self._open_time_base
+
+    @property
+    def close_time_base(self):
+        return self._close_time_base
+
 
 class BaseModeHandler:
     def __init__(self, timer):
@@ -25,6 +75,34 @@ class BaseModeHandler:
         # Default: do nothing. Overridden by RandomModeHandler.
         pass
 
+    def next_period(self):
+        """Length of the period that starts at the next transition."""
+        return self.timer.next_time
+
+    def fast_forward(self, time_left):
+        """
+        Called at the start of a period with time_left still to run.
+        May skip whole periods in one go and return the time left after
+        them; by default every boundary is stepped through.
+        """
+        return time_left
+
+    def _clone(self, timer):
+        """A handler for timer that will make the same choices this one would."""
+        return type(self)(timer)
+
+    def lookahead(self):
+        """
+        Yield (status, duration) for every period after the current one,
+        forever, by running a copy of this handler on a copy of the timer.
+        The live timer and handler are left untouched.
+        """
+        shadow = _ShadowTimer(self.timer)
+        handler = self._clone(shadow)
+        while True:
+            handler.transition()
+            yield shadow.status, shadow.open_time if shadow.status == "OPEN" else shadow.close_time
+
 class LoopModeHandler(BaseModeHandler):
     def initialize(self):
         # Always set times to base values in loop mode
@@ -50,9 +128,9 @@ class LoopModeHandler(BaseModeHandler):
 
     def adjust_time(self, delta):
         if self.timer.status == "OPEN":
-            self.timer._open_time_base = max(1, int(self.timer._open_time_base) + int(delta))
+            self.timer._open_time_base = _adjusted_period(self.timer._open_time_base, delta)
         else:
-            self.timer._close_time_base = max(1, int(self.timer._close_time_base) + int(delta))
+            self.timer._close_time_base = _adjusted_period(self.timer._close_time_base, delta)
         self.initialize()  # Re-initialize to update times
 
     def current_remaining_time(self):
@@ -61,7 +139,50 @@ class LoopModeHandler(BaseModeHandler):
         else:
             return self.timer.close_time - self.timer.elapsed
 
+    def next_period(self):
+        if self.timer.status == "OPEN":
+            return self.timer.close_time_base
+        return self.timer.open_time_base
+
+    def fast_forward(self, time_left):
+        # Every OPEN+CLOSE cycle is identical, so whole cycles divide out.
+        # Keep (0, cycle] so the last boundary is still stepped to.
+        cycle = self.timer.open_time_base + self.timer.close_time_base
+        if time_left <= cycle:
+            return time_left
+        cycles = math.ceil(time_left / cycle) - 1
+        return time_left - cycles * cycle
+
 class RandomModeHandler(BaseModeHandler):
+    """
+    Draws periods from seeded NumPy pools, one per status. seed,
+    distribution and weights default to RANDOM_SEED, RANDOM_DISTRIBUTION
+    and RANDOM_WEIGHTS (see app.random_pool).
+    """
+
+    def __init__(self, timer, seed=None, distribution=None, weights=None):
+        super().__init__(timer)
+        # app.random_pool builds on this module
+        from app.random_pool import PeriodPool, _get_random_config
+        env_seed, env_distribution, env_weights = _get_random_config()
+        self.seed = env_seed if seed is None else seed
+        self.distribution = distribution or env_distribution
+        self.rng = np.random.default_rng(self.seed)
+        weights = env_weights if weights is None else weights
+        # One generator, so a seed fixes the whole OPEN/CLOSE sequence
+        self.pools = {status: PeriodPool(self.rng, self.distribution, weights) for status in ("OPEN", "CLOSE")}
+
+    def _clone(self, timer):
+        # Same pooled periods and generator state, so the copy draws exactly what this one will
+        clone = object.__new__(type(self))
+        BaseModeHandler.__init__(clone, timer)
+        clone.seed = self.seed
+        clone.distribution = self.distribution
+        clone.rng = np.random.default_rng()
+        clone.rng.bit_generator.state = self.rng.bit_generator.state
+        clone.pools = {status: pool.copy(clone.rng) for status, pool in self.pools.items()}
+        return clone
+
     def initialize(self):
         # Randomize both periods for entry to random mode
         if self.timer.status == "OPEN":
@@ -73,7 +194,8 @@ class RandomModeHandler(BaseModeHandler):
 
     def _random_period(self, period):
         base = self.timer._open_time_base if period == "OPEN" else self.timer._close_time_base
-        return random.randint(1, max(1, int(base)))
+        # The pool refills itself for a new base
+        return self.pools[period].draw(base)
 
     def transition(self):
         if self.timer.status == "OPEN":
@@ -94,9 +216,9 @@ class RandomModeHandler(BaseModeHandler):
 
     def adjust_time(self, delta):
         if self.timer.status == "OPEN":
-            self.timer._open_time_base = max(1, int(self.timer._open_time_base) + int(delta))
+            self.timer._open_time_base = _adjusted_period(self.timer._open_time_base, delta)
         else:
-            self.timer._close_time_base = max(1, int(self.timer._close_time_base) + int(delta))
+            self.timer._close_time_base = _adjusted_period(self.timer._close_time_base, delta)
         self.set_next_time()
 
     def randomize_if_needed(self):
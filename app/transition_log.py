@@ -0,0 +1,340 @@
+"""
+Append-only binary log of timer transitions, with time-range queries.
+
+Every transition is one fixed-size record (RECORD_DTYPE: wall-clock
+timestamp, the period entered, its base, status and mode) appended to
+numbered segment files in a directory:
+
+    transitions/00000001.seg   records, 32 bytes each, in time order
+    transitions/00000001.idx   timestamp of every INDEX_STRIDE-th record
+
+A segment is closed after SEGMENT_RECORDS records, or early if the wall
+clock steps backwards, so every segment is sorted; only the newest
+MAX_SEGMENTS are kept. Queries map segments read-only, skip those
+outside the range by their first and last timestamps, and use the sparse
+index to binary-search a single block, so a scan touches only the pages
+it returns:
+
+    python main.py transitions --days 1
+"""
+import argparse
+import mmap
+import os
+import sys
+import time
+import logging
+from datetime import datetime, timezone
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSITION_LOG_DIR = "transitions"
+# 2 MiB segments
+SEGMENT_RECORDS = 65536
+MAX_SEGMENTS = 64
+INDEX_STRIDE = 1024
+
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("period", "<f8"),
+    ("base", "<f8"),
+    ("status", "u1"),
+    ("mode", "u1"),
+    ("reserved", "V6"),
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+INDEX_DTYPE = np.dtype("<f8")
+
+STATUSES = ("OPEN", "CLOSE")
+# Stored codes; append new modes, never reorder
+MODES = ("loop", "random")
+UNKNOWN_MODE = 255
+
+
+def _get_transition_log():
+    """Log in TRANSITION_LOG_DIR, or None when it is empty."""
+    directory = os.getenv("TRANSITION_LOG_DIR", DEFAULT_TRANSITION_LOG_DIR)
+    return TransitionLog(directory) if directory else None
+
+
+def _segment_paths(directory):
+    """Segment files in directory, oldest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, name) for name in sorted(names) if name.endswith(".seg")]
+
+
+def _index_path(segment_path):
+    return segment_path[:-len(".seg")] + ".idx"
+
+
+class TransitionLog:
+    """Appends records to the newest segment; see the module docstring for the layout."""
+
+    def __init__(self, directory, segment_records=SEGMENT_RECORDS, max_segments=MAX_SEGMENTS):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.max_segments = max_segments
+        self._file = None
+        self._index = None
+        self._path = None
+        self._count = 0
+        self._last_timestamp = None
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self.appends = 0
+        self.rotations = 0
+        self.failures = 0
+        self._failing = False
+
+    def append(self, timestamp, status, period, base, mode):
+        """Append one record. Returns False if it could not be written; the next append reopens the log."""
+        try:
+            self._append(timestamp, status, period, base, mode)
+        except OSError as e:
+            self.failures += 1
+            # Once per outage: with short periods this would otherwise log every transition
+            if not self._failing:
+                logger.error("Failed to write transition log %s: %s", self.directory, e)
+            self._failing = True
+            self.close()
+            return False
+        if self._failing:
+            logger.info("Transition log %s is writable again", self.directory)
+            self._failing = False
+        return True
+
+    def _append(self, timestamp, status, period, base, mode):
+        if self._file is None:
+            self._open_newest()
+        if self._count >= self.segment_records or (
+                self._last_timestamp is not None and timestamp < self._last_timestamp):
+            self._rotate()
+        record = self._record
+        record["timestamp"] = timestamp
+        record["period"] = period
+        record["base"] = base
+        record["status"] = STATUSES.index(status)
+        record["mode"] = MODES.index(mode) if mode in MODES else UNKNOWN_MODE
+        if self._count % INDEX_STRIDE == 0:
+            self._index.write(INDEX_DTYPE.type(timestamp).tobytes())
+            self._index.flush()
+        # Flushed to the OS, not fsynced: a power cut may lose the last few records, never the file
+        self._file.write(record.tobytes())
+        self._file.flush()
+        self._count += 1
+        self._last_timestamp = timestamp
+        self.appends += 1
+
+    def _open_newest(self):
+        os.makedirs(self.directory, exist_ok=True)
+        segments = _segment_paths(self.directory)
+        if not segments:
+            self._start_segment(1)
+            return
+        path = segments[-1]
+        size = os.path.getsize(path)
+        count = size // RECORD_SIZE
+        if count * RECORD_SIZE != size:
+            # Torn record from a power cut
+            os.truncate(path, count * RECORD_SIZE)
+        self._path = path
+        self._count = count
+        self._file = open(path, "ab")
+        self._repair_index(path, count)
+        self._index = open(_index_path(path), "ab")
+        if count:
+            with open(path, "rb") as f:
+                f.seek((count - 1) * RECORD_SIZE)
+                self._last_timestamp = float(np.frombuffer(f.read(RECORD_SIZE), dtype=RECORD_DTYPE)["timestamp"][0])
+
+    def _repair_index(self, path, count):
+        index_path = _index_path(path)
+        entries = -(-count // INDEX_STRIDE)
+        if os.path.exists(index_path) and os.path.getsize(index_path) == entries * INDEX_DTYPE.itemsize:
+            return
+        timestamps = np.fromfile(path, dtype=RECORD_DTYPE, count=count)["timestamp"][::INDEX_STRIDE]
+        timestamps.astype(INDEX_DTYPE).tofile(index_path)
+
+    def _start_segment(self, number):
+        self._path = os.path.join(self.directory, f"{number:08d}.seg")
+        self._file = open(self._path, "ab")
+        self._index = open(_index_path(self._path), "ab")
+        self._count = 0
+
+    def _rotate(self):
+        number = int(os.path.basename(self._path)[:-len(".seg")]) + 1
+        self.close()
+        self._start_segment(number)
+        self.rotations += 1
+        for path in _segment_paths(self.directory)[:-self.max_segments]:
+            os.remove(path)
+            if os.path.exists(_index_path(path)):
+                os.remove(_index_path(path))
+
+    def close(self):
+        for f in (self._file, self._index):
+            if f is not None:
+                f.close()
+        self._file = self._index = None
+
+    def stats(self):
+        return {"appends": self.appends, "rotations": self.rotations, "failures": self.failures,
+                "segment": self._path}
+
+
+class _Segment:
+    """A segment mapped read-only, with its sparse index."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        count = os.fstat(self._file.fileno()).st_size // RECORD_SIZE
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if count else None
+        self.records = np.frombuffer(self._map, dtype=RECORD_DTYPE, count=count) if count else \
+            np.empty(0, dtype=RECORD_DTYPE)
+        try:
+            self.index = np.fromfile(_index_path(path), dtype=INDEX_DTYPE)
+        except FileNotFoundError:
+            self.index = np.empty(0, dtype=INDEX_DTYPE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def bound(self, timestamp):
+        """Number of records before timestamp, searching one index block of the map."""
+        count = self.records.size
+        low, high = 0, count
+        if self.index.size == -(-count // INDEX_STRIDE):
+            # index[k - 1] < timestamp <= index[k]: the answer lies in block k - 1
+            block = int(np.searchsorted(self.index, timestamp))
+            if block == 0:
+                return 0
+            low, high = (block - 1) * INDEX_STRIDE, min(count, block * INDEX_STRIDE)
+        # Otherwise the index is behind after a power cut; search the whole segment
+        return low + int(np.searchsorted(self.records["timestamp"][low:high], timestamp))
+
+    def select(self, start, end):
+        """A copy of the records in [start, end), or None if there are none."""
+        timestamps = self.records["timestamp"]
+        if not timestamps.size or (end is not None and timestamps[0] >= end) or \
+                (start is not None and timestamps[-1] < start):
+            return None
+        low = self.bound(start) if start is not None else 0
+        high = self.bound(end) if end is not None else timestamps.size
+        return self.records[low:high].copy() if high > low else None
+
+    def close(self):
+        # Views into the map must go before it can close
+        self.records = None
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+def scan(directory, start=None, end=None):
+    """
+    Yield arrays of RECORD_DTYPE for transitions with start <= timestamp
+    < end (time.time() values; None is open-ended), oldest segment first.
+    Each array is a copy of just the records in range.
+    """
+    for path in _segment_paths(directory):
+        with _Segment(path) as segment:
+            records = segment.select(start, end)
+        if records is not None:
+            yield records
+
+
+def query(directory, start=None, end=None):
+    """All transitions in [start, end) as one array."""
+    chunks = list(scan(directory, start, end))
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=RECORD_DTYPE)
+
+
+def summarize(directory, start=None, end=None):
+    """
+    Aggregates over [start, end), computed segment by segment: transitions,
+    cycles (periods entered as OPEN), and per status the period count,
+    total and longest period, with when the longest one started.
+    """
+    totals = {"transitions": 0, "cycles": 0, "first": None, "last": None}
+    for status in STATUSES:
+        totals[status] = {"periods": 0, "total": 0.0, "longest": None, "longest_at": None}
+    for records in scan(directory, start, end):
+        totals["transitions"] += records.size
+        totals["first"] = totals["first"] if totals["first"] is not None else float(records["timestamp"][0])
+        totals["last"] = float(records["timestamp"][-1])
+        for code, status in enumerate(STATUSES):
+            selected = records[records["status"] == code]
+            if not selected.size:
+                continue
+            entry = totals[status]
+            entry["periods"] += selected.size
+            entry["total"] += float(selected["period"].sum())
+            i = int(selected["period"].argmax())
+            if entry["longest"] is None or selected["period"][i] > entry["longest"]:
+                entry["longest"] = float(selected["period"][i])
+                entry["longest_at"] = float(selected["timestamp"][i])
+    totals["cycles"] = totals["OPEN"]["periods"]
+    return totals
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="milliseconds")
+
+
+def report(summary):
+    if not summary["transitions"]:
+        return "no transitions"
+    lines = [f"{summary['transitions']} transitions, {summary['cycles']} cycles, "
+             f"{_iso(summary['first'])} to {_iso(summary['last'])}"]
+    for status in STATUSES:
+        entry = summary[status]
+        if not entry["periods"]:
+            lines.append(f"{status}: no periods")
+            continue
+        lines.append(f"{status}: {entry['periods']} periods, total {entry['total']:.3f} s, "
+                     f"mean {entry['total'] / entry['periods']:.3f} s, "
+                     f"longest {entry['longest']:g} s at {_iso(entry['longest_at'])}")
+    return "\n".join(lines)
+
+
+def main(argv=None, out=None):
+    parser = argparse.ArgumentParser(prog="main.py transitions", description="Query the transition log.")
+    parser.add_argument("--dir", default=os.getenv("TRANSITION_LOG_DIR") or DEFAULT_TRANSITION_LOG_DIR)
+    window = parser.add_mutually_exclusive_group()
+    window.add_argument("--hours", type=float, help="the last N hours")
+    window.add_argument("--days", type=float, help="the last N days")
+    window.add_argument("--since", type=datetime.fromisoformat, help="ISO date/time (UTC unless given)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="ISO date/time (UTC unless given)")
+    parser.add_argument("--list", action="store_true", help="print every transition instead of a summary")
+    args = parser.parse_args(argv)
+    out = out or sys.stdout
+
+    def timestamp(value):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+
+    now = time.time()
+    start = end = None
+    if args.hours is not None:
+        start = now - args.hours * 3600
+    elif args.days is not None:
+        start = now - args.days * 86400
+    elif args.since is not None:
+        start = timestamp(args.since)
+    if args.until is not None:
+        end = timestamp(args.until)
+
+    if args.list:
+        for records in scan(args.dir, start, end):
+            for record in records:
+                mode = MODES[record["mode"]] if record["mode"] < len(MODES) else "?"
+                out.write(f"{_iso(record['timestamp'])} {STATUSES[record['status']]} {record['period']:g} "
+                          f"(base {record['base']:g}, {mode})\n")
+    else:
+        out.write(report(summarize(args.dir, start, end)) + "\n")
+    return 0
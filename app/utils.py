@@ -8,6 +8,22 @@ def is_x64():
 def is_debug():
     return '--debug' in sys.argv
 
+def is_async():
+    return '--async' in sys.argv
+
+def run_with_thinkerer_async(run_app, app_name="App"):
+    """
+    Like run_with_thinkerer, for the asyncio runtime: everything stays on the
+    main thread and run_app(sh1106, thinkerer) is expected to pump Tk itself.
+    """
+    from features.steps.mocks.mock_sh1106 import SH1106
+    sh1106 = SH1106()
+    if sh1106.thinkerer:
+        print(f"Launching Thinkerer mock display window for x64 ({app_name}, asyncio).")
+    else:
+        print(f"Thinkerer not available, running {app_name.lower()} logic only.")
+    run_app(sh1106, sh1106.thinkerer)
+
 def run_with_thinkerer(run_app, app_name="App"):
     """
     Runs the given callable in a background thread and launches the Thinkerer mock display GUI on x64.
@@ -0,0 +1,59 @@
+"""
+Benchmark the packed frame cache on a loop-mode cycle: update_values plus
+getbuffer per tick, with real SH1106 packing, for a few cache sizes.
+
+Run from the repo root:
+    python -m benchmarks.bench_frame_cache
+"""
+import itertools
+import time
+from app.display import Display
+from device.framebuffer import pack_image
+from features.steps.mocks.mock_sh1106 import SH1106
+
+
+class _PackingSH1106(SH1106):
+    # The mock returns a constant buffer; pack like the real driver does
+    def getbuffer(self, image):
+        return pack_image(image, self.width, self.height)
+
+
+class _LoopTimer:
+    open_time_base = 5
+    close_time_base = 3
+    status_b = ""
+    status_c = "loop"
+    show_zero = False
+
+
+def _ticks(count):
+    # 10 ticks a second, spinner every other tick, 5s open / 3s close cycle
+    spinner = itertools.cycle(["|", "/", "-", "\\"])
+    symbol = next(spinner)
+    for tick in range(count):
+        if tick % 2 == 0:
+            symbol = next(spinner)
+        second = (tick // 10) % 8
+        timer = _LoopTimer()
+        timer.status, timer.elapsed = ("OPEN", second) if second < 5 else ("CLOSE", second - 5)
+        timer.open_time, timer.close_time, timer.next_time = 5, 3, 3 if second < 5 else 5
+        timer.status_a = symbol
+        yield timer
+
+
+def main(frames=4000):
+    ticks = list(_ticks(frames))
+    for size in (0, 16, 64):
+        display = Display(hardware=_PackingSH1106(), frame_cache_size=size)
+        start = time.perf_counter()
+        for timer in ticks:
+            if display.update_values(timer):
+                display.getbuffer(display.image)
+        elapsed = time.perf_counter() - start
+        stats = display.frame_cache.stats()
+        print(f"cache={size:3d}  {elapsed / frames * 1e6:7.1f} us/tick   rendered: {display.frames_rendered:5d}"
+              f"   hit rate: {stats['hit_rate']:5.1%}   evictions: {stats['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
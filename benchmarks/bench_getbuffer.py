@@ -0,0 +1,41 @@
+"""
+Benchmark SH1106 frame packing: per-pixel loop vs. vectorized NumPy path.
+
+Run from the repo root:
+    python -m benchmarks.bench_getbuffer
+"""
+import random
+import timeit
+from PIL import Image, ImageDraw
+from device.framebuffer import pack_image, pack_image_reference
+
+WIDTH = 128
+HEIGHT = 64
+
+
+def _frame(size, seed):
+    rng = random.Random(seed)
+    image = Image.new('1', size, 255)
+    draw = ImageDraw.Draw(image)
+    for _ in range(30):
+        x0, y0 = rng.randrange(size[0]), rng.randrange(size[1])
+        draw.rectangle((x0, y0, x0 + rng.randrange(20), y0 + rng.randrange(10)), fill=0)
+    draw.text((5, 20), "OPEN  12 (30)", fill=0)
+    return image
+
+
+def main(repeat=20):
+    for size, name in (((WIDTH, HEIGHT), "landscape"), ((HEIGHT, WIDTH), "portrait")):
+        frames = [_frame(size, seed) for seed in range(8)]
+        for frame in frames:
+            if list(pack_image(frame, WIDTH, HEIGHT)) != pack_image_reference(frame, WIDTH, HEIGHT):
+                raise SystemExit(f"{name}: vectorized output differs from the reference loop")
+        loop = timeit.timeit(lambda: [pack_image_reference(f, WIDTH, HEIGHT) for f in frames], number=repeat)
+        vec = timeit.timeit(lambda: [pack_image(f, WIDTH, HEIGHT) for f in frames], number=repeat)
+        n = repeat * len(frames)
+        print(f"{name:9s}  loop: {loop / n * 1e3:8.3f} ms/frame   "
+              f"numpy: {vec / n * 1e3:8.3f} ms/frame   speedup: {loop / vec:6.1f}x   (byte-identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark input handling: CPU cost per sample of the sampler thread and
+press-to-event latency for edge callbacks vs. the sampler at a few rates,
+all on the mock GPIO. On a Pi the sampler reads one GPIO register per
+sample instead of calling GPIO.input() per pin, so its per-sample cost
+there is lower than shown here for the pin-by-pin fallback.
+
+Run from the repo root:
+    python -m benchmarks.bench_input
+"""
+import threading
+import time
+from app.input import ButtonInput, JoystickInput, InputEventQueue, GPIO
+from app.input_sampler import InputSampler, _pin_reader
+
+
+def _sources():
+    return ButtonInput(), JoystickInput()
+
+
+def cpu_per_sample(samples=20000):
+    buttons, joystick = _sources()
+    results = {}
+    for name, reader in (("pin-by-pin read", None), ("single word read", lambda: 0xFFFFFFFF)):
+        sampler = InputSampler(read_levels=reader)
+        sampler.watch(buttons)
+        sampler.watch(joystick)
+        if reader is None:
+            sampler._read_levels = _pin_reader(sampler._pins)
+        start = time.process_time()
+        for i in range(samples):
+            sampler.sample(i * 0.002)
+        results[name] = (time.process_time() - start) / samples
+    return results
+
+
+def _latency(queue, pin, presses=50):
+    woke = threading.Event()
+    queue.on_event = woke.set
+    latencies = []
+    for _ in range(presses):
+        for pressed in (True, False):
+            woke.clear()
+            start = time.perf_counter()
+            (GPIO._press if pressed else GPIO._release)(pin)
+            woke.wait(1.0)
+            latencies.append(time.perf_counter() - start)
+            queue.drain()
+            time.sleep(0.03)  # stay clear of the debounce window
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    for name, cost in cpu_per_sample().items():
+        print(f"{name:18s} {cost * 1e6:6.1f} us CPU/sample (8 pins)")
+
+    buttons, joystick = _sources()
+    pin = buttons._pin_mapping["KEY2"]
+    queues = [("edge callbacks", InputEventQueue())]
+    queues += [(f"sampler {rate} Hz", InputSampler(rate=rate)) for rate in (250, 500, 1000)]
+    for name, queue in queues:
+        queue.watch(buttons)
+        queue.watch(joystick)
+        queue.start()
+        try:
+            median, p95 = _latency(queue, pin)
+        finally:
+            queue.close()
+        print(f"{name:18s} latency median {median * 1e3:6.2f} ms   p95 {p95 * 1e3:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
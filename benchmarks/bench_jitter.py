@@ -0,0 +1,73 @@
+"""
+Benchmark transition jitter: how long after a period boundary the timer
+actually transitions, over thousands of millisecond-resolution cycles.
+
+Three ways of driving the timer are compared: the old fixed 100 ms tick
+(which also shows the zero frame for a whole tick), sleeping until the
+boundary, and sleeping until the boundary with a short spin at the end.
+Lateness is measured against the exact boundary the timer computed.
+
+Run from the repo root:
+    python -m benchmarks.bench_jitter [--transitions N]
+"""
+import argparse
+import time
+from app.scheduler import DeadlineScheduler, _percentile
+from app.timer import TimerController
+
+LEGACY_TICK = 0.1
+OPEN_TIME = 0.0237
+CLOSE_TIME = 0.0113
+
+
+def _timer(open_time, close_time):
+    timer = TimerController()
+    timer._open_time_base = open_time
+    timer._close_time_base = close_time
+    timer.set_mode("loop")
+    timer.enabled = True
+    timer.last_update_time = time.monotonic()
+    return timer
+
+
+def run(strategy, transitions, open_time=OPEN_TIME, close_time=CLOSE_TIME):
+    """Return the lateness of each handled transition, in seconds."""
+    timer = _timer(open_time, close_time)
+    scheduler = DeadlineScheduler(max_sleep=None)
+    lateness = []
+    boundary = None
+    while len(lateness) < transitions:
+        if strategy == "tick":
+            time.sleep(LEGACY_TICK)
+            if timer.show_zero:
+                # The zero frame stays up a whole tick; update() transitions
+                lateness.append(time.monotonic() - boundary)
+            timer.update()
+            if timer.show_zero:
+                boundary = timer.last_update_time - timer._overshoot
+            continue
+        due = timer.last_update_time + timer.mode_handler.current_remaining_time()
+        scheduler.wait_until(due, precise=strategy == "deadline+spin")
+        timer.update()
+        if timer.show_zero:
+            boundary = timer.last_update_time - timer._overshoot
+            timer.transition()
+            lateness.append(time.monotonic() - boundary)
+    return lateness
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--transitions", type=int, default=2000)
+    args = parser.parse_args()
+    print(f"periods {OPEN_TIME * 1e3:.1f} ms / {CLOSE_TIME * 1e3:.1f} ms, {args.transitions} transitions "
+          f"({args.transitions // 20} for the 100 ms tick)")
+    for strategy in ("tick", "deadline", "deadline+spin"):
+        count = args.transitions // 20 if strategy == "tick" else args.transitions
+        lateness = run(strategy, count)
+        print(f"{strategy:14s} p50 {_percentile(lateness, 50) * 1e3:7.3f} ms   "
+              f"p99 {_percentile(lateness, 99) * 1e3:7.3f} ms   max {max(lateness) * 1e3:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
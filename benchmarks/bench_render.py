@@ -0,0 +1,64 @@
+"""
+Benchmark Display rendering: layered dirty-rectangle compositing vs. a full
+rebuild every frame (what _render_status_and_numbers used to do).
+
+Run from the repo root:
+    python -m benchmarks.bench_render
+"""
+import itertools
+import time
+from PIL import Image, ImageDraw
+from app.display import Display
+from features.steps.mocks.mock_sh1106 import SH1106
+
+
+def _ticks(count):
+    # A running timer: spinner every tick, countdown once a second
+    spinner = itertools.cycle(["|", "/", "-", "\\"])
+    for tick in range(count):
+        remaining = 300 - tick // 10
+        yield (remaining, 120, next(spinner), "", "loop", 300, 120, None, 120)
+
+
+def _render_all(display, ticks, full):
+    for state in ticks:
+        if full:
+            display.invalidate_layout()
+        display._render_status_and_numbers(*state)
+
+
+def _run(display, frames, full):
+    ticks = list(_ticks(frames))
+    start = time.perf_counter()
+    _render_all(display, ticks, full)
+    elapsed = time.perf_counter() - start
+
+    # Second pass counting new PIL images and ImageDraw objects, kept out of the timing
+    counts = {"images": 0, "draws": 0}
+    new_image, new_draw = Image.Image._new, ImageDraw.Draw
+
+    def counting_new(self, im):
+        counts["images"] += 1
+        return new_image(self, im)
+
+    def counting_draw(*args, **kwargs):
+        counts["draws"] += 1
+        return new_draw(*args, **kwargs)
+
+    Image.Image._new, ImageDraw.Draw = counting_new, counting_draw
+    try:
+        _render_all(display, ticks, full)
+    finally:
+        Image.Image._new, ImageDraw.Draw = new_image, new_draw
+    return elapsed / frames, counts["images"] / frames, counts["draws"] / frames
+
+
+def main(frames=2000):
+    for name, full in (("full rebuild", True), ("layered", False)):
+        display = Display(hardware=SH1106())
+        per_frame, images, draws = _run(display, frames, full)
+        print(f"{name:12s}  {per_frame * 1e6:8.1f} us/frame   images/frame: {images:5.2f}   ImageDraw/frame: {draws:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark SH1106 SPI frame transfer: per-byte writes vs. page bursts.
+
+Uses the recording spidev stand-in, so the measured rate is the Python-side
+cost per frame. The modelled rate adds the wire time at the given SPI clock
+plus a fixed per-transfer ioctl overhead.
+
+Run from the repo root:
+    python -m benchmarks.bench_spi [--spi-freq HZ]
+"""
+import argparse
+import time
+from device.transport import SpiTransport, invert
+from features.steps.mocks.mock_spidev import SpiDev
+
+WIDTH = 128
+PAGES = 8
+IOCTL_OVERHEAD_S = 25e-6
+
+
+def show_image_per_byte(spi, set_dc, buf):
+    # The original ShowImage loop: 3 commands + 128 single-byte writes per page
+    for page in range(PAGES):
+        for cmd in (0xB0 + page, 0x02, 0x10):
+            set_dc(False)
+            spi.writebytes([cmd])
+        set_dc(True)
+        for i in range(WIDTH):
+            spi.writebytes([~buf[i + WIDTH * page]])
+
+
+def show_image_burst(transport, buf):
+    for page in range(PAGES):
+        start = WIDTH * page
+        transport.command(0xB0 + page, 0x02, 0x10)
+        transport.data(invert(buf[start:start + WIDTH]))
+
+
+def _measure(show, spi, frames):
+    spi.reset_log()
+    start = time.perf_counter()
+    for _ in range(frames):
+        show()
+    elapsed = time.perf_counter() - start
+    transfers = len(spi.transfers) // frames
+    nbytes = spi.bytes_written // frames
+    return elapsed / frames, transfers, nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spi-freq", type=int, default=1000000)
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    buf = bytearray((i * 37) & 0xFF for i in range(WIDTH * PAGES))
+    dc = []
+    spi = SpiDev()
+    transport = SpiTransport(spi, dc.append)
+
+    results = {
+        "per-byte": _measure(lambda: show_image_per_byte(spi, dc.append, buf), spi, args.frames),
+        "page-burst": _measure(lambda: show_image_burst(transport, buf), spi, args.frames),
+    }
+    print(f"SPI clock {args.spi_freq / 1e6:.1f} MHz, {IOCTL_OVERHEAD_S * 1e6:.0f} us modelled per transfer")
+    for name, (per_frame, transfers, nbytes) in results.items():
+        wire = nbytes * 8 / args.spi_freq + transfers * IOCTL_OVERHEAD_S
+        print(f"{name:10s}  transfers/frame: {transfers:5d}  bytes/frame: {nbytes:5d}  "
+              f"python: {1 / per_frame:8.0f} fps  modelled: {1 / (per_frame + wire):6.1f} fps")
+
+
+if __name__ == "__main__":
+    main()
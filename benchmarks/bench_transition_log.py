@@ -0,0 +1,79 @@
+"""
+Benchmark the binary transition log: append rate, then time-range
+queries and a summary over a month of 2 s periods (about 1.3M records,
+20 segments), against reading every segment whole with np.fromfile.
+
+Run from the repo root:
+    python -m benchmarks.bench_transition_log
+"""
+import os
+import tempfile
+import time
+import numpy as np
+from app.transition_log import (INDEX_STRIDE, RECORD_DTYPE, SEGMENT_RECORDS, TransitionLog, _index_path,
+                                _segment_paths, query, summarize)
+
+PERIOD = 2.0
+DAYS = 30
+APPENDS = 100_000
+START = 1_700_000_000.0
+
+
+def _write_month(directory):
+    # Whole segments written in bulk, in the writer's layout, to keep set-up short
+    count = int(DAYS * 86400 / PERIOD)
+    os.makedirs(directory)
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+    records["timestamp"] = START + np.arange(count) * PERIOD
+    records["period"] = records["base"] = PERIOD
+    records["status"] = np.arange(count) % 2
+    for number, first in enumerate(range(0, count, SEGMENT_RECORDS), start=1):
+        path = os.path.join(directory, f"{number:08d}.seg")
+        chunk = records[first:first + SEGMENT_RECORDS]
+        chunk.tofile(path)
+        chunk["timestamp"][::INDEX_STRIDE].tofile(_index_path(path))
+    return count
+
+
+def _timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        log = TransitionLog(os.path.join(root, "appends"))
+        start = time.perf_counter()
+        for i in range(APPENDS):
+            log.append(START + i * PERIOD, "OPEN" if i % 2 == 0 else "CLOSE", PERIOD, PERIOD, "loop")
+        elapsed = time.perf_counter() - start
+        log.close()
+        print(f"append: {APPENDS / elapsed:,.0f} records/s ({elapsed / APPENDS * 1e6:.1f} us each)")
+
+        directory = os.path.join(root, "month")
+        count = _write_month(directory)
+        size = sum(os.path.getsize(p) for p in _segment_paths(directory))
+        print(f"\n{count:,} records in {len(_segment_paths(directory))} segments, {size / 2**20:.1f} MiB")
+
+        def full_load(start, end):
+            records = np.concatenate([np.fromfile(p, dtype=RECORD_DTYPE) for p in _segment_paths(directory)])
+            return records[(records["timestamp"] >= start) & (records["timestamp"] < end)]
+
+        end_of_month = START + DAYS * 86400
+        print(f"{'query':<22}{'records':>10}{'mmap + index':>16}{'full load':>14}")
+        for label, seconds in (("last hour", 3600), ("last day", 86400), ("last week", 7 * 86400)):
+            window = (end_of_month - seconds, end_of_month)
+            indexed, found = _timed(lambda: query(directory, *window))
+            loaded, expected = _timed(lambda: full_load(*window))
+            assert np.array_equal(found, expected)
+            print(f"{label:<22}{found.size:>10,}{indexed * 1e3:>13.2f} ms{loaded * 1e3:>11.2f} ms")
+        summary_time, summary = _timed(lambda: summarize(directory, end_of_month - 86400, end_of_month))
+        print(f"\nsummary of the last day: {summary['cycles']:,} cycles in {summary_time * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
 from device.config import RPI
 import time
 import numpy as np
+from device.framebuffer import pack_image, DirtyTracker
+from device.transport import SpiTransport, I2cTransport, invert
 
 Device_SPI = 1
 Device_I2C = 0
 
 LCD_WIDTH   = 128 #LCD width
 LCD_HEIGHT  = 64  #LCD height
+COLUMN_OFFSET = 2 #the 128 visible columns start at SH1106 RAM column 2
+
+# "software": frames arrive pre-rotated, panel uses the default mapping
+# "hardware": panel mirrors segments and COM scan (rotated 180 degrees)
+ORIENTATION_SOFTWARE = "software"
+ORIENTATION_HARDWARE = "hardware"
 
 class SH1106(object):
     def __init__(self):
@@ -17,15 +25,18 @@ class SH1106(object):
         self._dc = self.RPI.GPIO_DC_PIN
         self._rst = self.RPI.GPIO_RST_PIN
         self.Device = self.RPI.Device
+        if(self.Device == Device_SPI):
+            self.transport = SpiTransport(self.RPI.spi, lambda level: self.RPI.digital_write(self._dc, level))
+        else:
+            self.transport = I2cTransport(self.RPI.bus, self.RPI.address, use_rdwr=self.RPI.i2c_rdwr)
+        # Last frame sent to the panel, used to only push what changed
+        self.dirty = DirtyTracker(self.width, self.height)
+        self.orientation = ORIENTATION_SOFTWARE
 
 
     """    Write register address and data     """
     def command(self, cmd):
-        if(self.Device == Device_SPI):
-            self.RPI.digital_write(self._dc,False)
-            self.RPI.spi_writebyte([cmd])
-        else:
-            self.RPI.i2c_writebyte(0x00, cmd)
+        self.transport.command(cmd)
 
     # def data(self, val):
         # GPIO.output(self._dc, GPIO.HIGH)
@@ -36,13 +47,19 @@ class SH1106(object):
             return -1
         """Initialize dispaly"""    
         self.reset()
+        self.dirty.invalidate()
         self.command(0xAE);#--turn off oled panel
         self.command(0x02);#---set low column address
         self.command(0x10);#---set high column address
         self.command(0x40);#--set start line address  Set Mapping RAM Display Start Line (0x00~0x3F)
         self.command(0x81);#--set contrast control register
-        self.command(0xA0);#--Set SEG/Column Mapping     
-        self.command(0xC0);#Set COM/Row Scan Direction   
+        self.command(0xA0);#  contrast value (two-byte command)
+        if self.orientation == ORIENTATION_HARDWARE:
+            self.command(0xA1);#--Set SEG/Column Mapping (reversed)
+            self.command(0xC8);#Set COM/Row Scan Direction (reversed)
+        else:
+            self.command(0xA0);#--Set SEG/Column Mapping     
+            self.command(0xC0);#Set COM/Row Scan Direction   
         self.command(0xA6);#--set normal display
         self.command(0xA8);#--set multiplex ratio(1 to 64)
         self.command(0x3F);#--1/64 duty
@@ -74,30 +91,7 @@ class SH1106(object):
         time.sleep(0.1)
     
     def getbuffer(self, image):
-        # print "bufsiz = ",(self.width/8) * self.height
-        buf = [0xFF] * ((self.width//8) * self.height)
-        image_monocolor = image.convert('1')
-        imwidth, imheight = image_monocolor.size
-        pixels = image_monocolor.load()
-        # print "imwidth = %d, imheight = %d",imwidth,imheight
-        if(imwidth == self.width and imheight == self.height):
-            # print ("Vertical")
-            for y in range(imheight):
-                for x in range(imwidth):
-                    # Set the bits for the column of pixels at the current position.
-                    if pixels[x, y] == 0:
-                        buf[x + (y // 8) * self.width] &= ~(1 << (y % 8))
-                        # print x,y,x + (y * self.width)/8,buf[(x + y * self.width) / 8]
-                        
-        elif(imwidth == self.height and imheight == self.width):
-            # print ("Vertical")
-            for y in range(imheight):
-                for x in range(imwidth):
-                    newx = y
-                    newy = self.height - x - 1
-                    if pixels[x, y] == 0:
-                        buf[(newx + (newy // 8 )*self.width) ] &= ~(1 << (y % 8))
-        return buf
+        return pack_image(image, self.width, self.height)
     
     
     # def ShowImage(self,Image):
@@ -106,32 +100,20 @@ class SH1106(object):
         # for i in range(0,self.width * self.height/8):
             # config.spi_writebyte([~Image[i]])
             
-    def ShowImage(self, pBuf):
-        for page in range(0,8):
-            # set page address #
-            self.command(0xB0 + page)
-            # set low column address #
-            self.command(0x02); 
-            # set high column address #
-            self.command(0x10); 
-            # write data #
-            # time.sleep(0.01)
-            if(self.Device == Device_SPI):
-                self.RPI.digital_write(self._dc,True)
-            for i in range(0,self.width):#for(int i=0;i<self.width; i++)
-                if(self.Device == Device_SPI):
-                    self.RPI.spi_writebyte([~pBuf[i+self.width*page]]); 
-                else :
-                    self.RPI.i2c_writebyte(0x40, ~pBuf[i+self.width*page])
-                    
-                    
-
-	
+    def ShowImage(self, pBuf, force=False):
+        """Send the changed part of each page; force=True rewrites the whole frame."""
+        for page, start, end in self.dirty.spans(pBuf, force):
+            column = start + COLUMN_OFFSET
+            offset = self.width * page
+            # page address + low/high column address in one burst,
+            # then the changed columns in as few transfers as the bus allows
+            self.transport.command(0xB0 + page, column & 0x0F, 0x10 | (column >> 4))
+            self.transport.data(invert(pBuf[offset + start:offset + end]))
 
     def clear(self):
         """Clear contents of image buffer"""
         _buffer = [0xff]*(self.width * self.height//8)
-        self.ShowImage(_buffer) 
+        self.ShowImage(_buffer, force=True) 
             #print "%d",_buffer[i:i+4096]
     
     
@@ -28,6 +28,7 @@
 #
 
 
+import os
 import time
 from smbus import SMBus
 import spidev
@@ -52,10 +53,19 @@ KEY3_PIN       = 16
 Device_SPI = 1
 Device_I2C = 0
 
+# SPI clock, overridable with SPI_FREQ=<hz> (the SH1106 is rated for ~4 MHz)
+DEFAULT_SPI_FREQ = 1000000
+
 class RaspberryPi:
-    def __init__(self,spi=spidev.SpiDev(0,0),spi_freq=40000000,rst = 27,dc = 25,bl = 18,bl_freq=1000,i2c=None):
+    def __init__(self,spi=spidev.SpiDev(0,0),spi_freq=None,rst = 27,dc = 25,bl = 18,bl_freq=1000,i2c=None,i2c_rdwr=None):
         self.INPUT = False
         self.OUTPUT = True
+        if spi_freq is None:
+            spi_freq = int(os.getenv("SPI_FREQ", DEFAULT_SPI_FREQ))
+        self.spi_freq = spi_freq
+        if i2c_rdwr is None:
+            i2c_rdwr = os.getenv("I2C_RDWR") == "1"
+        self.i2c_rdwr = i2c_rdwr
         
         if(Device_SPI == 1):
             self.Device = Device_SPI
@@ -63,7 +73,12 @@ class RaspberryPi:
         else :
             self.Device = Device_I2C
             self.address = 0x3c
-            self.bus = SMBus(1)
+            if self.i2c_rdwr:
+                # Full-page i2c_rdwr messages need smbus2
+                from smbus2 import SMBus as SMBus2
+                self.bus = SMBus2(1)
+            else:
+                self.bus = SMBus(1)
         
         self.GPIO_RST_PIN = self.gpio_mode(RST_PIN,self.OUTPUT)
         self.GPIO_DC_PIN = self.gpio_mode(DC_PIN,self.OUTPUT)
@@ -114,7 +129,7 @@ class RaspberryPi:
     def module_init(self): 
         self.digital_write(self.GPIO_RST_PIN,False)
         if(self.Device == Device_SPI):
-            self.spi.max_speed_hz = 1000000
+            self.spi.max_speed_hz = self.spi_freq
             self.spi.mode = 0b11  
         # CS_PIN.off()
         self.digital_write(self.GPIO_DC_PIN,False)
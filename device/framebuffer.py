@@ -0,0 +1,102 @@
+import numpy as np
+
+PAGE_HEIGHT = 8
+
+
+def pack_image(image, width, height):
+    """
+    Pack a PIL image into the SH1106 page/column layout.
+
+    The result has one byte per column per 8-pixel page (LSB = top row of the
+    page), with 1 for white and 0 for black, exactly like the per-pixel loop
+    the Waveshare driver used to run. Images that are neither width x height
+    nor height x width come back blank (all 0xFF).
+    """
+    buf_len = (width // 8) * height
+    image_monocolor = image.convert('1')
+    imwidth, imheight = image_monocolor.size
+    # Mode '1' becomes a bool array of shape (rows, cols); True = white
+    black = ~np.asarray(image_monocolor, dtype=bool)
+
+    if imwidth == width and imheight == height:
+        pages = black.reshape(height // PAGE_HEIGHT, PAGE_HEIGHT, width)
+        packed = np.packbits(pages, axis=1, bitorder='little')[:, 0, :]
+        return bytearray((~packed).tobytes())
+
+    if imwidth == height and imheight == width:
+        # Portrait: source (x, y) lands on panel column y, row height - x - 1.
+        # The legacy loop clears bit (y % 8) rather than the row bit, so a
+        # column byte is either 0xFF or has a single bit cleared; keep that.
+        panel = black[:, ::-1].T
+        pages = panel.reshape(height // PAGE_HEIGHT, PAGE_HEIGHT, width).any(axis=1)
+        masks = (1 << (np.arange(width) % 8)).astype(np.uint8)
+        packed = np.where(pages, 0xFF & ~masks, 0xFF).astype(np.uint8)
+        return bytearray(packed.tobytes())
+
+    return bytearray([0xFF] * buf_len)
+
+
+def pack_image_reference(image, width, height):
+    """Original per-pixel packing loop, kept to verify pack_image against."""
+    buf = [0xFF] * ((width // 8) * height)
+    image_monocolor = image.convert('1')
+    imwidth, imheight = image_monocolor.size
+    pixels = image_monocolor.load()
+    if imwidth == width and imheight == height:
+        for y in range(imheight):
+            for x in range(imwidth):
+                if pixels[x, y] == 0:
+                    buf[x + (y // 8) * width] &= ~(1 << (y % 8))
+    elif imwidth == height and imheight == width:
+        for y in range(imheight):
+            for x in range(imwidth):
+                newx = y
+                newy = height - x - 1
+                if pixels[x, y] == 0:
+                    buf[(newx + (newy // 8) * width)] &= ~(1 << (y % 8))
+    return buf
+
+
+class DirtyTracker:
+    """
+    Remembers the last frame pushed to the panel and works out which part of
+    each page changed since then.
+
+    spans() returns (page, start, end) column ranges, end exclusive, covering
+    everything that differs from the previous frame. The first frame, and any
+    frame after invalidate() or with force=True, is sent in full.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.pages = height // PAGE_HEIGHT
+        self._last = None
+        self.frames = 0
+        self.last_bytes_sent = 0
+        self.last_bytes_saved = 0
+        self.total_bytes_sent = 0
+        self.total_bytes_saved = 0
+
+    def invalidate(self):
+        """Forget the last frame so the next one is sent in full."""
+        self._last = None
+
+    def spans(self, buf, force=False):
+        frame = np.frombuffer(bytes(buf), dtype=np.uint8).reshape(self.pages, self.width)
+        if force or self._last is None:
+            spans = [(page, 0, self.width) for page in range(self.pages)]
+        else:
+            spans = []
+            for page, changed in enumerate(frame != self._last):
+                columns = np.flatnonzero(changed)
+                if columns.size:
+                    spans.append((page, int(columns[0]), int(columns[-1]) + 1))
+        self._last = frame
+
+        sent = sum(end - start for _, start, end in spans)
+        self.frames += 1
+        self.last_bytes_sent = sent
+        self.last_bytes_saved = frame.size - sent
+        self.total_bytes_sent += sent
+        self.total_bytes_saved += frame.size - sent
+        return spans
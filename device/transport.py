@@ -0,0 +1,82 @@
+"""
+Bus transports for the SH1106 driver.
+
+These only depend on the spidev/SMBus-like objects they are given, so they
+can be exercised off-device with the recording stand-ins in
+features/steps/mocks.
+"""
+
+# SH1106 RAM is written inverted relative to the packed frame buffer
+INVERT_TABLE = bytes(0xFF - i for i in range(256))
+
+
+def invert(data):
+    return bytes(data).translate(INVERT_TABLE)
+
+
+class SpiTransport:
+    """
+    Page-burst SPI writer.
+    DC is driven once per burst and every burst is a single spidev call.
+    """
+    # spidev.writebytes() refuses lists longer than the kernel bufsiz
+    WRITEBYTES_LIMIT = 4096
+
+    def __init__(self, spi, set_dc):
+        self.spi = spi
+        self._set_dc = set_dc
+        self._writebytes2 = getattr(spi, "writebytes2", None)
+
+    def _write(self, data):
+        if self._writebytes2 is not None:
+            self._writebytes2(data)
+            return
+        data = list(data)
+        for start in range(0, len(data), self.WRITEBYTES_LIMIT):
+            self.spi.writebytes(data[start:start + self.WRITEBYTES_LIMIT])
+
+    def command(self, *cmds):
+        self._set_dc(False)
+        self._write(bytes(cmds))
+
+    def data(self, buf):
+        self._set_dc(True)
+        self._write(buf)
+
+
+class I2cTransport:
+    """
+    Block-write I2C transport.
+    Each burst goes out as write_i2c_block_data transactions of at most
+    block_size bytes, or, with use_rdwr, as one i2c_rdwr message per burst.
+    """
+    # I2C_SMBUS_BLOCK_MAX in linux/i2c.h
+    SMBUS_BLOCK_MAX = 32
+    CONTROL_COMMAND = 0x00
+    CONTROL_DATA = 0x40
+
+    def __init__(self, bus, address, block_size=SMBUS_BLOCK_MAX, use_rdwr=False, i2c_msg=None):
+        if not 1 <= block_size <= self.SMBUS_BLOCK_MAX:
+            raise ValueError(f"block_size must be between 1 and {self.SMBUS_BLOCK_MAX}")
+        self.bus = bus
+        self.address = address
+        self.block_size = block_size
+        self.use_rdwr = use_rdwr
+        if use_rdwr and i2c_msg is None:
+            # i2c_rdwr is only available in smbus2
+            from smbus2 import i2c_msg
+        self._i2c_msg = i2c_msg
+
+    def _write(self, control, data):
+        data = bytes(data)
+        if self.use_rdwr:
+            self.bus.i2c_rdwr(self._i2c_msg.write(self.address, bytes([control]) + data))
+            return
+        for start in range(0, len(data), self.block_size):
+            self.bus.write_i2c_block_data(self.address, control, list(data[start:start + self.block_size]))
+
+    def command(self, *cmds):
+        self._write(self.CONTROL_COMMAND, cmds)
+
+    def data(self, buf):
+        self._write(self.CONTROL_DATA, buf)
@@ -1,6 +1,7 @@
 import time
 import os
 from unittest.mock import patch
+from app.settings_store import MemoryBackend
 
 
 def before_scenario(context, scenario):
@@ -16,19 +17,27 @@ def after_scenario(context, scenario):
     if hasattr(context, "_original_monotonic"):
         time.monotonic = context._original_monotonic
 
+def before_feature(context, feature):
+    # Every TimerController in the feature (including after a "reboot") shares one
+    # in-memory settings backend, so nothing touches settings.json and each
+    # feature starts from defaults
+    context._settings_patcher = patch("app.settings_store._get_settings_backend",
+                                      return_value=MemoryBackend())
+    context._settings_patcher.start()
+
 def after_feature(context, feature):
-    # Clean up settings.json after each feature to prevent test pollution
-    if os.path.exists("settings.json"):
-        try:
-            os.remove("settings.json")
-        except:
-            pass
+    context._settings_patcher.stop()
 
 
 def before_all(context):
     # Patch time.sleep to instantly return, for all steps
     context._sleep_patcher = patch("time.sleep", return_value=None)
     context._sleep_patcher.start()
+    # Steps read settings back (e.g. after a "reboot"), so write them on every save
+    os.environ.setdefault("SETTINGS_FLUSH_DELAY", "0")
+    # Every scenario starts a fresh device, so keep no runtime journal or transition log
+    os.environ.setdefault("JOURNAL_FILE", "")
+    os.environ.setdefault("TRANSITION_LOG_DIR", "")
 
 def after_all(context):
     # Stop the patch after all tests are done
@@ -10,7 +10,9 @@ def step_timer_disabled(context):
 
 @when('the user presses {key}')
 @when('the user presses {key} for {seconds:d} seconds')
-def step_press_key_for_seconds(context, key, seconds=2):
+def step_press_key_for_seconds(context, key, seconds=None):
+    if seconds is None:
+        seconds = 0.1  # A short tap
     GPIO = _get_gpio_module()
     pin = context.buttons._pin_mapping[key]
     with patch("time.sleep", return_value=None):
@@ -19,9 +21,9 @@ def step_press_key_for_seconds(context, key, seconds=2):
         # Call controller logic to process the press
         context.controller.handle_buttons()
 
-        # Simulate "holding" the button (sleep is mocked, so instant)
-        import time
-        time.sleep(seconds)
+        # Simulate "holding" the button: advance the fake monotonic clock,
+        # press durations come from the edge timestamps
+        context._fake_time += seconds
 
         # Simulate release
         GPIO._release(pin)
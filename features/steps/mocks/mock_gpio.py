@@ -11,10 +11,14 @@ class GPIOClass:
     PUD_DOWN = 'PUD_DOWN'
     LOW = 0
     HIGH = 1
+    RISING = 'RISING'
+    FALLING = 'FALLING'
+    BOTH = 'BOTH'
 
     def __init__(self):
         self._mode = None
         self._pins = {}
+        self._edge_callbacks = {}
 
     def setmode(self, mode):
         self._mode = mode
@@ -35,21 +39,48 @@ class GPIOClass:
         self._pins[pin]['state'] = state
         logger.debug(f"Mock GPIO: output(pin={pin}, state={state})")
 
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        if pin in self._edge_callbacks:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        self._edge_callbacks[pin] = (edge, [callback] if callback else [])
+        logger.debug(f"Mock GPIO: add_event_detect(pin={pin}, edge={edge})")
+
+    def add_event_callback(self, pin, callback):
+        if pin not in self._edge_callbacks:
+            raise RuntimeError("Add event detection using add_event_detect first before adding a callback")
+        self._edge_callbacks[pin][1].append(callback)
+
+    def remove_event_detect(self, pin):
+        self._edge_callbacks.pop(pin, None)
+
     def cleanup(self):
         logger.debug("Mock GPIO: cleanup()")
         self._pins.clear()
+        self._edge_callbacks.clear()
+
+    def _fire_edge(self, pin, old_state, new_state):
+        if old_state == new_state or pin not in self._edge_callbacks:
+            return
+        edge, callbacks = self._edge_callbacks[pin]
+        if edge == self.BOTH or edge == (self.FALLING if new_state == self.LOW else self.RISING):
+            for callback in list(callbacks):
+                callback(pin)
 
     # Helpers for test/GUI
     def _press(self, pin):
         if pin not in self._pins:
             self._pins[pin] = {'mode': self.IN, 'pull': self.PUD_UP, 'state': self.HIGH}
+        old_state = self._pins[pin]['state']
         self._pins[pin]['state'] = self.LOW
         logger.debug(f"Mock GPIO: _press(pin={pin}) (state=LOW)")
+        self._fire_edge(pin, old_state, self.LOW)
 
     def _release(self, pin):
         if pin not in self._pins:
             self._pins[pin] = {'mode': self.IN, 'pull': self.PUD_UP, 'state': self.HIGH}
+        old_state = self._pins[pin]['state']
         self._pins[pin]['state'] = self.HIGH
         logger.debug(f"Mock GPIO: _release(pin={pin}) (state=HIGH)")
+        self._fire_edge(pin, old_state, self.HIGH)
 
 GPIO = GPIOClass()
\ No newline at end of file
@@ -15,6 +15,13 @@ logger = logging.getLogger(__name__)
 LCD_WIDTH   = 128
 LCD_HEIGHT  = 64
 
+ORIENTATION_SOFTWARE = "software"
+ORIENTATION_HARDWARE = "hardware"
+
+class MockBuffer(list):
+    """Packed buffer stand-in that remembers the image it was made from."""
+    image = None
+
 def is_x64():
     arch = platform.machine().lower()
     return 'x86_64' in arch or 'amd64' in arch
@@ -32,6 +39,7 @@ class SH1106(object):
         self.buffer = []  # Stores "drawn" operations as logs
         self.is_cleared = False
         self.last_image = None  # For display in Tkinter
+        self.orientation = ORIENTATION_SOFTWARE
 
         # Only show the GUI if on x64 and Tkinter is available and not already started
         if is_x64() and tk and SH1106._thinkerer is None:
@@ -46,8 +54,9 @@ class SH1106(object):
         # Simulate initialization sequence
         self.buffer.append("[MOCK] Init called")
         self.reset()
+        seg_remap, com_scan = (0xA1, 0xC8) if self.orientation == ORIENTATION_HARDWARE else (0xA0, 0xC0)
         for cmd in [
-            0xAE, 0x02, 0x10, 0x40, 0x81, 0xA0, 0xC0, 0xA6, 0xA8, 0x3F, 0xD3, 0x00,
+            0xAE, 0x02, 0x10, 0x40, 0x81, 0xA0, seg_remap, com_scan, 0xA6, 0xA8, 0x3F, 0xD3, 0x00,
             0xd5, 0x80, 0xD9, 0xF1, 0xDA, 0x12, 0xDB, 0x40, 0x20, 0x02, 0xA4, 0xA6
         ]:
             self.command(cmd)
@@ -65,14 +74,18 @@ class SH1106(object):
         self.buffer.append("[MOCK] getbuffer called")
         # Save the latest image for GUI display
         self.last_image = image
-        return [0x00] * ((self.width//8) * self.height)
+        buf = MockBuffer([0x00] * ((self.width//8) * self.height))
+        buf.image = image
+        return buf
 
-    def ShowImage(self, pBuf):
+    def ShowImage(self, pBuf, force=False):
         # Log the image buffer display
-        self.buffer.append(f"[MOCK] ShowImage called with buffer size {len(pBuf)}")
-        # If there's a GUI, display the last image
+        self.buffer.append(f"[MOCK] ShowImage called with buffer size {len(pBuf)}{' (forced)' if force else ''}")
+        # If there's a GUI, display the image the buffer was made from
+        # (a cached buffer can be shown again without a getbuffer call)
+        self.last_image = getattr(pBuf, "image", None) or self.last_image
         if self.thinkerer and self.last_image:
-            self.thinkerer.update_image(self.last_image)
+            self.thinkerer.update_image(self.last_image, hardware_rotated=self.orientation == ORIENTATION_HARDWARE)
 
     def clear(self):
         # Simulate clearing the display
@@ -109,6 +122,10 @@ class Thinkerer:
     def __init__(self, width, height):
         self.width = width
         self.height = height
+        # When Tk is pumped from an asyncio loop, updates from other threads
+        # are parked here and applied by pump() on the Tk thread
+        self.defer_updates = False
+        self._pending = None
         self.root = tk.Tk()
         self.root.title("SH1106 Mock Display (Thinkerer)")
         self.root.resizable(False, False)
@@ -171,15 +188,38 @@ class Thinkerer:
         except ImportError:
             pass
 
-    def update_image(self, pil_image):
+    def update_image(self, pil_image, hardware_rotated=False):
         if not pil_image or not ImageTk:
             return
-        img = pil_image.rotate(180)
+        if self.defer_updates:
+            self._pending = ("image", pil_image.copy(), hardware_rotated)
+            return
+        self._show(pil_image, hardware_rotated)
+
+    def _show(self, pil_image, hardware_rotated):
+        # The panel is mounted upside down: frames are either rotated in
+        # software before they get here, or by the panel's scan direction
+        img = pil_image if hardware_rotated else pil_image.rotate(180)
         img = img.resize((self.width*3, self.height*3))
         self.tk_img = ImageTk.PhotoImage(img)
         self.label.configure(image=self.tk_img)
         self.label.image = self.tk_img
 
     def clear(self):
+        if self.defer_updates:
+            self._pending = ("clear",)
+            return
+        self._clear()
+
+    def _clear(self):
         self.label.configure(image=None)
-        self.label.image = None
\ No newline at end of file
+        self.label.image = None
+
+    def pump(self):
+        """Apply any deferred update and process Tk events. Tk thread only."""
+        pending, self._pending = self._pending, None
+        if pending and pending[0] == "image":
+            self._show(pending[1], pending[2])
+        elif pending:
+            self._clear()
+        self.root.update()
\ No newline at end of file
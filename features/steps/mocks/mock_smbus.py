@@ -0,0 +1,55 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class i2c_msg:
+    """Stand-in for smbus2.i2c_msg (write messages only)."""
+
+    def __init__(self, addr, buf):
+        self.addr = addr
+        self.buf = bytes(buf)
+        self.len = len(self.buf)
+
+    @classmethod
+    def write(cls, address, buf):
+        return cls(address, buf)
+
+
+class SMBus:
+    """
+    Recording stand-in for smbus/smbus2.SMBus.
+    Each bus transaction is stored as (kind, address, payload) where payload
+    includes the control/register byte, so tests can assert bus efficiency.
+    """
+
+    def __init__(self, bus=1):
+        self.bus = bus
+        self.transactions = []
+        self.closed = False
+
+    def write_byte_data(self, addr, reg, value):
+        self.transactions.append(("byte", addr, bytes([reg, value & 0xFF])))
+
+    def write_i2c_block_data(self, addr, reg, data):
+        if len(data) > 32:
+            raise ValueError("Data length cannot exceed 32 bytes")
+        self.transactions.append(("block", addr, bytes([reg]) + bytes(data)))
+
+    def i2c_rdwr(self, *msgs):
+        for msg in msgs:
+            self.transactions.append(("rdwr", msg.addr, msg.buf))
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def transaction_count(self):
+        return len(self.transactions)
+
+    @property
+    def bytes_written(self):
+        return sum(len(payload) for _, _, payload in self.transactions)
+
+    def reset_log(self):
+        self.transactions.clear()
@@ -0,0 +1,46 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SpiDev:
+    """
+    Recording stand-in for spidev.SpiDev.
+    Every write call is stored so tests and benchmarks can count transfers and bytes.
+    """
+
+    def __init__(self, bus=0, device=0):
+        self.bus = bus
+        self.device = device
+        self.max_speed_hz = 0
+        self.mode = 0
+        self.transfers = []  # list of bytes, one entry per write call
+        self.closed = False
+
+    def writebytes(self, data):
+        data = list(data)
+        if len(data) > 4096:
+            raise OverflowError("Argument list size exceeds 4096 bytes.")
+        self.transfers.append(bytes(b & 0xFF for b in data))
+
+    def writebytes2(self, data):
+        self.transfers.append(bytes(data))
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def bytes_written(self):
+        return sum(len(t) for t in self.transfers)
+
+    def reset_log(self):
+        self.transfers.clear()
+
+
+class LegacySpiDev(SpiDev):
+    """spidev before 3.5, which has no writebytes2()."""
+
+    def __getattribute__(self, name):
+        if name == "writebytes2":
+            raise AttributeError(name)
+        return super().__getattribute__(name)
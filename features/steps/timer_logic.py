@@ -25,6 +25,9 @@ def step_advance_time(context, seconds):
     if hasattr(context, "_fake_time"):
         context._fake_time += seconds
     context.timer.update()
+    # Like the controller, pass the boundary the zero frame is shown for
+    if context.timer.show_zero:
+        context.timer.transition()
 
 @then('the output should be OPEN for {seconds:d} seconds')
 def step_check_output_open_duration(context, seconds):
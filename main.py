@@ -1,5 +1,6 @@
+import sys
 import logging
-from app.utils import is_x64, is_debug, run_with_thinkerer
+from app.utils import is_x64, is_debug, is_async, run_with_thinkerer, run_with_thinkerer_async
 
 if is_debug():
     logging.basicConfig(level=logging.DEBUG)
@@ -12,8 +13,35 @@ def main_logic(sh1106=None):
     app = AppController(debug=debug, display_hardware=sh1106)
     app.run()
 
+def main_async(sh1106=None, thinkerer=None):
+    from app.async_runtime import run_async
+    run_async(display_hardware=sh1106, thinkerer=thinkerer, debug=is_debug())
+
+def main_simulate(argv):
+    from app.simulator import main as simulate
+    return simulate(argv)
+
+def main_lookahead(argv):
+    from app.lookahead import main as lookahead
+    return lookahead(argv)
+
+def main_transitions(argv):
+    from app.transition_log import main as transitions
+    return transitions(argv)
+
 if __name__ == '__main__':
-    if is_x64():
+    if sys.argv[1:2] == ["simulate"]:
+        sys.exit(main_simulate(sys.argv[2:]))
+    elif sys.argv[1:2] == ["lookahead"]:
+        sys.exit(main_lookahead(sys.argv[2:]))
+    elif sys.argv[1:2] == ["transitions"]:
+        sys.exit(main_transitions(sys.argv[2:]))
+    elif is_async():
+        if is_x64():
+            run_with_thinkerer_async(main_async, app_name="App")
+        else:
+            main_async()
+    elif is_x64():
         run_with_thinkerer(main_logic, app_name="App")
     else:
         main_logic()
\ No newline at end of file
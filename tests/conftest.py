@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_storage_files(monkeypatch):
+    """Keep settings in memory, and the runtime journal and transition log off, unless a test asks for files."""
+    monkeypatch.setenv("SETTINGS_BACKEND", "memory")
+    monkeypatch.setenv("JOURNAL_FILE", "")
+    monkeypatch.setenv("TRANSITION_LOG_DIR", "")
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import pytest
+from app.async_runtime import AsyncRuntime
+
+
+@pytest.fixture
+def make_controller(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    shown = []
+
+    def factory():
+        from app.controller import AppController
+        from features.steps.mocks.mock_sh1106 import SH1106
+        hw = SH1106()
+        show = hw.ShowImage
+
+        def recording_show(buf, force=False):
+            shown.append(threading.current_thread().name)
+            return show(buf, force)
+        hw.ShowImage = recording_show
+        return AppController(display_hardware=hw)
+
+    factory.shown = shown
+    return factory
+
+
+async def _until(predicate, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    end = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < end, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_runtime_handles_input_and_renders_off_loop(make_controller):
+    runtime = AsyncRuntime(make_controller)
+
+    async def scenario():
+        task = asyncio.create_task(runtime.run())
+        await _until(lambda: runtime.controller is not None and runtime.controller.frame_sink is not None)
+        controller = runtime.controller
+        from app.input import GPIO
+        pin = controller.buttons._pin_mapping["KEY2"]
+        GPIO._press(pin)
+        await asyncio.sleep(0.05)
+        GPIO._release(pin)
+        await _until(lambda: controller.timer.enabled)
+        # Spinner frames keep coming while the timer runs
+        await _until(lambda: runtime.frames_sent >= 3)
+        runtime.stop()
+        await asyncio.wait_for(task, 2.0)
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.timer.elapsed > 0
+    assert make_controller.shown
+    assert all(name.startswith("display-bus") for name in make_controller.shown)
+    assert controller.scheduler.wakeups > 0
+
+
+def test_latest_frame_wins_while_bus_is_busy(make_controller):
+    runtime = AsyncRuntime(make_controller)
+    runtime._submit_frame([1])
+    runtime._submit_frame([2])
+    assert runtime._pending_frame == [2]
+    assert runtime.frames_replaced == 1
@@ -0,0 +1,205 @@
+import itertools
+import random
+import pytest
+from PIL import Image, ImageDraw
+from app.display import Display
+from features.steps.mocks.mock_sh1106 import SH1106
+
+
+def _legacy_render(display, open_num, close_num, status_a, status_b, status_c,
+                   open_base=None, close_base=None, open_next=None, close_next=None):
+    """The renderer as it was before layering: background rebuilt and every text redrawn."""
+    width, height = display.width, display.height
+    image = Image.new('1', (width, height), "WHITE")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width - 1, 15), outline=0, fill=100)
+    section_w = width // 3
+    draw.text((2, 2), status_a, font=display.font_status, fill=0)
+    bbox_b = display.font_status.getbbox(status_b)
+    draw.text((section_w + (section_w - (bbox_b[2] - bbox_b[0])) // 2, 2), status_b, font=display.font_status, fill=0)
+    draw.text((2 * section_w + 2, 2), status_c, font=display.font_status, fill=0)
+
+    for y, label, number, base, next_val in ((18, "OPEN", open_num, open_base, open_next),
+                                             (42, "CLOSE", close_num, close_base, close_next)):
+        number_str = str(number)
+        label_bbox = display.font_label.getbbox(label)
+        label_h = label_bbox[3] - label_bbox[1]
+        number_bbox = display.font_number.getbbox(number_str)
+        number_w = number_bbox[2] - number_bbox[0]
+        number_h = number_bbox[3] - number_bbox[1]
+        num_x = width - number_w - 30
+        num_y = y + max(0, (label_h - number_h) // 2) + 2
+        draw.text((5, y), label, font=display.font_label, fill=0)
+        draw.text((num_x, num_y), number_str, font=display.font_number, fill=0)
+        next_x = num_x + number_w + 6
+        if base is not None:
+            base_str = f"({base})"
+            base_bbox = display.font_small.getbbox(base_str)
+            base_y = num_y + (number_h - base_bbox[3] + base_bbox[1]) // 2
+            draw.text((next_x, base_y), base_str, font=display.font_small, fill=0)
+            next_x = next_x + base_bbox[2] - base_bbox[0] + 8
+        if next_val is not None:
+            next_str = f"→{next_val}"
+            next_bbox = display.font_small.getbbox(next_str)
+            next_y = num_y + (number_h - next_bbox[3] + next_bbox[1]) // 2
+            draw.text((next_x, next_y), next_str, font=display.font_small, fill=0)
+    return image
+
+
+def _states(count, seed=1):
+    rng = random.Random(seed)
+    spinner = itertools.cycle(["|", "/", "-", "\\", ""])
+    for _ in range(count):
+        open_next = rng.choice([None, rng.randint(1, 300)])
+        yield dict(
+            open_num=rng.choice([0, rng.randint(0, 9), rng.randint(10, 999)]),
+            close_num=rng.randint(0, 120),
+            status_a=next(spinner),
+            status_b=rng.choice(["", "EDIT", "B"]),
+            status_c=rng.choice(["loop", "random"]),
+            open_base=rng.choice([None, rng.randint(1, 300)]),
+            close_base=rng.randint(1, 300),
+            open_next=open_next,
+            close_next=None if open_next is not None else rng.randint(1, 300),
+        )
+
+
+def _same_pixels(a, b):
+    # Compare the 1-bit data the panel receives; the status bar's fill=100 is
+    # stored as 100 by ImageDraw but packs to the same bit as 255
+    return a.tobytes() == b.tobytes()
+
+
+@pytest.fixture
+def display():
+    return Display(hardware=SH1106())
+
+
+def test_layered_render_matches_full_render(display):
+    for state in _states(300):
+        display._render_status_and_numbers(**state)
+        expected = _legacy_render(display, **state)
+        assert _same_pixels(display.image, expected), state
+
+
+def test_static_layer_is_reused(display):
+    display.draw_layout(5, 5, "", "", "loop", open_base=5, close_base=5)
+    static = display.static_layer
+    image = display.image
+    display.draw_layout(4, 5, "|", "", "loop", open_base=5, close_base=5)
+    assert display.static_layer is static
+    assert display.image is image
+
+
+def test_invalidate_layout_recomposes(display):
+    display.draw_layout(5, 5, "", "", "loop", open_base=5, close_base=5)
+    ImageDraw.Draw(display.image).rectangle((10, 10, 100, 50), fill=0)
+    display.invalidate_layout()
+    display.draw_layout(5, 5, "", "", "loop", open_base=5, close_base=5)
+    expected = _legacy_render(display, 5, 5, "", "", "loop", open_base=5, close_base=5)
+    assert _same_pixels(display.image, expected)
+
+
+def test_hardware_orientation_skips_rotation():
+    display = Display(hardware=SH1106(), orientation="hardware")
+    assert display.hw.orientation == "hardware"
+    display.draw_layout(5, 5, "", "", "loop", open_base=5, close_base=5)
+    display.getbuffer(display.image)
+    assert display.hw.last_image is display.image
+    display.hw.Init()
+    assert "[MOCK] command: 0xa1" in display.hw.buffer
+    assert "[MOCK] command: 0xc8" in display.hw.buffer
+
+
+def test_software_orientation_rotates_frames():
+    display = Display(hardware=SH1106(), orientation="software")
+    display.draw_layout(5, 5, "", "", "loop", open_base=5, close_base=5)
+    display.getbuffer(display.image)
+    rotated = display.image.transpose(Image.ROTATE_180)
+    assert display.hw.last_image.tobytes() == rotated.tobytes()
+    display.hw.Init()
+    assert "[MOCK] command: 0xa0" in display.hw.buffer
+
+
+def test_orientation_from_environment(monkeypatch):
+    assert Display(hardware=SH1106()).orientation == "software"
+    monkeypatch.setenv("DISPLAY_ORIENTATION", "hardware")
+    assert Display(hardware=SH1106()).orientation == "hardware"
+    monkeypatch.setenv("DISPLAY_ORIENTATION", "sideways")
+    with pytest.raises(ValueError):
+        Display(hardware=SH1106())
+
+
+class _TimerState:
+    def __init__(self, **kwargs):
+        self.open_time = 5
+        self.close_time = 3
+        self.elapsed = 0
+        self.open_time_base = 5
+        self.close_time_base = 3
+        self.status = "OPEN"
+        self.next_time = 4
+        self.status_a = ""
+        self.status_b = ""
+        self.status_c = "loop"
+        self.__dict__.update(kwargs)
+
+
+def test_unchanged_state_skips_render(display):
+    timer = _TimerState()
+    assert display.update_values(timer) is True
+    frame = display.image.tobytes()
+    assert display.update_values(timer) is False
+    assert display.update_values(timer) is False
+    assert display.frames_rendered == 1
+    assert display.frames_skipped == 2
+    assert display.image.tobytes() == frame
+
+
+def test_visible_change_renders(display):
+    timer = _TimerState()
+    display.update_values(timer)
+    for change in (dict(elapsed=1), dict(status_a="|"), dict(next_time=9), dict(status="CLOSE")):
+        timer.__dict__.update(change)
+        assert display.update_values(timer) is True, change
+    assert display.update_values(timer, force=True) is True
+    assert display.frames_rendered == 6
+    assert display.frames_skipped == 0
+
+
+def _show(display, timer):
+    if display.update_values(timer):
+        return display.getbuffer(display.image)
+    return None
+
+
+def test_repeated_states_come_from_frame_cache():
+    cached = Display(hardware=SH1106(), frame_cache_size=32)
+    fresh = Display(hardware=SH1106(), frame_cache_size=0)
+    timer = _TimerState()
+    spinner = ["|", "/", "-", "\\"]
+    # Two passes over the same loop of states; the second is all cache hits
+    for _ in range(2):
+        for elapsed in range(5):
+            for symbol in spinner:
+                timer.elapsed, timer.status_a = elapsed, symbol
+                _show(cached, timer)
+                _show(fresh, timer)
+                assert _same_pixels(cached.image, fresh.image)
+    stats = cached.frame_cache.stats()
+    assert stats["misses"] == 20
+    assert stats["hits"] == 20
+    assert cached.frames_rendered == 20
+    packs = sum(1 for entry in cached.hw.buffer if entry == "[MOCK] getbuffer called")
+    assert packs == 20
+
+    # Incremental compositing still works after a frame restored from cache
+    timer.elapsed, timer.status_a, timer.next_time = 2, "", 77
+    _show(cached, timer)
+    _show(fresh, timer)
+    assert _same_pixels(cached.image, fresh.image)
+
+
+def test_frame_cache_size_from_environment(monkeypatch):
+    monkeypatch.setenv("FRAME_CACHE_SIZE", "3")
+    assert Display(hardware=SH1106()).frame_cache.maxsize == 3
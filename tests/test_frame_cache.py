@@ -0,0 +1,38 @@
+import pytest
+from app.frame_cache import FrameCache
+
+
+def test_lru_eviction_order():
+    cache = FrameCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "a" is now most recent
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.evictions == 1
+
+
+def test_stats_count_hits_and_misses():
+    cache = FrameCache(maxsize=4)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_zero_size_disables_cache():
+    cache = FrameCache(maxsize=0)
+    cache.put("a", 1)
+    assert len(cache) == 0
+    assert cache.get("a") is None
+
+
+def test_negative_size_rejected():
+    with pytest.raises(ValueError):
+        FrameCache(maxsize=-1)
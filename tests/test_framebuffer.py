@@ -0,0 +1,70 @@
+import random
+import pytest
+from PIL import Image, ImageDraw
+from device.framebuffer import pack_image, pack_image_reference, DirtyTracker
+
+WIDTH = 128
+HEIGHT = 64
+
+
+def _random_image(size, mode='1', seed=0):
+    rng = random.Random(seed)
+    image = Image.new(mode, size, 255)
+    draw = ImageDraw.Draw(image)
+    for _ in range(20):
+        x0, y0 = rng.randrange(size[0]), rng.randrange(size[1])
+        x1, y1 = rng.randrange(x0, size[0]), rng.randrange(y0, size[1])
+        draw.rectangle((x0, y0, x1, y1), outline=0, fill=rng.choice((0, 255)))
+    draw.text((3, 3), "OPEN 42", fill=0)
+    return image
+
+
+@pytest.mark.parametrize("size", [(WIDTH, HEIGHT), (HEIGHT, WIDTH)])
+@pytest.mark.parametrize("seed", range(5))
+def test_pack_image_matches_reference(size, seed):
+    image = _random_image(size, seed=seed)
+    buf = pack_image(image, WIDTH, HEIGHT)
+    assert isinstance(buf, bytearray)
+    assert list(buf) == pack_image_reference(image, WIDTH, HEIGHT)
+
+
+def test_pack_image_converts_greyscale_like_reference():
+    image = _random_image((WIDTH, HEIGHT), mode='L', seed=7)
+    image.putpixel((10, 10), 90)
+    assert list(pack_image(image, WIDTH, HEIGHT)) == pack_image_reference(image, WIDTH, HEIGHT)
+
+
+def test_pack_image_unknown_size_is_blank():
+    image = Image.new('1', (10, 10), 0)
+    assert pack_image(image, WIDTH, HEIGHT) == bytearray([0xFF] * (WIDTH // 8 * HEIGHT))
+
+
+def test_dirty_tracker_first_frame_is_full():
+    tracker = DirtyTracker(WIDTH, HEIGHT)
+    spans = tracker.spans(bytes(WIDTH * 8))
+    assert spans == [(page, 0, WIDTH) for page in range(8)]
+    assert tracker.last_bytes_saved == 0
+
+
+def test_dirty_tracker_sends_only_changed_columns():
+    tracker = DirtyTracker(WIDTH, HEIGHT)
+    frame = bytearray([0xFF] * (WIDTH * 8))
+    tracker.spans(frame)
+    frame[2 * WIDTH + 10] = 0x00
+    frame[2 * WIDTH + 20] = 0x0F
+    frame[5 * WIDTH + 127] = 0x01
+    assert tracker.spans(frame) == [(2, 10, 21), (5, 127, 128)]
+    assert tracker.last_bytes_sent == 12
+    assert tracker.last_bytes_saved == WIDTH * 8 - 12
+    assert tracker.spans(frame) == []
+    assert tracker.last_bytes_saved == WIDTH * 8
+
+
+def test_dirty_tracker_force_and_invalidate():
+    tracker = DirtyTracker(WIDTH, HEIGHT)
+    frame = bytes(WIDTH * 8)
+    tracker.spans(frame)
+    assert len(tracker.spans(frame, force=True)) == 8
+    tracker.invalidate()
+    assert len(tracker.spans(frame)) == 8
+    assert tracker.total_bytes_sent == 3 * WIDTH * 8
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+from app.glyphs import GlyphAtlas, TextRenderer
+
+
+@pytest.fixture(params=[10, 11, 18])
+def font(request):
+    return ImageFont.load_default(request.param)
+
+
+def _pil_frame(text, font, xy, size=(128, 64)):
+    image = Image.new('1', size, 255)
+    ImageDraw.Draw(image).text(xy, text, font=font, fill=0)
+    return np.array(image, dtype=bool)
+
+
+@pytest.mark.parametrize("text", ["0", "7", "42", "300", "1234567890", "(5)", "(120)", "→17", "|", "/", "-", "\\"])
+def test_renderer_matches_pil(font, text):
+    renderer = TextRenderer((font,))
+    for xy in [(0, 0), (60, 20), (-3, -2), (120, 58)]:
+        frame = np.ones((64, 128), dtype=bool)
+        renderer.draw(frame, xy, text, font)
+        assert np.array_equal(frame, _pil_frame(text, font, xy)), (text, xy)
+
+
+def test_atlas_covers_timer_strings(font):
+    atlas = GlyphAtlas(font)
+    if not atlas.usable:
+        pytest.skip("FreeType not available")
+    for text in ["0", "59", "(300)", "→12", "/"]:
+        assert atlas.covers(text)
+    assert not atlas.covers("loop")
+
+
+def test_text_outside_atlas_falls_back_to_pil(font):
+    renderer = TextRenderer((font,))
+    frame = np.ones((64, 128), dtype=bool)
+    renderer.draw(frame, (2, 2), "random", font)
+    assert np.array_equal(frame, _pil_frame("random", font, (2, 2)))
+
+
+def test_ink_box_bounds_painted_pixels(font):
+    renderer = TextRenderer((font,))
+    x0, y0, x1, y1 = renderer.ink_box((30, 20), "(42)", font)
+    ink = ~_pil_frame("(42)", font, (30, 20))
+    rows, cols = np.flatnonzero(ink.any(axis=1)), np.flatnonzero(ink.any(axis=0))
+    assert (x0, y0, x1, y1) == (cols[0], rows[0], cols[-1] + 1, rows[-1] + 1)
+    assert renderer.ink_box((0, 0), "", font) is None
@@ -49,4 +49,127 @@ def test_joystick_input_active(joystick_input):
     GPIO._press(press_pin)
     assert joystick_input.is_active('press')
     GPIO._release(press_pin)
-    assert not joystick_input.is_active('press')
\ No newline at end of file
+    assert not joystick_input.is_active('press')
+
+
+class FakeClock:
+    def __init__(self, now=50.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr("time.monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def events(button_input, clock):
+    from app.input import InputEventQueue
+    queue = InputEventQueue()
+    assert queue.watch(button_input)
+    return queue
+
+
+def test_tap_shorter_than_a_tick_is_not_lost(events, button_input, clock):
+    from app.input import GPIO, InputEvent
+    pin = button_input._pin_mapping['KEY2']
+    GPIO._press(pin)
+    clock.now += 0.05
+    GPIO._release(pin)
+    assert events.drain() == [InputEvent('KEY2', True, 50.0), InputEvent('KEY2', False, 50.05)]
+    assert events.drain() == []
+
+
+def test_bounce_is_dropped(events, button_input, clock):
+    from app.input import GPIO
+    pin = button_input._pin_mapping['KEY1']
+    GPIO._press(pin)
+    clock.now += 0.002
+    GPIO._release(pin)
+    clock.now += 0.002
+    GPIO._press(pin)
+    assert [e.pressed for e in events.drain()] == [True]
+    assert events.bounces == 1
+    assert events.is_pressed('KEY1')
+
+
+def test_level_settles_after_dropped_edge(events, button_input, clock):
+    from app.input import GPIO
+    pin = button_input._pin_mapping['KEY3']
+    GPIO._press(pin)
+    clock.now += 0.005
+    GPIO._release(pin)  # real release, but inside the debounce window
+    assert [e.pressed for e in events.drain()] == [True]
+    clock.now += 0.05
+    released = events.drain()
+    assert [(e.name, e.pressed) for e in released] == [('KEY3', False)]
+    assert not events.is_pressed('KEY3')
+
+
+def test_edge_during_drain_is_reported_once(events, button_input, clock, monkeypatch):
+    import threading
+    from app.input import GPIO
+    pin = button_input._pin_mapping['KEY2']
+    # The press edge arrives while drain() is settling the same pin
+    GPIO._pins[pin]['state'] = GPIO.LOW
+    clock.now += 0.05
+    callback, blocked = [], []
+    read = GPIO.input
+
+    def input_with_edge(channel):
+        if channel == pin and not callback:
+            callback.append(threading.Thread(target=events._edge, args=(pin,)))
+            callback[0].start()
+            callback[0].join(timeout=0.1)
+            # The callback cannot check the pin until drain() has reported it
+            blocked.append(callback[0].is_alive())
+        return read(channel)
+
+    monkeypatch.setattr(GPIO, "input", input_with_edge)
+    first = events.drain()
+    callback[0].join()
+    assert blocked == [True]
+    assert [(e.name, e.pressed) for e in first + events.drain()] == [('KEY2', True)]
+
+
+def test_edge_wakes_consumer(button_input, clock):
+    from app.input import GPIO, InputEventQueue
+    wakes = []
+    queue = InputEventQueue(on_event=lambda: wakes.append(1))
+    queue.watch(button_input)
+    GPIO._press(button_input._pin_mapping['KEY1'])
+    assert wakes == [1]
+
+
+def test_polls_without_edge_detection(button_input, clock, monkeypatch):
+    from app.input import GPIO, InputEventQueue
+    monkeypatch.setattr("app.input._watch_pins", lambda pins, callback: False)
+    queue = InputEventQueue()
+    assert not queue.watch(button_input)
+    GPIO._press(button_input._pin_mapping['KEY2'])
+    assert [(e.name, e.pressed) for e in queue.drain()] == [('KEY2', True)]
+    assert queue.pressed() == ['KEY2']
+
+
+def test_hold_repeat_fires_immediately_then_accelerates():
+    from app.input import HoldRepeat
+    repeat = HoldRepeat(stages=((0.0, 1.0, 1), (2.0, 0.1, 1), (5.0, 0.1, 10)))
+    repeat.press('up', 10.0)
+    assert repeat.due(10.0) == [('up', 1)]
+    assert repeat.due(10.5) == []
+    assert repeat.next_deadline() == 11.0
+    assert repeat.due(11.0) == [('up', 1)]
+    # 2 s..3 s held: ten single steps a second
+    steps = repeat.due(13.0)[0][1]
+    assert 10 <= steps <= 12
+    # Past 5 s each repeat is a step of 10
+    repeat.due(15.0)
+    assert repeat.due(15.1) == [('up', 10)]
+    repeat.release('up')
+    assert repeat.due(20.0) == []
+    assert repeat.next_deadline() is None
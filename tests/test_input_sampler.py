@@ -0,0 +1,117 @@
+import functools
+import threading
+import pytest
+from app.input import ButtonInput, GPIO, InputEvent
+from app.input_sampler import InputSampler
+
+
+class Levels:
+    """Stand-in for the GPIO level register: all pins high (released) by default."""
+    def __init__(self):
+        self.low = set()
+
+    def __call__(self):
+        return ~sum(1 << pin for pin in self.low) & 0xFFFFFFFF
+
+
+@pytest.fixture
+def buttons():
+    return ButtonInput()
+
+
+@pytest.fixture
+def levels():
+    return Levels()
+
+
+@pytest.fixture
+def sampler(buttons, levels):
+    sampler = InputSampler(debounce_samples=3, read_levels=levels)
+    sampler.watch(buttons)
+    return sampler
+
+
+def _run(sampler, count, start=0.0, step=0.002):
+    for i in range(count):
+        sampler.sample(start + i * step)
+
+
+def test_press_needs_a_full_integration(sampler, buttons, levels):
+    levels.low.add(buttons._pin_mapping['KEY1'])
+    _run(sampler, 2)
+    assert sampler.drain() == []
+    assert not sampler.is_pressed('KEY1')
+    sampler.sample(0.004)
+    assert sampler.drain() == [InputEvent('KEY1', True, 0.004)]
+    assert sampler.pressed() == ['KEY1']
+
+
+def test_glitch_is_absorbed(sampler, buttons, levels):
+    pin = buttons._pin_mapping['KEY2']
+    levels.low.add(pin)
+    _run(sampler, 2)
+    levels.low.discard(pin)
+    _run(sampler, 5, start=0.01)
+    assert sampler.drain() == []
+    assert sampler.bounces == 1
+    assert sampler.snapshot.pressed == 0
+    assert sampler.snapshot.samples == 7
+
+
+def test_press_and_release_events(sampler, buttons, levels):
+    pin = buttons._pin_mapping['KEY3']
+    levels.low.add(pin)
+    _run(sampler, 4)
+    levels.low.discard(pin)
+    _run(sampler, 4, start=0.1)
+    assert [(e.name, e.pressed) for e in sampler.drain()] == [('KEY3', True), ('KEY3', False)]
+
+
+def test_thread_samples_and_wakes_consumer(buttons):
+    woke = threading.Event()
+    sampler = InputSampler(rate=1000, on_event=woke.set)
+    sampler.watch(buttons)
+    sampler.start()
+    try:
+        GPIO._press(buttons._pin_mapping['KEY1'])
+        assert woke.wait(2.0)
+        assert sampler.is_pressed('KEY1')
+        assert [(e.name, e.pressed) for e in sampler.drain()] == [('KEY1', True)]
+    finally:
+        GPIO._release(buttons._pin_mapping['KEY1'])
+        sampler.close()
+
+
+def test_input_mode_from_environment(monkeypatch):
+    from app.input import _get_input_queue, InputEventQueue
+    monkeypatch.setenv("INPUT_MODE", "sampler")
+    monkeypatch.setenv("INPUT_SAMPLE_RATE", "250")
+    queue = _get_input_queue()
+    assert isinstance(queue, InputSampler) and queue.rate == 250
+    monkeypatch.setenv("INPUT_MODE", "edge")
+    assert isinstance(_get_input_queue(), InputEventQueue)
+    monkeypatch.setenv("INPUT_MODE", "bogus")
+    with pytest.raises(ValueError):
+        _get_input_queue()
+
+
+@pytest.mark.parametrize("compatible, mapped", [
+    (b"raspberrypi,4-model-b\0brcm,bcm2711\0", True),
+    (b"raspberrypi,5-model-b\0brcm,bcm2712\0", False),
+])
+def test_gpiomem_only_on_bcm283x_and_bcm2711(tmp_path, monkeypatch, compatible, mapped):
+    from app import input_sampler
+    from app.input import _get_input_queue, InputEventQueue
+    monkeypatch.setattr(input_sampler, "_mock_gpio", lambda: False)
+    compatible_path, gpiomem = tmp_path / "compatible", tmp_path / "gpiomem"
+    compatible_path.write_bytes(compatible)
+    registers = bytearray(4096)
+    registers[input_sampler.GPLEV0_OFFSET:input_sampler.GPLEV0_OFFSET + 4] = (0x1234).to_bytes(4, "little")
+    gpiomem.write_bytes(registers)
+    paths = (str(gpiomem), str(compatible_path))
+    reader = input_sampler._gpiomem_reader(*paths)
+    assert (reader() if reader else None) == (0x1234 if mapped else None)
+    # /dev/gpiomem exists on a Pi 5 too, but the sampler falls back to edge callbacks there
+    monkeypatch.setattr(input_sampler, "_can_sample", functools.partial(input_sampler._can_sample, *paths))
+    monkeypatch.setenv("INPUT_MODE", "sampler")
+    assert isinstance(_get_input_queue(), InputSampler if mapped else InputEventQueue)
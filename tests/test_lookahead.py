@@ -0,0 +1,107 @@
+import io
+import itertools
+import pytest
+from app.lookahead import _iso, main, within, write_csv, write_ics
+from app.timer import TimerController, Transition
+from app.timer_modes import RandomModeHandler
+
+
+@pytest.fixture
+def timer():
+    t = TimerController()
+    t._open_time_base = 3
+    t._close_time_base = 2
+    t.set_mode("loop")
+    return t
+
+
+def _state(t):
+    return t.status, t.elapsed, t.open_time, t.close_time, t.next_time
+
+
+def test_loop_lookahead_starts_from_elapsed(timer):
+    timer.elapsed = 1.25
+    before = _state(timer)
+    upcoming = list(itertools.islice(timer.lookahead(now=1000.0), 4))
+    assert upcoming == [
+        Transition(1001.75, "CLOSE", 2),
+        Transition(1003.75, "OPEN", 3),
+        Transition(1006.75, "CLOSE", 2),
+        Transition(1008.75, "OPEN", 3),
+    ]
+    assert _state(timer) == before
+
+
+def test_random_lookahead_predicts_live_draws(timer):
+    timer.mode = "random"
+    timer.mode_handler = RandomModeHandler(timer, seed=11)
+    timer.mode_handler.initialize()
+    # Far enough to run through several pool refills
+    predicted = [(t.status, t.duration) for t in itertools.islice(timer.lookahead(now=0.0), 1000)]
+    actual = []
+    for _ in range(1000):
+        timer.mode_handler.transition()
+        actual.append((timer.status, timer.open_time if timer.status == "OPEN" else timer.close_time))
+    assert predicted == actual
+
+
+def test_pending_zero_is_the_first_transition(timer, monkeypatch):
+    monkeypatch.setattr("time.monotonic", lambda: 50.0)
+    timer.enabled = True
+    timer.last_update_time = 50.0
+    timer.advance(3.5)
+    assert timer.show_zero
+    first = next(timer.lookahead(now=1000.0))
+    assert first == Transition(999.5, "CLOSE", 2)
+
+
+def test_within_count_and_horizon(timer):
+    transitions = timer.lookahead(now=0.0)
+    assert [t.timestamp for t in within(transitions, until=10)] == [3, 5, 8]
+    assert len(list(within(timer.lookahead(now=0.0), count=7))) == 7
+
+
+def test_csv_and_ics_output():
+    transitions = [Transition(0.0, "OPEN", 2.5), Transition(2.5, "CLOSE", 1)]
+    out = io.StringIO()
+    assert write_csv(transitions, out) == 2
+    assert out.getvalue().splitlines() == [
+        "timestamp,status,duration",
+        "1970-01-01T00:00:00.000+00:00,OPEN,2.5",
+        "1970-01-01T00:00:02.500+00:00,CLOSE,1",
+    ]
+    out = io.StringIO(newline="")
+    assert write_ics(transitions, out) == 2
+    text = out.getvalue()
+    assert text.startswith("BEGIN:VCALENDAR\r\n")
+    assert text.endswith("END:VCALENDAR\r\n")
+    assert "DTSTART:19700101T000002Z\r\nDTEND:19700101T000003Z\r\nSUMMARY:CLOSE\r\n" in text
+
+
+def test_cli_streams_count(timer):
+    out = io.StringIO()
+    assert main(["--open", "0.25", "--close", "0.5", "--count", "5"], out=out) == 0
+    rows = out.getvalue().splitlines()
+    assert len(rows) == 6
+    assert [row.split(",")[1:] for row in rows[1:3]] == [["CLOSE", "0.5"], ["OPEN", "0.25"]]
+
+
+def test_cli_carries_on_from_the_journal(tmp_path, monkeypatch):
+    from app.journal import RuntimeJournal
+    path = str(tmp_path / "runtime.journal")
+    monkeypatch.setattr("time.time", lambda: 1000.0)
+    t = TimerController(journal=RuntimeJournal(path))
+    t.advance(t.open_time + 1.5)
+    t.transition()
+    t.enabled = False
+    t.journal.close()
+    monkeypatch.setenv("JOURNAL_FILE", path)
+    out = io.StringIO()
+    main(["--count", "2"], out=out)
+    # Paused 1.5 s into CLOSE
+    rows = [row.split(",") for row in out.getvalue().splitlines()[1:]]
+    assert rows[0][1] == "OPEN" and rows[1][1] == "CLOSE"
+    assert rows[0][0] == _iso(1000.0 + t.close_time - 1.5)
+    out = io.StringIO()
+    main(["--count", "1", "--reset"], out=out)
+    assert out.getvalue().splitlines()[1].split(",")[1] == "CLOSE"
@@ -0,0 +1,92 @@
+import pytest
+from app.input import GPIO
+from app.output import Output, _get_output_map
+from app.timer import TimerController
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("time.monotonic", clock)
+    return clock
+
+
+def _levels(output):
+    return {number: GPIO.input(pin) == GPIO.HIGH for number, pin in output._pin_mapping.items()}
+
+
+def test_output_map_from_env(monkeypatch):
+    assert _get_output_map() == {"OPEN": 1, "CLOSE": 2}
+    monkeypatch.setenv("OUTPUT_MAP", "open=2, CLOSE=1")
+    assert _get_output_map() == {"OPEN": 2, "CLOSE": 1}
+    monkeypatch.setenv("OUTPUT_MAP", "OPEN=1")
+    assert _get_output_map() == {"OPEN": 1}
+    monkeypatch.setenv("OUTPUT_MAP", "PAUSED=1")
+    with pytest.raises(ValueError):
+        _get_output_map()
+
+
+def test_unknown_output_number_rejected():
+    with pytest.raises(ValueError):
+        Output(status_map={"OPEN": 3})
+
+
+def test_show_drives_only_the_mapped_output():
+    output = Output(status_map={"OPEN": 2, "CLOSE": 1})
+    assert output.show("OPEN") is True
+    assert _levels(output) == {1: False, 2: True}
+    assert output.show("OPEN") is False
+    output.show("CLOSE")
+    assert _levels(output) == {1: True, 2: False}
+    output.show("CLOSE", enabled=False)
+    assert _levels(output) == {1: False, 2: False}
+    assert output.switches == 3
+
+
+def test_transition_switches_relays_in_the_same_call(clock):
+    output = Output()
+    timer = TimerController(output=output)
+    timer._open_time_base = 0.25
+    timer._close_time_base = 0.5
+    timer.mode_handler.initialize()
+    assert _levels(output) == {1: False, 2: False}
+    timer.enabled = True
+    timer.last_update_time = clock.now
+    assert _levels(output) == {1: True, 2: False}
+
+    clock.now += 0.253
+    timer.update()
+    assert timer.show_zero
+    # Still on the OPEN relay until the transition itself runs
+    assert _levels(output) == {1: True, 2: False}
+    clock.now += 0.002
+    timer.transition()
+    assert timer.status == "CLOSE"
+    assert _levels(output) == {1: False, 2: True}
+    assert output.last_latency == pytest.approx(0.005)
+    assert output.stats()["timed_switches"] == 1
+
+
+def test_catch_up_lands_on_current_period_without_latency(clock):
+    output = Output()
+    timer = TimerController(output=output)
+    timer._open_time_base = 1
+    timer._close_time_base = 1
+    timer.mode_handler.initialize()
+    timer.enabled = True
+    timer.last_update_time = clock.now
+    clock.now += 3.5
+    timer.update()
+    assert timer.status == "CLOSE"
+    assert _levels(output) == {1: False, 2: True}
+    assert output.stats()["timed_switches"] == 0
+    timer.enabled = False
+    assert _levels(output) == {1: False, 2: False}
@@ -85,4 +85,51 @@ def test_randomize_if_needed_reinitializes(timer, handler):
     handler.randomize_if_needed()
     # Values should be re-randomized
     assert 1 <= timer.open_time <= 10
-    assert 1 <= timer.next_time <= 10
\ No newline at end of file
+    assert 1 <= timer.next_time <= 10
+
+
+def test_fractional_base_draws_milliseconds(timer, handler):
+    timer._open_time_base = 2.5
+    values = [handler._random_period("OPEN") for _ in range(500)]
+    assert all(1 <= v <= 2.5 and round(v, 3) == v for v in values)
+    assert any(not float(v).is_integer() for v in values)
+    timer._open_time_base = 0.25
+    assert all(0.001 <= handler._random_period("OPEN") <= 0.25 for _ in range(500))
+    timer._open_time_base = 3
+    assert {handler._random_period("OPEN") for _ in range(500)} == {1, 2, 3}
+
+def test_seed_reproduces_periods(timer):
+    sequences = []
+    for _ in range(2):
+        handler = RandomModeHandler(timer, seed=42)
+        sequences.append([handler._random_period(p) for p in ("OPEN", "CLOSE") * 50])
+    assert sequences[0] == sequences[1]
+    assert all(isinstance(v, int) for v in sequences[0])
+
+def test_seed_and_distribution_from_env(timer, monkeypatch):
+    monkeypatch.setenv("RANDOM_SEED", "5")
+    monkeypatch.setenv("RANDOM_DISTRIBUTION", "normal")
+    a, b = RandomModeHandler(timer), RandomModeHandler(timer)
+    assert a.seed == 5 and a.distribution == "normal"
+    assert [a._random_period("OPEN") for _ in range(20)] == [b._random_period("OPEN") for _ in range(20)]
+    monkeypatch.setenv("RANDOM_DISTRIBUTION", "bimodal")
+    with pytest.raises(ValueError):
+        RandomModeHandler(timer)
+
+def test_base_change_invalidates_pool(timer, handler):
+    timer._open_time_base = 100
+    handler._random_period("OPEN")
+    pool = handler.pools["OPEN"]
+    assert pool.refills == 1
+    timer._open_time_base = 2
+    assert all(handler._random_period("OPEN") <= 2 for _ in range(50))
+    assert pool.invalidations == 1
+    assert pool.refills == 2
+
+def test_adjust_keeps_sub_second_base(timer, handler):
+    timer.status = "OPEN"
+    timer._open_time_base = 0.25
+    handler.adjust_time(-1)
+    assert timer._open_time_base == 0.25
+    handler.adjust_time(1)
+    assert timer._open_time_base == 1.25
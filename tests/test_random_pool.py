@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from app.random_pool import PeriodPool, sample_periods, _get_random_config, DISTRIBUTIONS
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+@pytest.mark.parametrize("base", [1, 10, 0.25, 2.5])
+def test_samples_stay_within_random_mode_bounds(distribution, base):
+    rng = np.random.default_rng(1)
+    values = sample_periods(rng, base, 5000, distribution, weights=[1, 2, 3])
+    assert values.shape == (5000,)
+    low = 1 if base >= 1 else 0.001
+    assert values.min() >= low
+    assert values.max() <= base
+
+
+def test_distribution_shapes():
+    rng = np.random.default_rng(2)
+    uniform = sample_periods(rng, 100, 20000, "uniform")
+    exponential = sample_periods(rng, 100, 20000, "exponential")
+    normal = sample_periods(rng, 100, 20000, "normal")
+    assert uniform.mean() == pytest.approx(50.5, rel=0.02)
+    assert exponential.mean() < 35
+    assert normal.mean() == pytest.approx(50.5, rel=0.02)
+    assert normal.std() < uniform.std() * 0.7
+
+
+def test_weighted_follows_band_weights():
+    rng = np.random.default_rng(3)
+    values = sample_periods(rng, 100, 20000, "weighted", weights=[3, 0, 1])
+    bands = np.histogram(values, bins=[1, 34.5, 67.5, 101])[0] / values.size
+    assert bands == pytest.approx([0.75, 0.0, 0.25], abs=0.02)
+
+
+def test_weighted_needs_usable_weights():
+    rng = np.random.default_rng(0)
+    for weights in (None, [], [0, 0], [1, -1]):
+        with pytest.raises((ValueError, TypeError)):
+            PeriodPool(rng, "weighted", weights)
+
+
+def test_pool_refills_in_blocks_and_keeps_order():
+    pool = PeriodPool(np.random.default_rng(4), size=8)
+    drawn = [pool.draw(10) for _ in range(20)]
+    assert pool.refills == 3
+    assert pool.draws == 20
+    expected = sample_periods(np.random.default_rng(4), 10, 24)[:20].tolist()
+    assert drawn == expected
+    assert all(isinstance(v, int) for v in drawn)
+
+
+def test_new_base_invalidates_pool():
+    pool = PeriodPool(np.random.default_rng(5), size=8)
+    pool.draw(10)
+    assert pool.draw(0.5) <= 0.5
+    assert pool.invalidations == 1
+    assert pool.base == 0.5
+
+
+def test_config_from_env(monkeypatch):
+    assert _get_random_config() == (None, "uniform", None)
+    monkeypatch.setenv("RANDOM_SEED", "12")
+    monkeypatch.setenv("RANDOM_DISTRIBUTION", "weighted")
+    monkeypatch.setenv("RANDOM_WEIGHTS", "1,2.5")
+    assert _get_random_config() == (12, "weighted", [1.0, 2.5])
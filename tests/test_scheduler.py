@@ -0,0 +1,210 @@
+import threading
+import time
+import pytest
+from app.scheduler import DeadlineScheduler
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TickingClock(FakeClock):
+    def __init__(self, now=100.0, tick=0.001):
+        super().__init__(now)
+        self.tick = tick
+
+    def __call__(self):
+        self.now += self.tick
+        return self.now
+
+
+def test_past_deadline_returns_without_sleeping():
+    scheduler = DeadlineScheduler()
+    start = time.monotonic()
+    assert scheduler.wait_until(scheduler.now() - 1) is False
+    assert time.monotonic() - start < 0.05
+    assert scheduler.wakeups == 1
+
+
+def test_wake_cuts_sleep_short():
+    scheduler = DeadlineScheduler(max_sleep=None)
+    threading.Timer(0.02, scheduler.wake).start()
+    start = time.monotonic()
+    assert scheduler.wait_until(None) is True
+    assert time.monotonic() - start < 1.0
+    assert scheduler.woken_by_event == 1
+
+
+def test_max_sleep_caps_wait():
+    scheduler = DeadlineScheduler(max_sleep=0.01)
+    start = time.monotonic()
+    scheduler.wait_until(scheduler.now() + 60)
+    assert time.monotonic() - start < 1.0
+
+
+def test_precise_wait_spins_to_deadline(monkeypatch):
+    # Every read moves time on by 0.1 ms, as a spin loop would see it
+    clock = TickingClock(tick=0.0001)
+    scheduler = DeadlineScheduler(clock=clock, spin_threshold=0.005)
+    slept_until = []
+
+    def sleep(timeout):
+        clock.now += timeout
+        slept_until.append(clock.now)
+        return False
+
+    monkeypatch.setattr(scheduler._event, "wait", sleep)
+    deadline = clock.now + 0.02
+    assert scheduler.wait_until(deadline, precise=True) is False
+    # Slept until spin_threshold before the deadline, then spun to it and stopped
+    assert len(slept_until) == 1
+    assert deadline - slept_until[0] == pytest.approx(0.005, abs=2 * clock.tick)
+    assert deadline <= clock.now < deadline + 2 * clock.tick
+
+def test_precise_wait_can_be_woken():
+    scheduler = DeadlineScheduler(spin_threshold=0.005)
+    threading.Timer(0.01, scheduler.wake).start()
+    assert scheduler.wait_until(scheduler.now() + 30, precise=True) is True
+
+
+def test_lateness_percentiles():
+    scheduler = DeadlineScheduler(clock=FakeClock())
+    for ms in range(1, 101):
+        scheduler.record_transition(due=0.0, handled=ms / 1000)
+    stats = scheduler.stats()
+    assert stats["p50_lateness_ms"] == pytest.approx(50.0)
+    assert stats["p99_lateness_ms"] == pytest.approx(99.0)
+    assert stats["max_lateness_ms"] == pytest.approx(100.0)
+
+
+def test_wakeups_per_minute_and_lateness():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(clock=clock)
+    for _ in range(10):
+        scheduler.wait_until(clock.now)
+    clock.now += 30
+    scheduler.record_transition(due=clock.now - 0.004, handled=clock.now)
+    scheduler.record_transition(due=clock.now, handled=clock.now)
+    stats = scheduler.stats()
+    assert stats["wakeups_per_minute"] == pytest.approx(20.0)
+    assert stats["transitions"] == 2
+    assert stats["max_lateness_ms"] == pytest.approx(4.0)
+    assert stats["mean_lateness_ms"] == pytest.approx(2.0)
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    clock = FakeClock()
+    monkeypatch.setattr("time.monotonic", clock)
+    from app.controller import AppController
+    from features.steps.mocks.mock_sh1106 import SH1106
+    app = AppController(display_hardware=SH1106())
+    app.clock = clock
+    return app
+
+
+def test_paused_controller_sleeps_until_woken(controller):
+    assert controller._inputs_wake
+    assert controller._next_deadline() is None
+
+
+def test_held_input_is_polled(controller):
+    from app.input import GPIO
+    pin = controller.buttons._pin_mapping["KEY2"]
+    GPIO._press(pin)
+    try:
+        assert controller._next_deadline() == pytest.approx(controller.clock.now + 0.1)
+    finally:
+        GPIO._release(pin)
+
+
+def test_running_controller_wakes_for_next_change(controller):
+    from app.controller import SPINNER_INTERVAL
+    timer = controller.timer
+    timer.enabled = True
+    timer.last_update_time = controller.clock.now
+    controller._last_anim_time = controller.clock.now - 1
+    # Spinner is overdue
+    assert controller._next_deadline() == pytest.approx(controller.clock.now - 1 + SPINNER_INTERVAL)
+    controller._last_anim_time = controller.clock.now
+    timer.elapsed = timer.open_time - 0.15
+    # Transition is due before the next spinner frame
+    assert controller._next_deadline() == pytest.approx(controller.clock.now + 0.15)
+    assert controller._transition_due == pytest.approx(controller.clock.now + 0.15)
+    timer.elapsed = timer.open_time - 2.8
+    controller._last_anim_time = controller.clock.now + 1  # keep the spinner out of the way
+    # Displayed 3 turns into 2 at 2.5s remaining
+    assert controller._next_deadline() == pytest.approx(controller.clock.now + 0.301)
+
+
+def test_transition_happens_at_deadline(controller):
+    timer = controller.timer
+    timer.enabled = True
+    timer.last_update_time = controller.clock.now
+    timer.elapsed = timer.open_time - 0.125
+    controller._last_anim_time = controller.clock.now
+    controller._next_deadline()
+    # Woken 5 ms after the transition was due
+    controller.clock.now += 0.13
+    controller._update_timer_and_display()
+    assert timer.status == "CLOSE"
+    assert timer.show_zero is False
+    assert controller.scheduler.transitions == 1
+    assert controller.scheduler.max_lateness == pytest.approx(0.005)
+
+
+@pytest.mark.parametrize("held, action", [
+    (0.05, "_toggle_pause_resume"),
+    (2.5, "_reset_and_reload"),
+    (6.0, "_full_reset"),
+])
+def test_key2_duration_uses_edge_timestamps(controller, monkeypatch, held, action):
+    from app.input import GPIO
+    calls = []
+    for name in ("_toggle_pause_resume", "_reset_and_reload", "_full_reset"):
+        monkeypatch.setattr(controller, name, lambda name=name: calls.append(name))
+    pin = controller.buttons._pin_mapping["KEY2"]
+    GPIO._press(pin)
+    controller.clock.now += held
+    GPIO._release(pin)
+    # Both edges are only seen by the loop much later
+    controller.clock.now += 10
+    controller.handle_buttons()
+    assert calls == [action]
+
+
+def test_joystick_hold_adjusts_without_blocking(controller, monkeypatch):
+    from app.input import GPIO
+    monkeypatch.setattr("time.sleep", lambda seconds: pytest.fail("handler slept"))
+    controller.selected_timer = "OPEN"
+    controller.timer._open_time_base = 5
+    pin = controller.joystick._pin_mapping["up"]
+    GPIO._press(pin)
+    controller.handle_buttons()
+    assert controller.timer._open_time_base == 6
+    # Run the loop at its deadlines for ten seconds of holding
+    end = controller.clock.now + 10
+    while controller.clock.now < end:
+        controller.clock.now = min(controller._next_deadline(), end)
+        controller.handle_buttons()
+    assert controller.timer._open_time_base >= 300
+    GPIO._release(pin)
+    controller.handle_buttons()
+    value = controller.timer._open_time_base
+    controller.clock.now += 5
+    controller.handle_buttons()
+    assert controller.timer._open_time_base == value
+
+
+def test_joystick_keeps_sub_second_base(controller):
+    controller.selected_timer = "CLOSE"
+    controller.timer._close_time_base = 0.5
+    controller._handle_joystick_adjust(-1)
+    assert controller.timer._close_time_base == 0.5
+    controller._handle_joystick_adjust(1)
+    assert controller.timer._close_time_base == 1.5
@@ -0,0 +1,219 @@
+import json
+import os
+import pytest
+from app.settings_store import (JsonFileBackend, MemoryBackend, SettingsStore, SqliteBackend,
+                                _get_settings_backend, write_atomic)
+from app.timer import TimerController
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store(clock):
+    return SettingsStore(MemoryBackend(), delay=2.0, clock=clock)
+
+
+def _read(store):
+    return store.backend.read()
+
+
+def test_saves_are_coalesced_into_one_write(store, clock):
+    for value in range(1, 6):
+        store.save({"open_time": value})
+        clock.now += 0.5
+    assert not store.backend.exists()
+    assert store.load() == {"open_time": 5}
+    assert store.exists()
+    # Every save pushes the deadline back
+    assert store.flush_deadline() == pytest.approx(clock.now + 1.5)
+    assert store.flush_if_due() is False
+    clock.now += 1.5
+    assert store.flush_if_due() is True
+    assert _read(store) == {"open_time": 5}
+    assert store.stats() == {"saves": 5, "writes": 1, "coalesced": 4, "pending": False}
+    assert store.flush_deadline() is None
+
+
+def test_flush_writes_immediately(store):
+    assert store.flush() is False
+    store.save({"mode": "loop"})
+    assert store.flush() is True
+    assert _read(store) == {"mode": "loop"}
+    assert store.flush() is False
+
+
+def test_zero_delay_writes_through():
+    store = SettingsStore(MemoryBackend(), delay=0)
+    store.save({"a": 1})
+    store.save({"a": 2})
+    assert not store.dirty
+    assert store.writes == 2
+    assert store.coalesced == 0
+
+
+def test_delay_from_environment(monkeypatch):
+    monkeypatch.setenv("SETTINGS_FLUSH_DELAY", "0.25")
+    assert SettingsStore(MemoryBackend()).delay == 0.25
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = str(tmp_path / "settings.json")
+    write_atomic(path, {"a": 1})
+    write_atomic(path, {"a": 2})
+    assert os.listdir(tmp_path) == ["settings.json"]
+    with open(path) as f:
+        assert json.load(f) == {"a": 2}
+
+
+def test_failed_write_stays_pending(tmp_path, clock):
+    store = SettingsStore(JsonFileBackend(str(tmp_path / "missing" / "settings.json")), delay=1, clock=clock)
+    store.save({"a": 1})
+    clock.now += 1
+    assert store.flush_if_due() is False
+    assert store.dirty
+    assert store.flush_deadline() == pytest.approx(clock.now + 1)
+
+
+def test_load_rejects_non_object(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text("[1, 2]")
+    with pytest.raises(ValueError):
+        SettingsStore(JsonFileBackend(str(path))).load()
+
+
+def test_clear_drops_pending_and_file(store):
+    store.save({"a": 1})
+    store.flush()
+    store.save({"a": 2})
+    store.clear()
+    assert not store.exists()
+    assert store.flush() is False
+
+
+@pytest.fixture(params=["json", "sqlite", "memory"])
+def backend(request, tmp_path):
+    if request.param == "json":
+        backend = JsonFileBackend(str(tmp_path / "settings.json"))
+    elif request.param == "sqlite":
+        backend = SqliteBackend(str(tmp_path / "settings.db"))
+    else:
+        backend = MemoryBackend()
+    yield backend
+    backend.close()
+
+
+def _reopen(backend):
+    """A fresh backend on the same storage, as after a reboot."""
+    if isinstance(backend, MemoryBackend):
+        return backend
+    backend.close()
+    return type(backend)(backend.path)
+
+
+def test_backend_settings_round_trip(backend):
+    assert backend.read() is None
+    assert not backend.exists()
+    backend.write({"open_time": 0.25, "close_time": 3})
+    backend = _reopen(backend)
+    assert backend.read() == {"open_time": 0.25, "close_time": 3}
+    backend.delete()
+    assert not backend.exists()
+    backend.close()
+
+
+def test_backend_profiles(backend):
+    assert backend.profile_names() == []
+    assert backend.read_profile("night") is None
+    backend.write_profile("night", {"mode": "random", "open_time": 600, "close_time": 1.5, "seed": 4})
+    backend.write_profile("day", {"mode": "loop", "open_time": 5, "close_time": 5, "seed": None})
+    backend.write({"open_time": 1, "close_time": 1})
+    backend = _reopen(backend)
+    assert backend.profile_names() == ["day", "night"]
+    assert backend.read_profile("night") == {"mode": "random", "open_time": 600, "close_time": 1.5, "seed": 4}
+    # Clearing settings keeps the presets
+    backend.delete()
+    assert backend.delete_profile("day") is True
+    assert backend.delete_profile("day") is False
+    assert backend.profile_names() == ["night"]
+    backend.close()
+
+
+def test_backend_from_environment(tmp_path, monkeypatch):
+    assert isinstance(_get_settings_backend(), MemoryBackend)
+    monkeypatch.setenv("SETTINGS_BACKEND", "sqlite")
+    monkeypatch.setenv("SETTINGS_FILE", str(tmp_path / "presets.db"))
+    backend = _get_settings_backend()
+    assert isinstance(backend, SqliteBackend) and backend.path == str(tmp_path / "presets.db")
+    backend.close()
+    monkeypatch.setenv("SETTINGS_BACKEND", "yaml")
+    with pytest.raises(ValueError):
+        _get_settings_backend()
+
+
+def test_timer_switches_profiles():
+    t = TimerController()
+    t._open_time_base, t._close_time_base = 3, 0.5
+    t.set_mode("random", seed=21)
+    t.save_profile("jitter")
+    t._open_time_base, t._close_time_base = 8, 9
+    t.set_mode("loop")
+    t.save_profile("steady")
+    assert t.profiles() == ["jitter", "steady"]
+
+    t.load_profile("jitter")
+    assert (t.mode, t.mode_handler.seed, t.open_time_base, t.close_time_base) == ("random", 21, 3, 0.5)
+    assert t.settings.load() == {"open_time": 3, "close_time": 0.5}
+    assert t.profile == "jitter"
+    t.load_profile("steady")
+    assert (t.mode, t.open_time, t.close_time) == ("loop", 8, 9)
+    with pytest.raises(KeyError):
+        t.load_profile("missing")
+    assert t.delete_profile("steady") is True
+    assert t.profile is None
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setenv("SETTINGS_FLUSH_DELAY", "2")
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    clock = FakeClock()
+    monkeypatch.setattr("time.monotonic", clock)
+    from app.controller import AppController
+    from features.steps.mocks.mock_sh1106 import SH1106
+    app = AppController(display_hardware=SH1106())
+    app.clock = clock
+    return app
+
+
+def test_joystick_adjusts_write_once_settled(controller):
+    from app.input import GPIO
+    settings = controller.timer.settings
+    writes = settings.writes
+    controller.selected_timer = "OPEN"
+    pin = controller.joystick._pin_mapping["up"]
+    for _ in range(5):
+        GPIO._press(pin)
+        controller.handle_buttons()
+        GPIO._release(pin)
+        controller.handle_buttons()
+        controller.clock.now += 0.2
+    assert settings.dirty
+    assert settings.writes == writes
+    deadline = settings.flush_deadline()
+    assert controller._next_deadline() <= deadline
+    controller.clock.now = deadline
+    controller.handle_buttons()
+    assert settings.writes == writes + 1
+    assert not settings.dirty
+    assert settings.backend.read()["open_time"] == controller.timer._open_time_base
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from app.simulator import simulate, main
+from app.timer import TimerController
+
+
+@pytest.fixture
+def timer():
+    return TimerController()
+
+
+def _live_periods(timer, mode, open_base, close_base, count):
+    """Periods the real mode handler goes through, in order."""
+    timer._open_time_base = open_base
+    timer._close_time_base = close_base
+    timer.status = "OPEN"
+    timer.set_mode(mode)
+    periods = []
+    for _ in range(count):
+        periods.append((timer.status, timer.open_time if timer.status == "OPEN" else timer.close_time))
+        timer.mode_handler.transition()
+    return periods
+
+
+def test_loop_matches_handler_exactly(timer):
+    simulation = simulate("loop", 3, 2, periods=6)
+    live = _live_periods(timer, "loop", 3, 2, 6)
+    assert [("OPEN" if o else "CLOSE", d) for o, d in zip(simulation.is_open, simulation.durations)] == live
+    assert simulation.duty_cycle == pytest.approx(0.6)
+
+
+def test_duration_cuts_last_period():
+    simulation = simulate("loop", 3, 2, duration=11, start="CLOSE")
+    assert simulation.total_time == pytest.approx(11)
+    assert simulation.durations.tolist() == [2, 3, 2, 3, 1]
+    assert simulation.close_time == pytest.approx(5)
+
+
+@pytest.mark.parametrize("open_base, close_base", [(10, 4), (2.5, 0.25)])
+def test_random_is_consistent_with_live_handler(timer, open_base, close_base, monkeypatch):
+    monkeypatch.setenv("RANDOM_SEED", "7")
+    live = _live_periods(timer, "random", open_base, close_base, 20000)
+    simulation = simulate("random", open_base, close_base, periods=200000, seed=7)
+    for status, base in (("OPEN", open_base), ("CLOSE", close_base)):
+        live_values = np.array([d for s, d in live if s == status])
+        sim_values = simulation.periods(status)
+        assert sim_values.min() >= live_values.min() - 0.01 * base
+        assert sim_values.max() == pytest.approx(live_values.max(), abs=0.01 * base)
+        assert sim_values.mean() == pytest.approx(live_values.mean(), rel=0.02)
+        # Same shape: every decile bin within a couple of percent
+        edges = np.linspace(sim_values.min(), sim_values.max(), 11)
+        sim_hist = np.histogram(sim_values, bins=edges)[0] / sim_values.size
+        live_hist = np.histogram(live_values, bins=edges)[0] / live_values.size
+        assert np.abs(sim_hist - live_hist).max() < 0.02
+
+
+def test_random_is_reproducible_for_a_seed():
+    a = simulate("random", 10, 20, periods=1000, seed=3)
+    b = simulate("random", 10, 20, periods=1000, seed=3)
+    assert np.array_equal(a.durations, b.durations)
+    assert a.summary()["open_periods"] == 500
+
+
+@pytest.mark.parametrize("distribution", ["exponential", "normal"])
+def test_skewed_distribution_matches_live_handler(timer, distribution, monkeypatch):
+    monkeypatch.setenv("RANDOM_SEED", "9")
+    monkeypatch.setenv("RANDOM_DISTRIBUTION", distribution)
+    live = np.array([d for s, d in _live_periods(timer, "random", 20, 20, 20000)])
+    simulation = simulate("random", 20, 20, periods=200000, seed=9, distribution=distribution)
+    assert simulation.durations.mean() == pytest.approx(live.mean(), rel=0.02)
+    assert simulation.durations.std() == pytest.approx(live.std(), rel=0.05)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        simulate("sometimes", 1, 1)
+    with pytest.raises(ValueError):
+        simulate("loop", 0, 1)
+
+
+def test_cli_prints_report(capsys):
+    assert main(["--mode", "random", "--open", "4", "--close", "2", "--periods", "1000", "--seed", "1"]) == 0
+    out = capsys.readouterr().out
+    assert "periods 1000" in out
+    assert "duty cycle" in out
+    assert "OPEN: 500 periods" in out
@@ -5,10 +5,11 @@ from app.timer import TimerController
 @pytest.fixture
 def tmp_settings_file(tmp_path, monkeypatch):
     settings_file = tmp_path / "settings.json"
-    monkeypatch.setattr("app.timer.SETTINGS_FILE", str(settings_file))
+    monkeypatch.setenv("SETTINGS_BACKEND", "json")
+    monkeypatch.setenv("SETTINGS_FILE", str(settings_file))
     yield str(settings_file)
 
-def test_timer_init_defaults(tmp_settings_file):
+def test_timer_init_defaults():
     t = TimerController()
     assert t.open_time == t.DEFAULT_OPEN_TIME
     assert t.close_time == t.DEFAULT_CLOSE_TIME
@@ -20,7 +21,7 @@ def test_timer_init_defaults(tmp_settings_file):
     assert isinstance(t.last_update_time, float)
     assert t.show_zero is False
 
-def test_timer_save_and_load_settings(tmp_settings_file):
+def test_timer_save_and_load_settings():
     t = TimerController()
     t._open_time_base = 12
     t._close_time_base = 21
@@ -31,6 +32,18 @@ def test_timer_save_and_load_settings(tmp_settings_file):
     assert t.open_time == 12
     assert t.close_time == 21
 
+def test_timer_settings_keep_milliseconds(tmp_settings_file):
+    t = TimerController()
+    t._open_time_base = 0.25
+    t._close_time_base = 1.0004
+    t.save_settings()
+    with open(tmp_settings_file) as f:
+        assert f.read() == '{"open_time": 0.25, "close_time": 1}'
+    t.load_settings()
+    assert t.open_time == 0.25
+    assert t.close_time == 1
+    assert isinstance(t.close_time, int)
+
 def test_timer_load_settings_handles_missing_or_bad_file(tmp_settings_file):
     t = TimerController()
     if os.path.exists(tmp_settings_file):
@@ -61,7 +74,7 @@ def test_timer_reset_settings(tmp_settings_file):
     assert t.close_time == t.DEFAULT_CLOSE_TIME
     assert os.path.exists(tmp_settings_file)
 
-def test_timer_adjust_time_and_clamp(tmp_settings_file):
+def test_timer_adjust_time_and_clamp():
     t = TimerController()
     t._open_time_base = 2
     t.status = "OPEN"
@@ -74,7 +87,7 @@ def test_timer_adjust_time_and_clamp(tmp_settings_file):
 
 import time
 
-def test_timer_enable_and_update(tmp_settings_file):
+def test_timer_enable_and_update():
     t = TimerController()
     t.enabled = True
     t.status = "OPEN"
@@ -97,7 +110,7 @@ def test_timer_enable_and_update(tmp_settings_file):
     assert t.status != old_status
     assert t.show_zero is False
 
-def test_timer_update_when_disabled(tmp_settings_file):
+def test_timer_update_when_disabled():
     t = TimerController()
     t.enabled = False
     t.last_update_time -= 10
@@ -105,7 +118,7 @@ def test_timer_update_when_disabled(tmp_settings_file):
     t.update()
     assert t.elapsed == 0
 
-def test_timer_set_mode(tmp_settings_file):
+def test_timer_set_mode():
     t = TimerController()
     t.set_mode("loop")
     assert t.mode == "loop"
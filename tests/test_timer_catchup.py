@@ -0,0 +1,99 @@
+import pytest
+from app.timer import TimerController
+from app.timer_modes import RandomModeHandler
+
+
+def _timer(mode, open_base, close_base, seed=7):
+    t = TimerController()
+    t._open_time_base = open_base
+    t._close_time_base = close_base
+    t.set_mode(mode)
+    if mode == "random":
+        t.mode_handler = RandomModeHandler(t, seed=seed)
+        t.mode_handler.initialize()
+    t.enabled = True
+    return t
+
+
+def _draws(t):
+    pools = getattr(t.mode_handler, "pools", {})
+    return sum(pool.draws for pool in pools.values())
+
+
+def _reference_advance(t, time_left):
+    """The old update() loop, one boundary at a time, but keeping the time past each boundary."""
+    carried = 0.0
+    while True:
+        if t.show_zero:
+            t.show_zero = False
+            t.elapsed = 0
+            t.mode_handler.transition()
+            time_left += carried
+        remaining = t.mode_handler.current_remaining_time()
+        if time_left < remaining:
+            t.elapsed += time_left
+            return
+        t.elapsed += remaining
+        time_left -= remaining
+        carried, time_left = time_left, 0
+        t.show_zero = True
+
+
+def _settled(t):
+    # Compare timers with any pending zero frame passed, as the controller does
+    if t.show_zero:
+        t.transition()
+    return t.status, round(t.elapsed, 6), t.open_time, t.close_time, t.next_time
+
+
+@pytest.mark.parametrize("mode", ["loop", "random"])
+@pytest.mark.parametrize("stall", [0.05, 2.9, 3.0, 7.5, 64.0, 1234.56])
+def test_catch_up_matches_step_by_step(mode, stall):
+    fast = _timer(mode, 3, 2)
+    fast.elapsed = 0.4
+    fast.advance(stall)
+    fast_state = _settled(fast)
+
+    slow = _timer(mode, 3, 2)
+    slow.elapsed = 0.4
+    _reference_advance(slow, stall)
+    slow_state = _settled(slow)
+
+    assert fast_state == slow_state
+    # Random mode drew exactly the same periods
+    assert _draws(fast) == _draws(slow)
+
+
+@pytest.mark.parametrize("mode", ["loop", "random"])
+def test_catch_up_matches_many_small_ticks(mode):
+    fast = _timer(mode, 4, 3, seed=11)
+    fast.advance(100.0)
+
+    ticked = _timer(mode, 4, 3, seed=11)
+    for _ in range(1000):
+        ticked.advance(0.1)
+    assert _settled(fast)[0] == _settled(ticked)[0]
+    assert _settled(fast)[1] == pytest.approx(_settled(ticked)[1], abs=1e-6)
+    assert _settled(fast)[2:] == _settled(ticked)[2:]
+
+
+def test_loop_mode_catch_up_is_constant_time():
+    t = _timer("loop", 3, 2)
+    transitions = []
+    original = t.mode_handler.transition
+    t.mode_handler.transition = lambda: (transitions.append(1), original())
+    t.advance(10 ** 6 + 1.5)
+    assert len(transitions) <= 2
+    t.transition()
+    assert t.status == "OPEN"
+    assert t.elapsed == pytest.approx(1.5)
+
+
+def test_final_boundary_shows_zero():
+    t = _timer("loop", 3, 2)
+    t.advance(12.5)  # boundaries at 3, 5, 8, 10 and 13: last one passed is 10 (CLOSE -> OPEN)
+    assert t.show_zero is True
+    assert t.status == "CLOSE"
+    t.transition()
+    assert t.status == "OPEN"
+    assert t.elapsed == pytest.approx(2.5)
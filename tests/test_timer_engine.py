@@ -0,0 +1,124 @@
+import random
+import threading
+import pytest
+from app.scheduler import DeadlineScheduler
+from app.timer_engine import ScheduledTimer, TimerEngine
+
+
+class RecordingOutput:
+    def __init__(self):
+        self.calls = []
+
+    def show(self, status, enabled=True, since=None):
+        self.calls.append((status, enabled, since))
+
+
+def test_only_due_timers_fire():
+    engine = TimerEngine()
+    engine.add(ScheduledTimer("fast", 1, 2), now=0.0)
+    engine.add(ScheduledTimer("slow", 10, 10), now=0.0)
+    assert engine.next_deadline() == 1.0
+    assert engine.advance(0.5) == []
+    assert [t.name for t in engine.advance(1.0)] == ["fast"]
+    assert engine["fast"].status == "CLOSE"
+    assert engine["slow"].status == "OPEN"
+    assert engine.next_deadline() == 3.0
+
+
+def test_late_ticks_do_not_drift():
+    engine = TimerEngine()
+    timer = engine.add(ScheduledTimer("t", 0.25, 0.5), now=0.0)
+    boundaries = []
+    engine.on_transition = lambda t, boundary: boundaries.append(boundary)
+    now = 0.0
+    for _ in range(8):
+        now = engine.next_deadline() + 0.01
+        engine.advance(now)
+    assert boundaries == pytest.approx([0.25, 0.75, 1.0, 1.5, 1.75, 2.25, 2.5, 3.0])
+    assert timer.due == pytest.approx(3.25)
+    assert engine.max_lateness == pytest.approx(0.01)
+
+
+def test_catch_up_over_many_periods_matches_stepping():
+    engine = TimerEngine()
+    output = RecordingOutput()
+    timer = engine.add(ScheduledTimer("t", 3, 2, output=output), now=0.0)
+    engine.advance(1000.7)
+    # 1000 s is exactly 200 cycles; 0.7 s into the next OPEN period
+    assert timer.status == "OPEN"
+    assert timer.due == pytest.approx(1003.0)
+    # The last boundary is stepped to; the cycles before it are skipped
+    assert timer.transitions == 2
+    assert engine.fired == 1
+    assert engine.caught_up == 1
+    assert output.calls[-1] == ("OPEN", True, pytest.approx(1000.0))
+
+
+def test_random_timers_use_their_own_draws():
+    random.seed(4)
+    engine = TimerEngine()
+    timers = [engine.add(ScheduledTimer(i, 5, 5, mode="random"), now=0.0) for i in range(20)]
+    assert len({t.due for t in timers}) > 1
+    for t in timers:
+        assert 1 <= t.due <= 5
+    first_due = min(t.due for t in timers)
+    due = {t.name for t in timers if t.due == first_due}
+    assert {t.name for t in engine.advance(first_due)} == due
+    for t in timers:
+        assert t.status == ("CLOSE" if t.name in due else "OPEN")
+
+
+def _periods(timer, count=20):
+    periods = []
+    for _ in range(count):
+        timer.mode_handler.transition()
+        periods.append(timer.open_time if timer.status == "OPEN" else timer.close_time)
+    return periods
+
+
+def test_seeded_random_timers_diverge(monkeypatch):
+    monkeypatch.setenv("RANDOM_SEED", "7")
+    a, b = ScheduledTimer("a", 30, 30, mode="random"), ScheduledTimer("b", 30, 30, mode="random")
+    assert a.mode_handler.seed != b.mode_handler.seed
+    assert _periods(a) != _periods(b)
+    # Still reproducible per timer
+    assert _periods(ScheduledTimer("a", 30, 30, mode="random"), 40)[20:] == _periods(a)
+    # A seed given outright is used as is
+    assert ScheduledTimer("c", 30, 30, mode="random", seed=3).mode_handler.seed == 3
+
+
+def test_remove_skips_stale_entry_and_keeps_progress():
+    engine = TimerEngine(clock=lambda: 2.0)
+    output = RecordingOutput()
+    engine.add(ScheduledTimer("a", 3, 3, output=output), now=0.0)
+    engine.add(ScheduledTimer("b", 5, 5), now=0.0)
+    timer = engine.remove("a")
+    assert "a" not in engine
+    assert timer.elapsed == pytest.approx(2.0)
+    assert output.calls[-1] == ("OPEN", False, None)
+    assert engine.next_deadline() == 5.0
+    assert engine.stale == 1
+    engine.add(timer, now=20.0)
+    assert timer.due == pytest.approx(21.0)
+
+
+def test_invalid_timers_rejected():
+    with pytest.raises(ValueError):
+        ScheduledTimer("t", 0, 5)
+    with pytest.raises(ValueError):
+        ScheduledTimer("t", 5, 5, mode="sometimes")
+    engine = TimerEngine()
+    engine.add(ScheduledTimer("t", 5, 5), now=0.0)
+    with pytest.raises(ValueError):
+        engine.add(ScheduledTimer("t", 5, 5))
+
+
+def test_run_sleeps_on_scheduler_until_stopped():
+    engine = TimerEngine()
+    engine.add(ScheduledTimer("t", 0.01, 0.01))
+    thread = threading.Thread(target=engine.run, args=(DeadlineScheduler(),))
+    thread.start()
+    threading.Timer(0.1, engine.stop).start()
+    thread.join(2.0)
+    assert not thread.is_alive()
+    assert engine.fired >= 5
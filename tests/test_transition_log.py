@@ -0,0 +1,143 @@
+import io
+import os
+import numpy as np
+import pytest
+from app.settings_store import MemoryBackend, SettingsStore
+from app.timer import TimerController
+from app.transition_log import (RECORD_SIZE, TransitionLog, _segment_paths, main, query, scan,
+                                summarize)
+
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+    # Small blocks so the sparse index is actually exercised
+    monkeypatch.setattr("app.transition_log.INDEX_STRIDE", 4)
+    return str(tmp_path / "transitions")
+
+
+def _fill(directory, count, segment_records=50, **kwargs):
+    log = TransitionLog(directory, segment_records=segment_records, **kwargs)
+    timestamps = 1000.0 + np.cumsum(np.arange(1, count + 1) % 7 + 0.5)
+    for i, timestamp in enumerate(timestamps):
+        status = "OPEN" if i % 2 == 0 else "CLOSE"
+        log.append(float(timestamp), status, (i % 7) + 0.5, 7, "random" if i % 3 else "loop")
+    log.close()
+    return timestamps
+
+
+def test_records_round_trip(directory):
+    log = TransitionLog(directory)
+    log.append(1700000000.125, "CLOSE", 2.5, 3, "random")
+    log.close()
+    assert os.path.getsize(_segment_paths(directory)[0]) == RECORD_SIZE == 32
+    record = query(directory)[0]
+    assert (record["timestamp"], record["status"], record["period"], record["base"], record["mode"]) == \
+        (1700000000.125, 1, 2.5, 3, 1)
+
+
+def test_range_queries_match_a_full_scan(directory):
+    timestamps = _fill(directory, 500)
+    assert len(_segment_paths(directory)) == 10
+    rng = np.random.default_rng(5)
+    for start, end in rng.uniform(timestamps[0] - 10, timestamps[-1] + 10, size=(200, 2)):
+        start, end = min(start, end), max(start, end)
+        expected = timestamps[(timestamps >= start) & (timestamps < end)]
+        assert np.array_equal(query(directory, start, end)["timestamp"], expected)
+    # Exact record times: start is inclusive, end exclusive
+    assert query(directory, timestamps[100], timestamps[104]).size == 4
+    assert query(directory, start=timestamps[-1]).size == 1
+    assert query(directory, end=timestamps[0]).size == 0
+
+
+def test_old_segments_are_dropped(directory):
+    timestamps = _fill(directory, 500, max_segments=3)
+    assert [os.path.basename(p) for p in _segment_paths(directory)] == \
+        ["00000008.seg", "00000009.seg", "00000010.seg"]
+    assert np.array_equal(query(directory)["timestamp"], timestamps[-150:])
+    assert len([n for n in os.listdir(directory) if n.endswith(".idx")]) == 3
+
+
+def test_clock_stepping_back_starts_a_segment(directory):
+    log = TransitionLog(directory)
+    for timestamp in (500.0, 600.0, 100.0, 200.0):
+        log.append(timestamp, "OPEN", 1, 1, "loop")
+    log.close()
+    assert len(_segment_paths(directory)) == 2
+    assert query(directory, 150, 550)["timestamp"].tolist() == [500.0, 200.0]
+
+
+def test_torn_record_and_stale_index_after_power_cut(directory):
+    timestamps = _fill(directory, 30, segment_records=1000)
+    path = _segment_paths(directory)[0]
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 10)
+    # The index entry for record 32 made it to disk; the record did not
+    with open(path[:-4] + ".idx", "ab") as f:
+        f.write(np.float64(9999.0).tobytes())
+    assert np.array_equal(query(directory, timestamps[5], timestamps[20])["timestamp"], timestamps[5:20])
+    log = TransitionLog(directory, segment_records=1000)
+    log.append(timestamps[-1] + 1, "OPEN", 1, 1, "loop")
+    log.close()
+    assert os.path.getsize(path) == 31 * RECORD_SIZE
+    assert os.path.getsize(path[:-4] + ".idx") == 8 * 8
+    assert query(directory)["timestamp"][-2:].tolist() == [timestamps[-1], timestamps[-1] + 1]
+
+
+def test_unwritable_directory_is_retried(tmp_path, caplog):
+    # A file where the directory should be: the log cannot be created, even as root
+    blocker = tmp_path / "transitions"
+    blocker.write_text("")
+    log = TransitionLog(str(blocker))
+    assert log.append(10.0, "OPEN", 1, 1, "loop") is False
+    assert log.append(11.0, "CLOSE", 1, 1, "loop") is False
+    assert log.stats()["failures"] == 2
+    assert len([r for r in caplog.records if r.levelname == "ERROR"]) == 1
+    blocker.unlink()
+    assert log.append(12.0, "OPEN", 1, 1, "loop") is True
+    log.close()
+    assert query(str(blocker))["timestamp"].tolist() == [12.0]
+
+
+def test_summary(directory):
+    log = TransitionLog(directory)
+    for timestamp, status, period in ((10, "OPEN", 3), (13, "CLOSE", 9), (22, "OPEN", 4), (26, "CLOSE", 2),
+                                      (28, "OPEN", 3)):
+        log.append(timestamp, status, period, 5, "random")
+    log.close()
+    summary = summarize(directory, start=11)
+    assert summary["transitions"] == 4
+    assert summary["cycles"] == 2
+    assert summary["CLOSE"] == {"periods": 2, "total": 11.0, "longest": 9.0, "longest_at": 13.0}
+    assert summarize(directory, start=100)["transitions"] == 0
+    assert sum(chunk.size for chunk in scan(directory)) == 5
+
+
+def test_timer_logs_transitions_at_the_boundary(directory, monkeypatch):
+    clock = {"monotonic": 50.0}
+    monkeypatch.setattr("time.monotonic", lambda: clock["monotonic"])
+    monkeypatch.setattr("time.time", lambda: 1000.0 + clock["monotonic"])
+    log = TransitionLog(directory)
+    t = TimerController(settings=SettingsStore(MemoryBackend(), delay=0), transition_log=log)
+    t._open_time_base, t._close_time_base = 3, 2
+    t.mode_handler.initialize()
+    t.enabled = True
+    t.last_update_time = 50.0
+    clock["monotonic"] = 53.25
+    t.update()
+    t.transition()
+    log.close()
+    records = query(directory)
+    assert records.size == 1
+    # Recorded when the boundary was reached, not when it was handled
+    assert records["timestamp"][0] == pytest.approx(1053.0)
+    assert (records["status"][0], records["period"][0], records["base"][0]) == (1, 2, 2)
+
+
+def test_cli(directory):
+    _fill(directory, 20)
+    out = io.StringIO()
+    assert main(["--dir", directory, "--since", "1970-01-01T00:00:00"], out=out) == 0
+    assert out.getvalue().startswith("20 transitions, 10 cycles")
+    out = io.StringIO()
+    main(["--dir", directory, "--list", "--until", "1970-01-01T00:16:50"], out=out)
+    assert out.getvalue().splitlines()[0] == "1970-01-01T00:16:41.500+00:00 OPEN 0.5 (base 7, loop)"
@@ -0,0 +1,93 @@
+import pytest
+from device.transport import SpiTransport, I2cTransport, invert
+from features.steps.mocks.mock_spidev import SpiDev, LegacySpiDev
+from features.steps.mocks.mock_smbus import SMBus, i2c_msg
+
+
+@pytest.fixture
+def dc_log():
+    return []
+
+
+def test_invert():
+    assert invert([0x00, 0xFF, 0x0F]) == bytes([0xFF, 0x00, 0xF0])
+
+
+def test_spi_command_burst_sets_dc_low(dc_log):
+    spi = SpiDev()
+    transport = SpiTransport(spi, dc_log.append)
+    transport.command(0xB0, 0x02, 0x10)
+    assert dc_log == [False]
+    assert spi.transfers == [bytes([0xB0, 0x02, 0x10])]
+
+
+def test_spi_page_is_single_transfer(dc_log):
+    spi = SpiDev()
+    transport = SpiTransport(spi, dc_log.append)
+    page = bytes(range(128))
+    transport.data(page)
+    assert dc_log == [True]
+    assert spi.transfers == [page]
+
+
+def test_spi_falls_back_to_chunked_writebytes(dc_log):
+    spi = LegacySpiDev()
+    transport = SpiTransport(spi, dc_log.append)
+    transport.data(bytes(5000))
+    assert [len(t) for t in spi.transfers] == [4096, 904]
+
+
+def test_i2c_page_is_chunked_to_smbus_block_limit():
+    bus = SMBus()
+    transport = I2cTransport(bus, 0x3C)
+    transport.data(bytes(range(128)))
+    assert bus.transaction_count == 4
+    assert {kind for kind, _, _ in bus.transactions} == {"block"}
+    assert all(payload[0] == 0x40 and len(payload) == 33 for _, _, payload in bus.transactions)
+    assert b"".join(payload[1:] for _, _, payload in bus.transactions) == bytes(range(128))
+
+
+def test_i2c_command_burst_is_one_transaction():
+    bus = SMBus()
+    I2cTransport(bus, 0x3C).command(0xB0, 0x02, 0x10)
+    assert bus.transactions == [("block", 0x3C, bytes([0x00, 0xB0, 0x02, 0x10]))]
+
+
+def test_i2c_rdwr_sends_full_page_as_one_message():
+    bus = SMBus()
+    transport = I2cTransport(bus, 0x3C, use_rdwr=True, i2c_msg=i2c_msg)
+    transport.data(bytes(128))
+    assert bus.transaction_count == 1
+    kind, addr, payload = bus.transactions[0]
+    assert (kind, addr, len(payload)) == ("rdwr", 0x3C, 129)
+    assert payload[0] == 0x40
+
+
+def test_i2c_rejects_oversized_blocks():
+    with pytest.raises(ValueError):
+        I2cTransport(SMBus(), 0x3C, block_size=64)
+
+
+@pytest.fixture
+def sh1106(monkeypatch):
+    """The real driver over a recording SpiDev, with a stand-in device.config."""
+    import importlib
+    import sys
+    import types
+    spi = SpiDev()
+    rpi = types.SimpleNamespace(Device=1, spi=spi, GPIO_DC_PIN=24, GPIO_RST_PIN=25,
+                                module_init=lambda: 0, digital_write=lambda pin, level: None)
+    monkeypatch.setitem(sys.modules, "device.config", types.SimpleNamespace(RPI=rpi))
+    monkeypatch.delitem(sys.modules, "device.SH1106", raising=False)
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    return importlib.import_module("device.SH1106").SH1106()
+
+
+@pytest.mark.parametrize("orientation, remap", [("software", [0xA0, 0xC0]), ("hardware", [0xA1, 0xC8])])
+def test_init_sends_contrast_value_before_remap(sh1106, orientation, remap):
+    sh1106.orientation = orientation
+    sh1106.Init()
+    commands = [byte for transfer in sh1106.RPI.spi.transfers for byte in transfer]
+    contrast = commands.index(0x81)
+    # 0x81 takes a data byte; the remap must not be swallowed as the contrast value
+    assert commands[contrast + 1:contrast + 4] == [0xA0] + remap